@@ -2,8 +2,6 @@ import os
 import base64
 import json
 
-import requests
-
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
@@ -23,6 +21,8 @@ class KakaoDataException(Exception):
     pass
 
 def exchange_kakao_access_token(access_code):
+    import requests  # 로그인 때만 쓰므로 기동 시 import 하지 않음
+
     response = requests.post(
         'https://kauth.kakao.com/oauth/token',
         headers={
@@ -49,6 +49,8 @@ def extract_kakao_picture(kakao_data):
     if access_token is None:
         raise KakaoDataException()
     else:
+        import requests
+
         response = requests.get(
             'https://kapi.kakao.com/v1/api/talk/profile',
             headers={
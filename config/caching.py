@@ -0,0 +1,248 @@
+"""검색 캐시 보조 유틸리티"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(key, default):
+    return getattr(settings, 'SEARCH_CACHE_SETTINGS', {}).get(key, default)
+
+def normalize_query(query):
+    """대소문자/연속 공백 차이를 같은 검색어로 취급"""
+    return ' '.join((query or '').lower().split())
+
+def search_cache_key(prefix, query, search_type):
+    return f"{prefix}_{normalize_query(query)}_{search_type}"
+
+# 검색 종류별 (soft TTL, hard TTL) 기본값 (초)
+DEFAULT_SEARCH_TTLS = {
+    'NAME': (3600, 86400),
+    'SYMPTOM': (1800, 43200),
+    # 맞춤 요약 생성 대기 중인 증상 검색 결과
+    'SYMPTOM_PENDING': (60, 43200),
+}
+
+def search_ttls(kind):
+    """soft TTL 이 지나면 stale 응답 + 백그라운드 갱신, hard TTL 이 지나면 캐시 만료"""
+    soft_default, hard_default = DEFAULT_SEARCH_TTLS[kind]
+    return _setting(f'{kind}_SOFT_TTL', soft_default), _setting(f'{kind}_HARD_TTL', hard_default)
+
+def _flight_keys(key):
+    digest = hashlib.md5(key.encode('utf-8')).hexdigest()
+    return f"singleflight:lock:{digest}", f"singleflight:result:{digest}"
+
+
+# ==================== single-flight ====================
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+def single_flight(key, compute, lease=None, wait_timeout=None):
+    """
+    같은 키에 대한 동시 계산을 하나로 합침
+    - 프로세스 내: 먼저 온 스레드만 계산하고 나머지 스레드는 그 결과를 받음
+    - 워커 간: cache.add 로 임대(lease) 락을 잡은 워커만 계산하고,
+      나머지는 캐시로 공유된 결과를 기다림 (락 만료/대기 초과 시 직접 계산)
+    compute 의 반환값은 캐시에 저장할 수 있어야 함(pickle 가능)
+    """
+    with _inflight_lock:
+        call = _inflight.get(key)
+        leader = call is None
+        if leader:
+            call = _inflight[key] = _Call()
+
+    if not leader:
+        if call.event.wait(wait_timeout or _setting('SINGLE_FLIGHT_WAIT', 35)):
+            if call.error is not None:
+                raise call.error
+            return call.result
+        logger.warning(f"single-flight 대기 시간 초과, 직접 계산: {key}")
+        return compute()
+
+    try:
+        call.result = _compute_across_workers(key, compute, lease, wait_timeout)
+        return call.result
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        call.event.set()
+
+def _compute_across_workers(key, compute, lease, wait_timeout):
+    lease = lease or _setting('SINGLE_FLIGHT_LEASE', 30)
+    lock_key, result_key = _flight_keys(key)
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + (wait_timeout or _setting('SINGLE_FLIGHT_WAIT', 35))
+
+    while True:
+        # 다른 워커가 방금 계산을 마쳤다면 그 결과 사용
+        shared = cache.get(result_key)
+        if shared is not None:
+            return shared[0]
+
+        if cache.add(lock_key, token, lease):
+            try:
+                result = compute()
+                cache.set(result_key, (result,), _setting('SINGLE_FLIGHT_RESULT_TTL', 10))
+                return result
+            finally:
+                if cache.get(lock_key) == token:
+                    cache.delete(lock_key)
+
+        if time.monotonic() >= deadline:
+            logger.warning(f"single-flight 락 대기 시간 초과, 직접 계산: {key}")
+            return compute()
+        time.sleep(_setting('SINGLE_FLIGHT_POLL_INTERVAL', 0.05))
+
+
+_async_inflight = weakref.WeakKeyDictionary()
+
+async def asingle_flight(key, compute, lease=None, wait_timeout=None):
+    """single_flight 의 asyncio 버전 (compute 는 코루틴 함수)"""
+    inflight = _async_inflight.setdefault(asyncio.get_running_loop(), {})
+    future = inflight.get(key)
+    if future is not None:
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), wait_timeout or _setting('SINGLE_FLIGHT_WAIT', 35))
+        except asyncio.TimeoutError:
+            logger.warning(f"single-flight 대기 시간 초과, 직접 계산: {key}")
+            return await compute()
+        except asyncio.CancelledError:
+            # 계산하던 요청이 취소된 경우에만 직접 계산
+            if not future.cancelled():
+                raise
+            return await compute()
+
+    future = inflight[key] = asyncio.get_running_loop().create_future()
+    try:
+        result = await _acompute_across_workers(key, compute, lease, wait_timeout)
+        future.set_result(result)
+        return result
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # 기다리는 쪽이 없을 때 "exception was never retrieved" 경고 방지
+        future.exception()
+        raise
+    finally:
+        inflight.pop(key, None)
+
+async def _acompute_across_workers(key, compute, lease, wait_timeout):
+    lease = lease or _setting('SINGLE_FLIGHT_LEASE', 30)
+    lock_key, result_key = _flight_keys(key)
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + (wait_timeout or _setting('SINGLE_FLIGHT_WAIT', 35))
+
+    while True:
+        shared = await cache.aget(result_key)
+        if shared is not None:
+            return shared[0]
+
+        if await cache.aadd(lock_key, token, lease):
+            try:
+                result = await compute()
+                await cache.aset(result_key, (result,), _setting('SINGLE_FLIGHT_RESULT_TTL', 10))
+                return result
+            finally:
+                if await cache.aget(lock_key) == token:
+                    await cache.adelete(lock_key)
+
+        if time.monotonic() >= deadline:
+            logger.warning(f"single-flight 락 대기 시간 초과, 직접 계산: {key}")
+            return await compute()
+        await asyncio.sleep(_setting('SINGLE_FLIGHT_POLL_INTERVAL', 0.05))
+
+
+# ==================== stale-while-revalidate ====================
+
+def _unwrap(entry):
+    if entry is None:
+        return None, False
+    # soft TTL 도입 전 형식으로 저장된 항목은 바로 갱신 대상
+    if not isinstance(entry, dict) or 'fresh_until' not in entry:
+        return entry, True
+    return entry['payload'], time.time() >= entry['fresh_until']
+
+def _wrap(payload, soft_ttl):
+    return {'payload': payload, 'fresh_until': time.time() + soft_ttl}
+
+def get_swr(key):
+    """(payload, stale 여부) - 캐시에 없으면 (None, False)"""
+    return _unwrap(cache.get(key))
+
+def set_swr(key, payload, soft_ttl, hard_ttl):
+    cache.set(key, _wrap(payload, soft_ttl), hard_ttl)
+
+async def aget_swr(key):
+    return _unwrap(await cache.aget(key))
+
+def _refresh_lock_key(key):
+    return f"swr:refresh:{hashlib.md5(key.encode('utf-8')).hexdigest()}"
+
+def schedule_refresh(key, refresh, *args):
+    """
+    stale 항목을 백그라운드에서 갱신 (워커 간 중복 갱신은 캐시 락으로 방지)
+    refresh(*args) 가 직접 캐시를 다시 채워야 함
+    """
+    if not cache.add(_refresh_lock_key(key), 1, _setting('REFRESH_LOCK_TTL', 60)):
+        return False
+    logger.info(f"stale 캐시 백그라운드 갱신: {key}")
+    run_in_background(refresh, *args)
+    return True
+
+async def aschedule_refresh(key, refresh, *args):
+    """schedule_refresh 의 async 버전 (refresh 는 동기 함수로 스레드 풀에서 실행)"""
+    if not await cache.aadd(_refresh_lock_key(key), 1, _setting('REFRESH_LOCK_TTL', 60)):
+        return False
+    logger.info(f"stale 캐시 백그라운드 갱신: {key}")
+    run_in_background(refresh, *args)
+    return True
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=_setting('BACKGROUND_WORKERS', 2),
+                    thread_name_prefix='search-background'
+                )
+    return _executor
+
+def _run_background(func, args):
+    try:
+        func(*args)
+    except Exception as e:
+        logger.error(f"백그라운드 작업 실패 {getattr(func, '__name__', func)}: {str(e)}", exc_info=True)
+    finally:
+        # 요청 사이클 밖의 스레드이므로 직접 DB 커넥션 정리
+        connections.close_all()
+
+def run_in_background(func, *args):
+    """응답과 별개로 프로세스 내 스레드 풀에서 실행"""
+    return _get_executor().submit(_run_background, func, args)
@@ -0,0 +1,173 @@
+"""외부 API(data.go.kr, OpenAI)용 서킷 브레이커
+
+워커 간에 상태를 공유하도록 캐시에 저장한다.
+- closed: 최근 WINDOW 초 동안의 실패율이 FAILURE_RATE 이상이면(최소 MIN_REQUESTS 건) open
+- open: OPEN_SECONDS 동안 호출하지 않고 바로 CircuitOpenError
+- half-open: open 시간이 지나면 cache.add 로 한 요청만 시험 호출, 성공하면 closed / 실패하면 다시 open
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# 실패율 집계 단위 (초)
+BUCKET_SECONDS = 10
+
+
+class CircuitOpenError(Exception):
+    """서킷이 열려 있어 외부 호출을 건너뜀"""
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_exceptions=(Exception,)):
+        self.name = name
+        # 이 예외만 장애로 집계 (잘못된 요청 등은 제외)
+        # 무거운 패키지의 예외는 import 를 미루도록 튜플을 반환하는 함수로 넘길 수 있음
+        self.failure_exceptions = failure_exceptions
+
+    def _is_failure(self, error):
+        failure_exceptions = self.failure_exceptions
+        if not isinstance(failure_exceptions, (tuple, type)):
+            failure_exceptions = failure_exceptions()
+        return isinstance(error, failure_exceptions)
+
+    def _setting(self, key, default):
+        return getattr(settings, 'CIRCUIT_BREAKER_SETTINGS', {}).get(key, default)
+
+    def _key(self, suffix):
+        return f"circuit:{self.name}:{suffix}"
+
+    def _buckets(self):
+        now = int(time.time()) // BUCKET_SECONDS
+        count = max(1, self._setting('WINDOW', 60) // BUCKET_SECONDS)
+        return [now - offset for offset in range(count)]
+
+    def _count(self, outcome):
+        key = self._key(f"{outcome}:{self._buckets()[0]}")
+        cache.add(key, 0, self._setting('WINDOW', 60) + BUCKET_SECONDS)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # add 와 incr 사이에 만료된 경우
+            cache.set(key, 1, self._setting('WINDOW', 60) + BUCKET_SECONDS)
+
+    def _failure_rate(self):
+        keys = [self._key(f"{outcome}:{bucket}") for bucket in self._buckets() for outcome in ('ok', 'fail')]
+        counts = cache.get_many(keys)
+        failures = sum(value for key, value in counts.items() if ':fail:' in key)
+        total = sum(counts.values())
+        return failures, total
+
+    async def _acount(self, outcome):
+        key = self._key(f"{outcome}:{self._buckets()[0]}")
+        await cache.aadd(key, 0, self._setting('WINDOW', 60) + BUCKET_SECONDS)
+        try:
+            await cache.aincr(key)
+        except ValueError:
+            await cache.aset(key, 1, self._setting('WINDOW', 60) + BUCKET_SECONDS)
+
+    async def _afailure_rate(self):
+        keys = [self._key(f"{outcome}:{bucket}") for bucket in self._buckets() for outcome in ('ok', 'fail')]
+        counts = await cache.aget_many(keys)
+        failures = sum(value for key, value in counts.items() if ':fail:' in key)
+        total = sum(counts.values())
+        return failures, total
+
+    @property
+    def state(self):
+        open_until = cache.get(self._key('open_until'))
+        if open_until is None:
+            return 'closed'
+        return 'open' if time.time() < open_until else 'half-open'
+
+    def allow_request(self):
+        """호출 가능 여부 (half-open 상태에서는 한 요청만 시험 호출 허용)"""
+        open_until = cache.get(self._key('open_until'))
+        if open_until is None:
+            return True
+        if time.time() < open_until:
+            return False
+        return cache.add(self._key('probe'), 1, self._setting('PROBE_TIMEOUT', 30))
+
+    def record_success(self):
+        self._count('ok')
+        if cache.get(self._key('open_until')) is not None:
+            cache.delete_many([self._key('open_until'), self._key('probe')])
+            logger.info(f"서킷 닫힘: {self.name}")
+
+    def record_failure(self):
+        self._count('fail')
+        if cache.get(self._key('open_until')) is not None:
+            # half-open 시험 호출 실패
+            self._open()
+            return
+
+        failures, total = self._failure_rate()
+        if total >= self._setting('MIN_REQUESTS', 10) and failures / total >= self._setting('FAILURE_RATE', 0.5):
+            self._open()
+
+    def _open(self):
+        open_seconds = self._setting('OPEN_SECONDS', 30)
+        # 시험 호출 시점이 지나도 상태가 남아 있도록 넉넉한 TTL
+        cache.set(self._key('open_until'), time.time() + open_seconds, open_seconds * 10)
+        cache.delete(self._key('probe'))
+        logger.warning(f"서킷 열림: {self.name} ({open_seconds}초)")
+
+    async def aallow_request(self):
+        """allow_request 의 async 버전 (이벤트 루프를 막지 않도록 비동기 캐시 API 사용)"""
+        open_until = await cache.aget(self._key('open_until'))
+        if open_until is None:
+            return True
+        if time.time() < open_until:
+            return False
+        return await cache.aadd(self._key('probe'), 1, self._setting('PROBE_TIMEOUT', 30))
+
+    async def arecord_success(self):
+        await self._acount('ok')
+        if await cache.aget(self._key('open_until')) is not None:
+            await cache.adelete_many([self._key('open_until'), self._key('probe')])
+            logger.info(f"서킷 닫힘: {self.name}")
+
+    async def arecord_failure(self):
+        await self._acount('fail')
+        if await cache.aget(self._key('open_until')) is not None:
+            await self._aopen()
+            return
+
+        failures, total = await self._afailure_rate()
+        if total >= self._setting('MIN_REQUESTS', 10) and failures / total >= self._setting('FAILURE_RATE', 0.5):
+            await self._aopen()
+
+    async def _aopen(self):
+        open_seconds = self._setting('OPEN_SECONDS', 30)
+        await cache.aset(self._key('open_until'), time.time() + open_seconds, open_seconds * 10)
+        await cache.adelete(self._key('probe'))
+        logger.warning(f"서킷 열림: {self.name} ({open_seconds}초)")
+
+    def call(self, func, *args, **kwargs):
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} 서킷 열림")
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            if self._is_failure(e):
+                self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    async def acall(self, func, *args, **kwargs):
+        """call 의 async 버전 (func 는 코루틴 함수)"""
+        if not await self.aallow_request():
+            raise CircuitOpenError(f"{self.name} 서킷 열림")
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            if self._is_failure(e):
+                await self.arecord_failure()
+            raise
+        await self.arecord_success()
+        return result
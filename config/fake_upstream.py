@@ -0,0 +1,262 @@
+"""로컬 부하 테스트용 가짜 외부 API 서버 (data.go.kr 약물/약국 목록, OpenAI chat completions)
+
+실제 API 와 같은 경로와 응답 형식을 흉내 내며 지연 시간과 오류 비율을 설정할 수 있다.
+약물/약국 목록은 seed 로 고정된 합성 데이터(또는 JSON 파일)를 쓴다.
+python manage.py fake_upstream 으로 실행하고, 출력되는 환경 변수로 서버가 이 주소를 보게 한다.
+"""
+import json
+import logging
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+from config.rate_limit import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DRUG_LIST_PATH = '/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList'
+PHARMACY_PATH = '/B552657/ErmctInsttInfoInqireService/getParmacyFullDown'
+CHAT_COMPLETIONS_PATH = '/v1/chat/completions'
+
+NAME_HEADS = ['타이', '게보', '판피', '부루', '베아', '판콜', '지르', '알레', '훼스', '닥터',
+              '겔포', '까스', '텐텐', '아로', '이지', '탁센', '캐롤', '애드', '그날', '펜잘']
+NAME_TAILS = ['레놀', '린', '린에스', '펜', '제', '에이', '텍', '르기', '탈', '베아']
+FORMS = ['정', '캡슐', '연질캡슐', '시럽', '과립']
+DOSES = ['', '500밀리그람', '250밀리그램', '200mg', '이알서방정']
+SYMPTOMS = ['두통', '치통', '생리통', '발열', '감기', '콧물', '코막힘', '기침', '가래', '소화불량',
+            '속쓰림', '위염', '근육통', '관절통', '요통', '알레르기', '비염', '피로', '변비', '설사']
+COMPANIES = ['한국제약', '대한약품', '서울제약', '동아제약사', '새한바이오']
+OPEN_TIMES = ['0830', '0900', '0930', '1000']
+CLOSE_TIMES = ['1800', '1830', '1900', '2000', '2200']
+
+
+def fixture_catalog(size=500, seed=0):
+    """e약은요 목록 응답 항목 형식의 합성 약물 목록"""
+    rng = random.Random(seed)
+    items = []
+    seen = set()
+    while len(items) < size:
+        name = rng.choice(NAME_HEADS) + rng.choice(NAME_TAILS) + rng.choice(FORMS) + rng.choice(DOSES)
+        if name in seen:
+            name = f"{name}({len(items)})"
+        seen.add(name)
+        symptoms = rng.sample(SYMPTOMS, rng.randint(2, 4))
+        items.append({
+            'itemName': name,
+            'itemSeq': str(200000000 + len(items)),
+            'entpName': rng.choice(COMPANIES),
+            'efcyQesitm': f"<p>이 약은 {', '.join(symptoms)}의 완화에 사용합니다.</p>",
+            'useMethodQesitm': "<p>성인은 1회 1~2정을 1일 3~4회 복용합니다.</p>",
+            'atpnQesitm': "<p>정해진 용법과 용량을 지켜 복용하십시오.</p>",
+            'intrcQesitm': "<p>다른 해열진통제와 함께 복용하지 마십시오.</p>",
+            'seQesitm': "<p>발진, 구역, 구토가 나타날 수 있습니다.</p>",
+            'itemImage': '',
+        })
+    return items
+
+def fixture_pharmacies(size=2000, seed=0):
+    """약국 전체 목록 응답 항목 형식의 합성 약국 목록 (서울 일대)"""
+    rng = random.Random(seed)
+    pharmacies = []
+    for index in range(size):
+        item = {
+            'hpid': f"C{1100000 + index}",
+            'dutyName': f"{rng.choice(NAME_HEADS)}약국{index}",
+            'dutyAddr': f"서울특별시 가상구 테스트로 {index + 1}",
+            'dutyTel1': f"02-{rng.randint(200, 999)}-{rng.randint(1000, 9999)}",
+            'wgs84Lat': f"{rng.uniform(37.45, 37.65):.7f}",
+            'wgs84Lon': f"{rng.uniform(126.85, 127.15):.7f}",
+        }
+        for day in range(1, 8):
+            # 일요일/공휴일(7, 8)은 대부분 휴무
+            if day == 7 and rng.random() < 0.8:
+                continue
+            item[f"dutyTime{day}s"] = rng.choice(OPEN_TIMES)
+            item[f"dutyTime{day}c"] = rng.choice(CLOSE_TIMES)
+        pharmacies.append(item)
+    return pharmacies
+
+def load_catalog(path):
+    """실제 응답에서 모은 약물 목록(JSON 배열 또는 body.items) 파일"""
+    with open(path, encoding='utf-8') as fp:
+        data = json.load(fp)
+    if isinstance(data, dict):
+        data = data.get('body', data).get('items') or []
+    return data
+
+def fake_summary(text):
+    """효능 원문에서 증상 단어를 골라 만든 두세 단어 요약"""
+    found = [symptom for symptom in SYMPTOMS if symptom in (text or '')]
+    return ', '.join(found[:3]) if found else (text or '')[:10]
+
+
+class FakeUpstream:
+    """가짜 서버 설정과 데이터 (핸들러 스레드에서 공유)"""
+
+    def __init__(self, catalog, pharmacies, latency_ms=50, openai_latency_ms=400,
+                 jitter=0.3, error_rate=0.0, rate_limit_rate=0.0, seed=0):
+        self.catalog = catalog
+        self.pharmacies = pharmacies
+        self.latency_ms = latency_ms
+        self.openai_latency_ms = openai_latency_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = {DRUG_LIST_PATH: 0, PHARMACY_PATH: 0, CHAT_COMPLETIONS_PATH: 0}
+
+    def _random(self):
+        with self._lock:
+            return self._rng.random()
+
+    def delay(self, base_ms):
+        """base_ms ± jitter 만큼 대기"""
+        if base_ms > 0:
+            factor = 1 + self.jitter * (2 * self._random() - 1)
+            time.sleep(base_ms * factor / 1000)
+
+    def injected_status(self, allow_rate_limit=False):
+        """오류 주입 (없으면 None)"""
+        if allow_rate_limit and self._random() < self.rate_limit_rate:
+            return 429
+        if self._random() < self.error_rate:
+            return 503
+        return None
+
+    def count(self, path):
+        with self._lock:
+            self.requests[path] += 1
+
+    def drug_list(self, params):
+        item_name = params.get('itemName', '')
+        efcy = params.get('efcyQesitm', '')
+        page_no = int(params.get('pageNo') or 1)
+        num_of_rows = int(params.get('numOfRows') or 10)
+        matched = [
+            item for item in self.catalog
+            if item_name in item['itemName'] and efcy in (item.get('efcyQesitm') or '')
+        ]
+        start = (page_no - 1) * num_of_rows
+        return {
+            'header': {'resultCode': '00', 'resultMsg': 'NORMAL SERVICE.'},
+            'body': {
+                'pageNo': page_no,
+                'totalCount': len(matched),
+                'numOfRows': num_of_rows,
+                'items': matched[start:start + num_of_rows],
+            },
+        }
+
+    def pharmacy_xml(self, params):
+        page_no = int(params.get('pageNo') or 1)
+        num_of_rows = int(params.get('numOfRows') or 10)
+        start = (page_no - 1) * num_of_rows
+        rows = []
+        for rnum, item in enumerate(self.pharmacies[start:start + num_of_rows], start=start + 1):
+            fields = ''.join(f"<{key}>{escape(value)}</{key}>" for key, value in item.items())
+            rows.append(f"<item>{fields}<rnum>{rnum}</rnum></item>")
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<response><header><resultCode>00</resultCode><resultMsg>NORMAL SERVICE.</resultMsg></header>'
+            f"<body><items>{''.join(rows)}</items><numOfRows>{num_of_rows}</numOfRows>"
+            f"<pageNo>{page_no}</pageNo><totalCount>{len(self.pharmacies)}</totalCount></body></response>"
+        )
+
+    def chat_completion(self, payload):
+        messages = payload.get('messages') or []
+        prompt = messages[-1].get('content', '') if messages else ''
+        if (payload.get('response_format') or {}).get('type') == 'json_object':
+            # 묶음 요약 요청: [{"id", "text"}] -> {"summaries": [{"id", "summary"}]}
+            try:
+                entries = json.loads(prompt)
+            except ValueError:
+                entries = []
+            content = json.dumps({'summaries': [
+                {'id': entry.get('id'), 'summary': fake_summary(entry.get('text'))} for entry in entries
+            ]}, ensure_ascii=False)
+        else:
+            content = fake_summary(prompt)
+
+        prompt_tokens = estimate_tokens(messages)
+        completion_tokens = estimate_tokens([{'content': content}]) - 7
+        return {
+            'id': f"chatcmpl-fake-{int(time.time() * 1000)}",
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': payload.get('model', 'fake'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'finish_reason': 'stop',
+                'logprobs': None,
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        }
+
+
+def make_handler(upstream):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+        def _send(self, status, body, content_type):
+            data = body.encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_json(self, status, payload):
+            self._send(status, json.dumps(payload, ensure_ascii=False), 'application/json; charset=utf-8')
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path not in (DRUG_LIST_PATH, PHARMACY_PATH):
+                return self._send_json(404, {'error': 'not found'})
+
+            upstream.count(url.path)
+            upstream.delay(upstream.latency_ms)
+            injected = upstream.injected_status()
+            if injected:
+                return self._send(injected, 'Service Unavailable', 'text/plain; charset=utf-8')
+            if url.path == DRUG_LIST_PATH:
+                return self._send_json(200, upstream.drug_list(params))
+            return self._send(200, upstream.pharmacy_xml(params), 'application/xml; charset=utf-8')
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length)
+            if url.path != CHAT_COMPLETIONS_PATH:
+                return self._send_json(404, {'error': {'message': 'not found'}})
+
+            upstream.count(url.path)
+            upstream.delay(upstream.openai_latency_ms)
+            injected = upstream.injected_status(allow_rate_limit=True)
+            if injected:
+                return self._send_json(injected, {'error': {'message': 'injected error', 'type': 'fake', 'code': None}})
+            try:
+                payload = json.loads(body or b'{}')
+            except ValueError:
+                return self._send_json(400, {'error': {'message': 'invalid json'}})
+            return self._send_json(200, upstream.chat_completion(payload))
+
+    return Handler
+
+def serve(upstream, host='127.0.0.1', port=8001):
+    """가짜 서버 생성 (serve_forever 는 호출한 쪽에서)"""
+    server = ThreadingHTTPServer((host, port), make_handler(upstream))
+    server.daemon_threads = True
+    return server
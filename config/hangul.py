@@ -0,0 +1,50 @@
+"""한글 자모 분해 유틸리티"""
+
+HANGUL_BASE = 0xAC00
+HANGUL_END = 0xD7A3
+
+CHOSUNG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSUNG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSUNG = ('', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+            'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+
+# 입력 중간 상태(예: '달' -> '닭')도 접두사가 되도록 겹자모를 낱자로 분리
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+
+CHOSUNG_SET = frozenset(CHOSUNG)
+
+
+def _split_syllable(char):
+    code = ord(char) - HANGUL_BASE
+    return CHOSUNG[code // 588], JUNGSUNG[(code % 588) // 28], JONGSUNG[code % 28]
+
+def is_hangul_syllable(char):
+    return HANGUL_BASE <= ord(char) <= HANGUL_END
+
+def decompose(text):
+    """
+    완성형 한글을 낱자 자모열로 분해 (한글이 아닌 문자는 그대로)
+    예: '타이레놀' -> 'ㅌㅏㅇㅣㄹㅔㄴㅗㄹ'
+    """
+    result = []
+    for char in text:
+        if is_hangul_syllable(char):
+            result.extend(COMPOUND_JAMO.get(jamo, jamo) for jamo in _split_syllable(char))
+        else:
+            result.append(COMPOUND_JAMO.get(char, char))
+    return ''.join(result)
+
+def chosung(text):
+    """
+    완성형 한글의 초성만 추출 (한글이 아닌 문자는 그대로)
+    예: '타이레놀' -> 'ㅌㅇㄹㄴ'
+    """
+    return ''.join(_split_syllable(char)[0] if is_hangul_syllable(char) else char for char in text)
+
+def is_chosung_query(text):
+    """초성(자음)만으로 이루어진 검색어인지 여부"""
+    return bool(text) and all(char in CHOSUNG_SET for char in text)
@@ -0,0 +1,165 @@
+"""OpenAI 호출 계측 (호출 위치별 지연 시간 히스토그램, 토큰 사용량, 오류, 예상 비용)
+
+워커 간에 합산되도록 캐시 카운터(cache.incr)에 누적하고, 호출마다 로그를 남긴다.
+호출 위치는 llm_call_site 컨텍스트로 지정하며, 지정하지 않으면 호출한 코드 경로의 기본값을 쓴다.
+- search_basic / search_custom: 검색 시 실시간 요약 (기본/맞춤 프롬프트)
+- batch_task: Celery 작업의 묶음 요약
+- preprocess: preprocess_medicine_summaries 명령
+"""
+import contextvars
+import logging
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SEARCH_BASIC = 'search_basic'
+SEARCH_CUSTOM = 'search_custom'
+BATCH_TASK = 'batch_task'
+PREPROCESS = 'preprocess'
+CALL_SITES = (SEARCH_BASIC, SEARCH_CUSTOM, BATCH_TASK, PREPROCESS)
+
+# 지연 시간 히스토그램 구간 상한 (ms, 마지막 구간은 그 이상)
+LATENCY_BUCKETS_MS = (100, 250, 500, 1000, 2000, 4000, 8000)
+
+# 모델별 1K 토큰당 가격 (USD, 입력/출력), OPENAI_API_SETTINGS['PRICES'] 로 덮어씀
+DEFAULT_PRICES = {
+    'gpt-3.5-turbo-1106': (0.001, 0.002),
+}
+
+_call_site = contextvars.ContextVar('llm_call_site', default=None)
+
+
+@contextmanager
+def llm_call_site(name):
+    """블록 안의 OpenAI 호출을 name 위치로 집계 (스레드 풀에는 contextvars.copy_context 로 전달)"""
+    token = _call_site.set(name)
+    try:
+        yield
+    finally:
+        _call_site.reset(token)
+
+def current_call_site(default):
+    return _call_site.get() or default
+
+
+def _prices(model):
+    prices = getattr(settings, 'OPENAI_API_SETTINGS', {}).get('PRICES', DEFAULT_PRICES)
+    return prices.get(model, (0, 0))
+
+def estimate_cost(model, prompt_tokens, completion_tokens):
+    """예상 비용 (USD)"""
+    input_price, output_price = _prices(model)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1000
+
+def _bucket(elapsed_ms):
+    for upper in LATENCY_BUCKETS_MS:
+        if elapsed_ms <= upper:
+            return str(upper)
+    return 'inf'
+
+def _key(site, name):
+    return f"llm_metrics:{site}:{name}"
+
+def _counters(site, model, seconds, usage, error, tokens_saved):
+    elapsed_ms = int(seconds * 1000)
+    counters = {
+        'calls': 1,
+        'latency_ms': elapsed_ms,
+        f"latency:{_bucket(elapsed_ms)}": 1,
+    }
+    if error is not None:
+        counters['errors'] = 1
+    if usage is not None:
+        prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+        completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+        counters['prompt_tokens'] = prompt_tokens
+        counters['completion_tokens'] = completion_tokens
+        # incr 는 정수만 받으므로 백만분의 1달러 단위로 누적
+        counters['cost_micro_usd'] = round(estimate_cost(model, prompt_tokens, completion_tokens) * 1_000_000)
+        counters['input_tokens_saved'] = tokens_saved
+    return counters
+
+def _log(site, model, seconds, usage, error, tokens_saved):
+    if error is not None:
+        logger.warning(f"LLM 호출 실패 [{site}] {model} {seconds * 1000:.0f}ms: {type(error).__name__}")
+    elif usage is not None:
+        cost = estimate_cost(model, usage.prompt_tokens, usage.completion_tokens)
+        logger.info(
+            f"LLM 호출 [{site}] {model} {seconds * 1000:.0f}ms, "
+            f"토큰 {usage.prompt_tokens}+{usage.completion_tokens} (입력 압축 -{tokens_saved}), ${cost:.5f}"
+        )
+
+def record_llm_call(site, model, seconds, usage=None, error=None, tokens_saved=0):
+    """
+    OpenAI 호출 1회 기록 (usage 는 응답의 usage, 실패 시 error)
+    tokens_saved: 입력 압축(compact_efcy)으로 원문보다 줄어든 추정 토큰 수
+    """
+    _log(site, model, seconds, usage, error, tokens_saved)
+    try:
+        for name, value in _counters(site, model, seconds, usage, error, tokens_saved).items():
+            if value:
+                key = _key(site, name)
+                cache.add(key, 0, None)
+                cache.incr(key, value)
+    except Exception as e:
+        # 계측 실패가 요약 요청을 막지 않도록
+        logger.error(f"LLM 지표 기록 실패: {str(e)}")
+
+async def arecord_llm_call(site, model, seconds, usage=None, error=None, tokens_saved=0):
+    """record_llm_call 의 async 버전"""
+    _log(site, model, seconds, usage, error, tokens_saved)
+    try:
+        for name, value in _counters(site, model, seconds, usage, error, tokens_saved).items():
+            if value:
+                key = _key(site, name)
+                await cache.aadd(key, 0, None)
+                await cache.aincr(key, value)
+    except Exception as e:
+        logger.error(f"LLM 지표 기록 실패: {str(e)}")
+
+
+_METRIC_NAMES = (
+    ['calls', 'errors', 'latency_ms', 'prompt_tokens', 'completion_tokens', 'input_tokens_saved', 'cost_micro_usd']
+    + [f"latency:{upper}" for upper in LATENCY_BUCKETS_MS] + ['latency:inf']
+)
+
+def _percentile(counts, total, fraction):
+    """히스토그램 구간 상한으로 추정한 백분위 지연 시간 (ms, 마지막 구간이면 None)"""
+    seen = 0
+    for upper, count in zip(LATENCY_BUCKETS_MS, counts):
+        seen += count
+        if seen >= total * fraction:
+            return upper
+    return None
+
+def get_llm_metrics():
+    """호출 위치별 누적 지표"""
+    values = cache.get_many([_key(site, name) for site in CALL_SITES for name in _METRIC_NAMES])
+
+    metrics = {}
+    for site in CALL_SITES:
+        def value(name):
+            return values.get(_key(site, name), 0)
+
+        calls = value('calls')
+        counts = [value(f"latency:{upper}") for upper in LATENCY_BUCKETS_MS] + [value('latency:inf')]
+        labels = [f"<={upper}ms" for upper in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        metrics[site] = {
+            'calls': calls,
+            'errors': value('errors'),
+            'avg_latency_ms': round(value('latency_ms') / calls) if calls else None,
+            'p50_latency_ms': _percentile(counts, calls, 0.5) if calls else None,
+            'p95_latency_ms': _percentile(counts, calls, 0.95) if calls else None,
+            'latency_histogram': dict(zip(labels, counts)),
+            'prompt_tokens': value('prompt_tokens'),
+            'completion_tokens': value('completion_tokens'),
+            'input_tokens_saved': value('input_tokens_saved'),
+            'estimated_cost_usd': round(value('cost_micro_usd') / 1_000_000, 4),
+        }
+    return metrics
+
+def reset_llm_metrics():
+    cache.delete_many([_key(site, name) for site in CALL_SITES for name in _METRIC_NAMES])
@@ -1,4 +1,9 @@
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
 from rest_framework.permissions import BasePermission
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
 
 class IsOwner(BasePermission):
     def has_object_permission(self, request, view, obj):
@@ -8,4 +13,43 @@ class IsOwner(BasePermission):
             else:
                 return False
         else:
-            return False
\ No newline at end of file
+            return False
+
+def _authenticate(request):
+    """JWT 인증 결과 (실패 시 보낼 JsonResponse, 성공 시 None)"""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed as e:
+        detail = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+        return JsonResponse(detail, status=e.status_code)
+
+    if result is None:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401
+        )
+
+    request.user, request.auth = result
+    return None
+
+def jwt_required(view):
+    """DRF 를 거치지 않는 뷰(스트리밍 응답 등)에 JWT 인증(IsAuthenticated 와 동일) 적용"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        error = _authenticate(request)
+        if error is not None:
+            return error
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+def async_jwt_required(view):
+    """DRF 를 거치지 않는 async 뷰에 JWT 인증(IsAuthenticated 와 동일) 적용"""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        error = await sync_to_async(_authenticate)(request)
+        if error is not None:
+            return error
+        return await view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,283 @@
+"""공공데이터 포털(data.go.kr) API 공용 클라이언트
+
+커넥션 풀을 재사용하는 세션, 호출별 타임아웃, 지터를 준 재시도,
+gzip 응답, body.items 파싱을 한 곳에서 처리한다.
+requests/httpx 는 기동 시간을 줄이려고 첫 호출 때 불러온다.
+"""
+import io
+import os
+import time
+import random
+import asyncio
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import List, Optional, TypedDict
+
+from django.conf import settings
+
+from config.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+# 부하 테스트 시 가짜 서버(python manage.py fake_upstream)를 보도록 환경 변수로 바꿀 수 있음
+DRUG_LIST_URL = os.environ.get(
+    'PUBLIC_DATA_DRUG_LIST_URL',
+    "http://apis.data.go.kr/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList"
+)
+PHARMACY_URL = os.environ.get(
+    'PUBLIC_DATA_PHARMACY_URL',
+    "http://apis.data.go.kr/B552657/ErmctInsttInfoInqireService/getParmacyFullDown"
+)
+SERVICE_KEY = os.environ.get(
+    'PUBLIC_DATA_SERVICE_KEY',
+    "C0OCzqNhw6sohn5jE2c1L52H4YKftzf9U8nxGSsC5GqH1YzH4Uu9VJ18zMHmpBrOEPgm3jqSOUpHh3j1oLcwLw=="
+)
+
+# 재시도 대상 상태 코드
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PublicDataAPIError(Exception):
+    """공공데이터 API 호출 또는 응답 파싱 실패"""
+
+
+# 재시도까지 실패한 호출을 장애로 집계
+breaker = CircuitBreaker('public_data', failure_exceptions=(PublicDataAPIError,))
+
+
+class DrugItem(TypedDict):
+    itemName: str
+    itemSeq: Optional[str]
+    entpName: Optional[str]
+    efcyQesitm: Optional[str]
+    useMethodQesitm: Optional[str]
+    atpnQesitm: Optional[str]
+    intrcQesitm: Optional[str]
+    seQesitm: Optional[str]
+    itemImage: Optional[str]
+
+
+@dataclass
+class DrugListPage:
+    """getDrbEasyDrugList 응답의 body"""
+    total_count: int
+    page_no: int = 1
+    num_of_rows: int = 10
+    items: List[DrugItem] = field(default_factory=list)
+
+
+def _setting(key, default):
+    return getattr(settings, 'PUBLIC_DATA_API_SETTINGS', {}).get(key, default)
+
+def _timeout(timeout):
+    return (_setting('CONNECT_TIMEOUT', 3.05), timeout or _setting('TIMEOUT', 10))
+
+def _backoff(attempt):
+    """full jitter 지수 백오프 (초)"""
+    base = _setting('BACKOFF_BASE', 0.5)
+    return random.uniform(0, min(base * (2 ** attempt), _setting('BACKOFF_MAX', 5)))
+
+
+_session = None
+
+def get_session():
+    """프로세스 공용 requests.Session (keep-alive 커넥션 풀)"""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        pool_size = _setting('POOL_SIZE', 10)
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+        _session = session
+    return _session
+
+def _get(url, params, timeout=None):
+    try:
+        return breaker.call(_get_with_retries, url, params, timeout)
+    except CircuitOpenError as e:
+        raise PublicDataAPIError(str(e)) from e
+
+def _get_with_retries(url, params, timeout=None):
+    import requests
+
+    max_retries = _setting('MAX_RETRIES', 2)
+    last_error = None
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = get_session().get(url, params=params, timeout=_timeout(timeout))
+            if response.status_code not in RETRY_STATUS_CODES:
+                response.raise_for_status()
+                return response
+            last_error = requests.HTTPError(f"{response.status_code} 응답", response=response)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            last_error = e
+        except requests.RequestException as e:
+            raise PublicDataAPIError(str(e)) from e
+
+        if attempt < max_retries:
+            delay = _backoff(attempt)
+            logger.warning(f"공공데이터 API 재시도 {attempt + 1}/{max_retries} ({delay:.2f}초 후): {last_error}")
+            time.sleep(delay)
+
+    raise PublicDataAPIError(str(last_error)) from last_error
+
+
+_async_clients = weakref.WeakKeyDictionary()
+
+def get_async_client():
+    """이벤트 루프별 공용 httpx.AsyncClient"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        import httpx
+
+        pool_size = _setting('ASYNC_POOL_SIZE', 100)
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=20),
+            headers={'Accept-Encoding': 'gzip, deflate'},
+        )
+        _async_clients[loop] = client
+    return client
+
+async def _aget(url, params, timeout=None):
+    try:
+        return await breaker.acall(_aget_with_retries, url, params, timeout)
+    except CircuitOpenError as e:
+        raise PublicDataAPIError(str(e)) from e
+
+async def _aget_with_retries(url, params, timeout=None):
+    import httpx
+
+    max_retries = _setting('MAX_RETRIES', 2)
+    connect_timeout, read_timeout = _timeout(timeout)
+    last_error = None
+
+    for attempt in range(max_retries + 1):
+        try:
+            response = await get_async_client().get(
+                url, params=params, timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+            )
+            if response.status_code not in RETRY_STATUS_CODES:
+                response.raise_for_status()
+                return response
+            last_error = httpx.HTTPStatusError(f"{response.status_code} 응답", request=response.request, response=response)
+        except httpx.TransportError as e:
+            last_error = e
+        except httpx.HTTPError as e:
+            raise PublicDataAPIError(str(e)) from e
+
+        if attempt < max_retries:
+            delay = _backoff(attempt)
+            logger.warning(f"공공데이터 API 재시도 {attempt + 1}/{max_retries} ({delay:.2f}초 후): {last_error}")
+            await asyncio.sleep(delay)
+
+    raise PublicDataAPIError(str(last_error)) from last_error
+
+
+def _drug_list_params(item_name, efcy, page_no, num_of_rows):
+    params = {"serviceKey": SERVICE_KEY, "type": "json", "numOfRows": num_of_rows, "pageNo": page_no}
+    if item_name:
+        params["itemName"] = item_name
+    if efcy:
+        params["efcyQesitm"] = efcy
+    return params
+
+def parse_drug_list(data):
+    """getDrbEasyDrugList JSON 응답을 DrugListPage 로 변환"""
+    try:
+        body = data['body']
+        total_count = int(body.get('totalCount') or 0)
+        raw_items = body.get('items') or []
+    except (KeyError, TypeError, AttributeError, ValueError) as e:
+        raise PublicDataAPIError(f"예상하지 못한 응답 형식: {str(e)}") from e
+
+    # 결과가 한 건이면 리스트가 아닌 dict 로 내려오는 경우가 있음
+    if isinstance(raw_items, dict):
+        raw_items = raw_items.get('item', raw_items)
+        if isinstance(raw_items, dict):
+            raw_items = [raw_items]
+
+    items = []
+    for raw in raw_items:
+        if not raw.get('itemName'):
+            continue
+        items.append(DrugItem(**{key: raw.get(key) for key in DrugItem.__annotations__}))
+
+    return DrugListPage(
+        total_count=total_count,
+        page_no=int(body.get('pageNo') or 1),
+        num_of_rows=int(body.get('numOfRows') or len(items)),
+        items=items,
+    )
+
+def _parse_json(response):
+    try:
+        return parse_drug_list(response.json())
+    except ValueError as e:
+        # 인증키 오류 등은 type=json 이어도 XML 로 응답됨
+        raise PublicDataAPIError(f"JSON 파싱 실패: {response.text[:200]}") from e
+
+def fetch_drug_list(item_name=None, efcy=None, page_no=1, num_of_rows=10, timeout=None):
+    """e약은요 의약품 목록 조회"""
+    params = _drug_list_params(item_name, efcy, page_no, num_of_rows)
+    response = _get(_setting('BASE_URL', DRUG_LIST_URL), params, timeout)
+    return _parse_json(response)
+
+async def afetch_drug_list(item_name=None, efcy=None, page_no=1, num_of_rows=10, timeout=None):
+    """fetch_drug_list 의 async 버전"""
+    params = _drug_list_params(item_name, efcy, page_no, num_of_rows)
+    response = await _aget(_setting('BASE_URL', DRUG_LIST_URL), params, timeout)
+    return _parse_json(response)
+
+def fetch_pharmacy_xml(page_no=1, num_of_rows=1000, timeout=None):
+    """약국 전체 목록(XML) 원문 조회"""
+    params = {"serviceKey": SERVICE_KEY, "pageNo": page_no, "numOfRows": num_of_rows}
+    response = _get(_setting('PHARMACY_URL', PHARMACY_URL), params, timeout)
+    return response.content
+
+def parse_pharmacy_items(content):
+    """
+    약국 목록 XML 한 페이지에서 <item> 을 하나씩 dict 로 yield (iterparse, 읽은 요소는 바로 해제)
+    다 읽으면 (totalCount, item 수) 를 반환 (yield from 의 값)
+    """
+    from xml.etree.ElementTree import ParseError, iterparse
+
+    total_count = None
+    count = 0
+    try:
+        for _, elem in iterparse(io.BytesIO(content), events=('end',)):
+            if elem.tag == 'item':
+                yield {child.tag: child.text for child in elem}
+                count += 1
+                elem.clear()
+            elif elem.tag == 'resultCode' and (elem.text or '').strip() != '00':
+                raise PublicDataAPIError(f"약국 목록 조회 실패: resultCode={elem.text}")
+            elif elem.tag == 'returnAuthMsg':
+                # 인증키 오류 등은 OpenAPI_ServiceResponse 로 응답됨
+                raise PublicDataAPIError(f"약국 목록 조회 실패: {elem.text}")
+            elif elem.tag == 'totalCount':
+                total_count = int(elem.text or 0)
+    except ParseError as e:
+        raise PublicDataAPIError(f"XML 파싱 실패: {str(e)}") from e
+    return total_count, count
+
+def iter_pharmacy_items(num_of_rows=None, timeout=None):
+    """
+    약국 전체 목록을 페이지 단위로 받아 <item> dict 를 하나씩 yield
+    (한 번에 한 페이지만 메모리에 둠, 페이지 크기는 PHARMACY_PAGE_SIZE)
+    """
+    num_of_rows = num_of_rows or _setting('PHARMACY_PAGE_SIZE', 1000)
+    page_no = 1
+    while True:
+        content = fetch_pharmacy_xml(page_no=page_no, num_of_rows=num_of_rows, timeout=timeout)
+        total_count, count = yield from parse_pharmacy_items(content)
+        if count < num_of_rows or (total_count is not None and page_no * num_of_rows >= total_count):
+            return
+        page_no += 1
@@ -0,0 +1,121 @@
+"""워커 간 공유 토큰 버킷 (OpenAI 분당 요청 수 / 분당 토큰 수 제한)
+
+버킷 상태를 캐시에 두고 짧은 캐시 락(cache.add) 안에서 읽고-채우고-차감한다.
+웹 워커와 Celery 워커가 같은 캐시를 쓰면 전체 호출량이 할당량을 넘지 않도록 맞춰지고,
+할당량 안에서는 기다리지 않는다.
+"""
+import asyncio
+import logging
+import time
+import uuid
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+LOCK_TTL = 1  # 락을 잡은 프로세스가 죽어도 풀리도록 (초)
+LOCK_POLL_INTERVAL = 0.005
+
+
+class RateLimitTimeout(Exception):
+    """대기 시간 안에 할당량을 얻지 못함"""
+
+
+def count_tokens(text):
+    """텍스트 토큰 수 추정 (영문/숫자는 4글자당 1토큰, 한글 등 그 외 문자는 글자당 1토큰으로 넉넉하게 계산)"""
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+def estimate_tokens(messages, max_tokens=0):
+    """요청이 차지할 토큰 수 추정 (OpenAI 는 프롬프트 + max_tokens 를 한도에 반영)"""
+    prompt_tokens = 0
+    for message in messages:
+        prompt_tokens += 4 + count_tokens(message.get('content') or '')
+    return prompt_tokens + 3 + (max_tokens or 0)
+
+
+class TokenBucketLimiter:
+    """분당 요청 수와 분당 토큰 수를 함께 제한하는 토큰 버킷"""
+
+    def __init__(self, name, requests_per_minute, tokens_per_minute):
+        self.name = name
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._state_key = f"ratelimit:{name}:state"
+        self._lock_key = f"ratelimit:{name}:lock"
+
+    def _take(self, state, now, tokens):
+        """버킷을 채운 뒤 차감 시도 ((새 상태, 기다려야 할 초))"""
+        if state is None:
+            requests, available, updated = self.requests_per_minute, self.tokens_per_minute, now
+        else:
+            requests, available, updated = state
+        elapsed = max(0.0, now - updated)
+        requests = min(self.requests_per_minute, requests + elapsed * self.requests_per_minute / 60)
+        available = min(self.tokens_per_minute, available + elapsed * self.tokens_per_minute / 60)
+
+        if requests >= 1 and available >= tokens:
+            return (requests - 1, available - tokens, now), 0.0
+
+        wait = max(
+            (1 - requests) * 60 / self.requests_per_minute if requests < 1 else 0.0,
+            (tokens - available) * 60 / self.tokens_per_minute if available < tokens else 0.0,
+        )
+        return (requests, available, now), wait
+
+    def _deadline(self, timeout):
+        return time.monotonic() + (timeout if timeout is not None else 30)
+
+    def acquire(self, tokens=1, timeout=None):
+        """할당량이 생길 때까지 대기 후 차감 (timeout 초 안에 못 얻으면 RateLimitTimeout)"""
+        tokens = min(tokens, self.tokens_per_minute)
+        deadline = self._deadline(timeout)
+        while True:
+            token = uuid.uuid4().hex
+            if cache.add(self._lock_key, token, LOCK_TTL):
+                try:
+                    state, wait = self._take(cache.get(self._state_key), time.time(), tokens)
+                    cache.set(self._state_key, state, 120)
+                finally:
+                    if cache.get(self._lock_key) == token:
+                        cache.delete(self._lock_key)
+                if wait == 0:
+                    return
+            else:
+                wait = LOCK_POLL_INTERVAL
+
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"{self.name} 할당량 대기 시간 초과")
+            time.sleep(wait)
+
+    async def aacquire(self, tokens=1, timeout=None):
+        """acquire 의 async 버전"""
+        tokens = min(tokens, self.tokens_per_minute)
+        deadline = self._deadline(timeout)
+        while True:
+            token = uuid.uuid4().hex
+            if await cache.aadd(self._lock_key, token, LOCK_TTL):
+                try:
+                    state, wait = self._take(await cache.aget(self._state_key), time.time(), tokens)
+                    await cache.aset(self._state_key, state, 120)
+                finally:
+                    if await cache.aget(self._lock_key) == token:
+                        await cache.adelete(self._lock_key)
+                if wait == 0:
+                    return
+            else:
+                wait = LOCK_POLL_INTERVAL
+
+            if time.monotonic() + wait > deadline:
+                raise RateLimitTimeout(f"{self.name} 할당량 대기 시간 초과")
+            await asyncio.sleep(wait)
+
+    def drain(self):
+        """429 응답을 받으면 버킷을 비워 모든 워커가 함께 물러나도록 함"""
+        cache.set(self._state_key, (0.0, 0.0, time.time()), 120)
+        logger.warning(f"레이트 리밋 응답으로 버킷 비움: {self.name}")
+
+    async def adrain(self):
+        """drain 의 async 버전"""
+        await cache.aset(self._state_key, (0.0, 0.0, time.time()), 120)
+        logger.warning(f"레이트 리밋 응답으로 버킷 비움: {self.name}")
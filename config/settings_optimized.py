@@ -21,6 +21,45 @@ CACHES = {
     }
 }
 
+# 검색 결과 캐시
+SEARCH_CACHE_SETTINGS = {
+    'SINGLE_FLIGHT_LEASE': 30,  # 워커 간 계산 락 임대 시간 (초)
+    'SINGLE_FLIGHT_WAIT': 35,  # 다른 요청의 계산을 기다리는 최대 시간 (초)
+    'SINGLE_FLIGHT_RESULT_TTL': 10,  # 대기 중인 워커에 결과를 넘기는 캐시 보관 시간 (초)
+    'SINGLE_FLIGHT_POLL_INTERVAL': 0.05,
+    # stale-while-revalidate: soft TTL 이후엔 stale 응답 + 백그라운드 갱신, hard TTL 이후 만료
+    'NAME_SOFT_TTL': 3600,
+    'NAME_HARD_TTL': 86400,
+    'SYMPTOM_SOFT_TTL': 1800,
+    'SYMPTOM_HARD_TTL': 43200,
+    'SYMPTOM_PENDING_SOFT_TTL': 60,  # 맞춤 요약 생성 대기 중인 증상 검색 결과의 soft TTL
+    'NEGATIVE_TTL': 600,  # 결과 0건 검색어를 Django 캐시에 기억하는 시간 (초)
+    'NEGATIVE_DB_TTL': 21600,  # 결과 0건 검색어를 DB 에 기억하는 시간 (초)
+    'REFRESH_LOCK_TTL': 60,  # 같은 키의 중복 갱신 방지 (초)
+    'BACKGROUND_WORKERS': 2,  # 백그라운드 갱신 스레드 수
+}
+
+# 약물명 오타 교정 색인 (자모 단위 편집 거리)
+FUZZY_SEARCH_SETTINGS = {
+    'MAX_EDIT_DISTANCE': 1,  # 허용 편집 거리 (늘리면 색인 메모리가 크게 증가)
+    'PREFIX_LENGTH': 10,  # 색인하는 약물명 자모 접두사 최대 길이
+    'MIN_QUERY_LENGTH': 5,  # 이보다 짧은 검색어(자모 수)는 교정하지 않음
+}
+
+# 약국 위치 검색
+PHARM_SEARCH_SETTINGS = {
+    # 'snapshot': 프로세스 메모리의 좌표 배열로 전체 약국 거리를 한 번에 계산
+    # 'grid': DB 격자 색인(grid_cell)으로 주변 칸의 약국만 읽어서 계산
+    'ENGINE': 'snapshot',
+    'USE_NUMPY': True,  # False 또는 numpy 미설치 시 array 모듈로 계산
+    # 영업 중 약국 검색 (GET /pharm?open=now)
+    'TIME_ZONE': 'Asia/Seoul',  # 영업시간 기준 시간대
+    'OPEN_DEFAULT_K': 5,
+    'OPEN_MAX_K': 50,
+    'OPEN_RADIUS_KM': 3,
+    'OPEN_MAX_RADIUS_KM': 10,
+}
+
 # 캐시 키 프리픽스
 CACHE_MIDDLEWARE_KEY_PREFIX = 'pilling'
 CACHE_MIDDLEWARE_SECONDS = 300
@@ -82,7 +121,13 @@ LOGGING = {
             'handlers': ['api_file'],
             'level': 'INFO',
             'propagate': False,
-        }
+        },
+        # OpenAI 호출별 지연 시간/토큰/비용
+        'config.llm_metrics': {
+            'handlers': ['api_file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -118,10 +163,20 @@ CELERY_BEAT_SCHEDULE = {
         'schedule': crontab(hour=3, minute=0, day_of_week=1),  # 매주 월요일 3시
         'kwargs': {'days_old': 30}
     },
+    # 만료된 네거티브 검색 캐시 정리 (매일)
+    'cleanup-negative-search-cache': {
+        'task': 'medicines.tasks.cleanup_negative_search_cache',
+        'schedule': crontab(hour=3, minute=30),
+    },
     # 인기 약물 요약 생성 (매주 일요일)
     'generate-popular-summaries': {
         'task': 'medicines.tasks.generate_popular_medicine_summaries',
         'schedule': crontab(hour=1, minute=0, day_of_week=0),  # 매주 일요일 1시
+    },
+    # 약국 목록 증분 동기화 (매일, 바뀐 약국만 반영)
+    'sync-pharmacy-list': {
+        'task': 'pharms.tasks.sync_pharmacy_list',
+        'schedule': crontab(hour=4, minute=0),
     }
 }
 
@@ -132,17 +187,47 @@ RATELIMIT_ENABLE = True
 
 # OpenAI API 관련 설정
 OPENAI_API_SETTINGS = {
-    'MAX_RETRIES': 3,
-    'TIMEOUT': 30,
-    'RATE_LIMIT_DELAY': 0.5,  # API 호출 간 최소 딜레이 (초)
+    'MAX_RETRIES': 1,  # 클라이언트 자체 재시도 (장애 시 워커 점유 시간 제한)
+    'TIMEOUT': 10,
+    # 워커 간 공유 토큰 버킷 (조직 할당량에 맞춰 설정)
+    'REQUESTS_PER_MINUTE': 3500,
+    'TOKENS_PER_MINUTE': 90000,
+    'RATE_LIMIT_WAIT': 10,  # 할당량을 기다리는 최대 시간 (초, 초과 시 요약 실패로 처리)
+    'MAX_CONCURRENCY': 10,  # 검색 1회당 동시 요약 요청 수
+    'BATCH_SIZE': 20,  # 사전 처리 시 요청 1회에 묶어 요약할 효능 정보 수
+    'MAX_INPUT_TOKENS': 300,  # 요약 요청에 넣는 효능 정보 1건의 최대 추정 토큰 수 (상투 문구/중복 문장 제거 후)
+    # 예상 비용 계산용 모델별 1K 토큰당 가격 (USD, 입력/출력)
+    'PRICES': {
+        'gpt-3.5-turbo-1106': (0.001, 0.002),
+    },
+}
+
+# 외부 API 서킷 브레이커 설정 (data.go.kr, OpenAI 각각 적용, 상태는 캐시로 워커 간 공유)
+CIRCUIT_BREAKER_SETTINGS = {
+    'WINDOW': 60,  # 실패율 집계 구간 (초)
+    'MIN_REQUESTS': 10,  # 집계 구간 내 최소 호출 수
+    'FAILURE_RATE': 0.5,  # 이 비율 이상 실패하면 서킷 열림
+    'OPEN_SECONDS': 30,  # 열린 뒤 시험 호출까지 대기 (초)
+    'PROBE_TIMEOUT': 30,  # half-open 시험 호출 락 유지 시간 (초)
 }
 
 # 공공데이터 API 설정
 PUBLIC_DATA_API_SETTINGS = {
-    'BASE_URL': 'http://apis.data.go.kr/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList',
+    'BASE_URL': os.environ.get(
+        'PUBLIC_DATA_DRUG_LIST_URL', 'http://apis.data.go.kr/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList'
+    ),
+    'PHARMACY_URL': os.environ.get(
+        'PUBLIC_DATA_PHARMACY_URL', 'http://apis.data.go.kr/B552657/ErmctInsttInfoInqireService/getParmacyFullDown'
+    ),
     'TIMEOUT': 30,
+    'CONNECT_TIMEOUT': 3.05,
     'MAX_RETRIES': 2,
+    'BACKOFF_BASE': 0.5,  # 재시도 지터 백오프 기준 (초)
+    'BACKOFF_MAX': 5,
+    'POOL_SIZE': 10,  # 워커당 keep-alive 커넥션 수
+    'ASYNC_POOL_SIZE': 100,
     'BATCH_SIZE': 100,
+    'PHARMACY_PAGE_SIZE': 1000,  # 약국 목록 한 페이지 행 수 (load_pharm)
 }
 
 # ==================== 데이터베이스 최적화 ====================
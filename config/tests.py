@@ -0,0 +1,345 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from config import caching
+from config.circuit_breaker import CircuitBreaker, CircuitOpenError
+from config.rate_limit import RateLimitTimeout, TokenBucketLimiter, count_tokens
+from config.utils import compact_efcy, summary_key
+
+
+@override_settings(SEARCH_CACHE_SETTINGS={'SINGLE_FLIGHT_POLL_INTERVAL': 0.01})
+class SingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_calls_compute_once(self):
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(1)
+            return 'result'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(caching.single_flight('key', compute))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['result'] * 5)
+
+    def test_lease_is_released_when_compute_fails(self):
+        def fail():
+            raise ValueError('upstream')
+
+        with self.assertRaises(ValueError):
+            caching.single_flight('key', fail)
+
+        lock_key, _ = caching._flight_keys('key')
+        self.assertIsNone(cache.get(lock_key))
+        self.assertEqual(caching.single_flight('key', lambda: 'retried'), 'retried')
+
+    def test_waiter_computes_itself_when_lease_holder_is_stuck(self):
+        # 다른 워커가 락을 잡은 채 결과를 내지 않음
+        lock_key, _ = caching._flight_keys('key')
+        cache.add(lock_key, 'other-worker', 30)
+
+        self.assertEqual(caching.single_flight('key', lambda: 'own', wait_timeout=0.05), 'own')
+        self.assertEqual(cache.get(lock_key), 'other-worker')
+
+    def test_in_process_waiter_computes_itself_after_timeout(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow():
+            started.set()
+            release.wait(1)
+            return 'leader'
+
+        leader = threading.Thread(target=caching.single_flight, args=('key', slow))
+        leader.start()
+        started.wait(1)
+        try:
+            self.assertEqual(caching.single_flight('key', lambda: 'waiter', wait_timeout=0.05), 'waiter')
+        finally:
+            release.set()
+            leader.join()
+
+
+@override_settings(SEARCH_CACHE_SETTINGS={'SINGLE_FLIGHT_POLL_INTERVAL': 0.01})
+class AsyncSingleFlightTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    async def test_concurrent_calls_compute_once(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return 'result'
+
+        results = await asyncio.gather(*(caching.asingle_flight('key', compute) for _ in range(5)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, ['result'] * 5)
+
+    async def test_lease_is_released_when_compute_fails(self):
+        async def fail():
+            raise ValueError('upstream')
+
+        async def retried():
+            return 'retried'
+
+        with self.assertRaises(ValueError):
+            await caching.asingle_flight('key', fail)
+
+        lock_key, _ = caching._flight_keys('key')
+        self.assertIsNone(await cache.aget(lock_key))
+        self.assertEqual(await caching.asingle_flight('key', retried), 'retried')
+
+    async def test_waiter_computes_itself_after_timeout(self):
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return 'leader'
+
+        async def own():
+            return 'waiter'
+
+        leader = asyncio.ensure_future(caching.asingle_flight('key', slow))
+        await asyncio.sleep(0)
+        try:
+            self.assertEqual(await caching.asingle_flight('key', own, wait_timeout=0.05), 'waiter')
+        finally:
+            release.set()
+        self.assertEqual(await leader, 'leader')
+
+
+class StaleWhileRevalidateTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_fresh_and_stale_entries(self):
+        caching.set_swr('fresh', ['a'], 60, 600)
+        caching.set_swr('stale', ['b'], 0, 600)
+
+        self.assertEqual(caching.get_swr('fresh'), (['a'], False))
+        self.assertEqual(caching.get_swr('stale'), (['b'], True))
+        self.assertEqual(caching.get_swr('missing'), (None, False))
+
+    def test_entry_in_old_format_is_stale(self):
+        cache.set('old', ['c'])
+
+        self.assertEqual(caching.get_swr('old'), (['c'], True))
+
+    def test_stale_entry_triggers_exactly_one_refresh(self):
+        def refresh(key):
+            caching.set_swr(key, ['new'], 60, 600)
+
+        caching.set_swr('key', ['old'], 0, 600)
+        # 갱신이 끝나기 전에 들어온 요청들은 모두 stale 결과를 받고, 갱신은 한 번만 예약
+        with mock.patch('config.caching.run_in_background') as run:
+            for _ in range(3):
+                payload, is_stale = caching.get_swr('key')
+                self.assertEqual((payload, is_stale), (['old'], True))
+                caching.schedule_refresh('key', refresh, 'key')
+
+        run.assert_called_once_with(refresh, 'key')
+        refresh('key')
+        self.assertEqual(caching.get_swr('key'), (['new'], False))
+
+    async def test_async_refresh_is_shared_with_sync_lock(self):
+        with mock.patch('config.caching.run_in_background') as run:
+            self.assertTrue(await caching.aschedule_refresh('key', print))
+            self.assertFalse(caching.schedule_refresh('key', print))
+
+        run.assert_called_once()
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@override_settings(CIRCUIT_BREAKER_SETTINGS={'MIN_REQUESTS': 3, 'FAILURE_RATE': 0.5, 'OPEN_SECONDS': 30, 'WINDOW': 60})
+class CircuitBreakerTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        patcher = mock.patch('config.circuit_breaker.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker('test', failure_exceptions=(UpstreamError,))
+
+    def fail(self):
+        raise UpstreamError()
+
+    def test_opens_after_failure_rate_and_rejects_calls(self):
+        for _ in range(3):
+            with self.assertRaises(UpstreamError):
+                self.breaker.call(self.fail)
+        self.assertEqual(self.breaker.state, 'open')
+
+        func = mock.Mock()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(func)
+        func.assert_not_called()
+
+    def test_ignores_non_failure_exceptions(self):
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                self.breaker.call(mock.Mock(side_effect=ValueError()))
+        self.assertEqual(self.breaker.state, 'closed')
+
+    def test_half_open_allows_one_probe_and_closes_on_success(self):
+        self.breaker._open()
+        self.clock.now += 31
+        self.assertEqual(self.breaker.state, 'half-open')
+
+        self.assertTrue(self.breaker.allow_request())
+        self.assertFalse(self.breaker.allow_request())
+
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, 'closed')
+        self.assertEqual(self.breaker.call(lambda: 'ok'), 'ok')
+
+    def test_failed_probe_reopens(self):
+        self.breaker._open()
+        self.clock.now += 31
+
+        with self.assertRaises(UpstreamError):
+            self.breaker.call(self.fail)
+        self.assertEqual(self.breaker.state, 'open')
+
+    async def test_async_transitions(self):
+        async def fail():
+            raise UpstreamError()
+
+        async def ok():
+            return 'ok'
+
+        for _ in range(3):
+            with self.assertRaises(UpstreamError):
+                await self.breaker.acall(fail)
+        self.assertEqual(self.breaker.state, 'open')
+        with self.assertRaises(CircuitOpenError):
+            await self.breaker.acall(ok)
+
+        self.clock.now += 31
+        self.assertTrue(await self.breaker.aallow_request())
+        self.assertFalse(await self.breaker.aallow_request())
+        await self.breaker.arecord_success()
+        self.assertEqual(await self.breaker.acall(ok), 'ok')
+        self.assertEqual(self.breaker.state, 'closed')
+
+
+class TokenBucketLimiterTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        patcher = mock.patch('config.rate_limit.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = TokenBucketLimiter('test', requests_per_minute=2, tokens_per_minute=100)
+
+    def test_acquire_within_quota_does_not_wait(self):
+        self.limiter.acquire(10, timeout=0)
+        self.limiter.acquire(10, timeout=0)
+
+        self.assertEqual(self.clock.now, 1_000_000.0)
+
+    def test_times_out_when_quota_is_exhausted(self):
+        self.limiter.acquire(10, timeout=0)
+        self.limiter.acquire(10, timeout=0)
+
+        # 다음 요청까지 30초가 필요하므로 10초 안에는 얻지 못함
+        with self.assertRaises(RateLimitTimeout):
+            self.limiter.acquire(10, timeout=10)
+        self.assertEqual(self.clock.now, 1_000_000.0)
+
+    def test_token_budget_is_limited_separately(self):
+        self.limiter.acquire(80, timeout=0)
+
+        with self.assertRaises(RateLimitTimeout):
+            self.limiter.acquire(50, timeout=0)
+
+    def test_waits_for_refill(self):
+        self.limiter.acquire(10, timeout=0)
+        self.limiter.acquire(10, timeout=0)
+
+        # 분당 2건이므로 한 건이 다시 채워질 때까지 30초 대기
+        self.limiter.acquire(10, timeout=60)
+        self.assertAlmostEqual(self.clock.now - 1_000_000.0, 30)
+
+    def test_bucket_refills_over_time(self):
+        self.limiter.acquire(50, timeout=0)
+        self.limiter.acquire(50, timeout=0)
+
+        self.clock.now += 60
+        self.limiter.acquire(100, timeout=0)
+
+    def test_drain_empties_bucket(self):
+        self.limiter.drain()
+
+        with self.assertRaises(RateLimitTimeout):
+            self.limiter.acquire(1, timeout=0)
+
+    async def test_async_acquire_and_drain(self):
+        await self.limiter.aacquire(10, timeout=0)
+        await self.limiter.adrain()
+
+        with self.assertRaises(RateLimitTimeout):
+            await self.limiter.aacquire(1, timeout=0)
+
+
+class CompactEfcyTest(SimpleTestCase):
+    def test_strips_tags_entities_and_whitespace(self):
+        self.assertEqual(compact_efcy('<p>두통,&nbsp; 발열에\n  사용합니다.</p>', 300), '두통, 발열')
+        self.assertEqual(compact_efcy('&lt;p&gt;이 약은 두통에 사용합니다.&lt;/p&gt;', 300), '두통')
+
+    def test_keeps_content_and_drops_duplicate_sentences(self):
+        text = ('이 약은 감기의 제증상(콧물, 코막힘, 발열)의 완화에 사용합니다.\n'
+                '이 약은 감기의 제증상(콧물, 코막힘, 발열)의 완화에 사용합니다. <b>두통</b>에도 사용합니다.')
+
+        self.assertEqual(compact_efcy(text, 300), '감기의 제증상(콧물, 코막힘, 발열)의 완화. 두통')
+
+    def test_caps_estimated_tokens(self):
+        compacted = compact_efcy('가' * 50 + '. ' + '나' * 50, 60)
+
+        self.assertEqual(compacted, '가' * 50)
+        self.assertLessEqual(count_tokens(compact_efcy('가' * 500, 60)), 60)
+
+    def test_summary_key_is_stable_for_identical_compacted_texts(self):
+        variants = [
+            '이 약은 두통, 발열에 사용합니다.',
+            '<p>이 약은 두통,  발열에 사용합니다.</p>',
+            '두통, 발열에 사용합니다. 이 약은 두통, 발열에 사용합니다.',
+        ]
+        self.assertEqual({compact_efcy(text) for text in variants}, {'두통, 발열'})
+        self.assertEqual(len({summary_key(text) for text in variants}), 1)
+
+        self.assertNotEqual(summary_key(variants[0]), summary_key('이 약은 치통에 사용합니다.'))
+        self.assertNotEqual(summary_key(variants[0]), summary_key(variants[0], '두통'))
@@ -22,6 +22,8 @@ from schedules.views import schedule_access, schedule_single, schedule_complete
 from medicines.views import medicine_access
 from tags.views import tags_access
 from search.views import search_medicine,search_for_register
+from search.views_async import search_medicine_async,search_for_register_async
+from search.views_stream import search_medicine_stream
 from pharms.views import pharm_info
 
 urlpatterns = [
@@ -40,6 +42,10 @@ urlpatterns = [
     path('tags', tags_access),
     
     path('search',search_medicine),
+    path('search/async',search_medicine_async),
+    path('search/stream',search_medicine_stream),
+    path('search/', include('search.urls_optimized')),
     path('register',search_for_register),
+    path('register/async',search_for_register_async),
     path('pharm',pharm_info),
 ]
\ No newline at end of file
@@ -1,52 +1,614 @@
-from openai import OpenAI
 import os
-from dotenv import load_dotenv
+import re
+import json
+import html
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import weakref
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from config.circuit_breaker import CircuitBreaker, CircuitOpenError
+from config.rate_limit import TokenBucketLimiter, count_tokens, estimate_tokens
+from config.llm_metrics import (
+    SEARCH_BASIC, SEARCH_CUSTOM, BATCH_TASK, current_call_site, llm_call_site, record_llm_call, arecord_llm_call,
+)
 
-load_dotenv()
 
-client = OpenAI(api_key=os.environ.get('OPENAI_API_KEY'))
+def _openai_setting(key, default):
+    return getattr(settings, 'OPENAI_API_SETTINGS', {}).get(key, default)
 
-    
-def get_efcy_using_openai(efcy_data):
-    respone = client.chat.completions.create(
-        model="gpt-3.5-turbo-1106",
-        messages=[
-            {
-                "role":"system",
-                "content":"당신은 약의 효능정보를 요약해주는 사람입니다. 다음 약 효능 정보를 두세 단어로 요약한 뒤 반환해주세요"
-            },
-            {
-                "role":"user",
-                "content":efcy_data
-            }
-        ],
+# openai 패키지는 import 만으로 수백 ms 가 걸리므로 첫 호출 때 불러옴
+# (.env 는 settings 에서 이미 load_dotenv 로 읽음)
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+
+def _client_options():
+    # 장애 시 워커가 오래 묶이지 않도록 타임아웃/재시도를 짧게 두고 서킷 브레이커로 차단
+    return {
+        'api_key': os.environ.get('OPENAI_API_KEY'),
+        # None 이면 OPENAI_BASE_URL 환경 변수 또는 기본 주소 (부하 테스트 시 가짜 서버로 지정)
+        'base_url': _openai_setting('BASE_URL', None),
+        'timeout': _openai_setting('TIMEOUT', 10),
+        'max_retries': _openai_setting('MAX_RETRIES', 1),
+    }
+
+def get_client():
+    """프로세스 공용 OpenAI 클라이언트 (첫 사용 시 생성)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import OpenAI
+                _client = OpenAI(**_client_options())
+    return _client
+
+def get_async_client():
+    """이벤트 루프별 공용 AsyncOpenAI 클라이언트"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from openai import AsyncOpenAI
+        client = _async_clients[loop] = AsyncOpenAI(**_client_options())
+    return client
+
+def _openai_failures():
+    # 타임아웃/연결 실패/429/5xx 만 장애로 집계 (APITimeoutError 는 APIConnectionError 의 하위 클래스)
+    from openai import APIConnectionError, RateLimitError, InternalServerError
+    return (APIConnectionError, RateLimitError, InternalServerError)
+
+def _is_rate_limited(error):
+    from openai import RateLimitError
+    return isinstance(error, RateLimitError)
+
+breaker = CircuitBreaker('openai', failure_exceptions=_openai_failures)
+# 웹/Celery 워커가 함께 쓰는 분당 요청 수/토큰 수 할당량
+limiter = TokenBucketLimiter(
+    'openai',
+    requests_per_minute=_openai_setting('REQUESTS_PER_MINUTE', 3500),
+    tokens_per_minute=_openai_setting('TOKENS_PER_MINUTE', 90000),
+)
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MODEL = "gpt-3.5-turbo-1106"
+# 프롬프트를 바꾸면 올려서 이전 요약을 재사용하지 않도록 함
+PROMPT_VERSION = 1
+
+_TAG_RE = re.compile(r'<[^>]+>')
+# 문장 끝(마침표 등) 뒤의 공백에서 문장 분리
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+# 두세 단어 요약에 필요 없는 상투 문구 (e약은요 효능 문장은 대부분 '이 약은 ...에 사용합니다.' 형식)
+_BOILERPLATE_RES = (
+    re.compile(r'^이 약은\s*'),
+    re.compile(r'\s*(?:에|에도|으로|로)?\s*(?:사용|복용|투여|쓰)(?:합니다|됩니다|입니다|한다|된다)\.?$'),
+)
+
+
+def _efcy_messages(efcy_data):
+    return [
+        {
+            "role":"system",
+            "content":"당신은 약의 효능정보를 요약해주는 사람입니다. 다음 약 효능 정보를 두세 단어로 요약한 뒤 반환해주세요"
+        },
+        {
+            "role":"user",
+            "content":efcy_data
+        }
+    ]
+
+def _efcy_custom_messages(efcy_data,efcy):
+    return [
+        {
+            "role":"system",
+            "content":"당신은 약의 효능정보를 요약해주는 사람입니다. 입력받은 약 효능 정보를 두세 단어로 요약한 뒤 반환해주세요."
+        },
+        {
+            "role":"user",
+            "content":f"효능정보 {efcy_data}를 키워드 {efcy}를 반드시 넣어서 두세 단어로 요약한 뒤 반환해주세요"
+        }
+    ]
+
+def normalize_efcy(efcy_data):
+    """HTML 태그와 공백 차이를 무시하도록 효능 원문 정규화"""
+    return ' '.join(_TAG_RE.sub(' ', efcy_data or '').split())
+
+def _truncate_tokens(text, budget):
+    """추정 토큰 수가 budget 이하가 되도록 앞에서부터 자름"""
+    ascii_chars = other_chars = 0
+    for index, char in enumerate(text):
+        if ord(char) < 128:
+            ascii_chars += 1
+        else:
+            other_chars += 1
+        if (ascii_chars + 3) // 4 + other_chars > budget:
+            return text[:index]
+    return text
+
+def compact_efcy(efcy_data, max_tokens=None):
+    """
+    요약 요청에 넣을 효능 정보 압축
+    HTML 태그/엔티티와 상투 문구를 지우고, 중복 문장을 빼고, 추정 토큰 수를 max_tokens 이하로 제한
+    """
+    if max_tokens is None:
+        max_tokens = _openai_setting('MAX_INPUT_TOKENS', 300)
+    # 엔티티로 적힌 태그(&lt;p&gt;)나 꺾쇠 머리말(<참고>)도 지워지도록 먼저 unescape
+    text = normalize_efcy(html.unescape(efcy_data or ''))
+
+    sentences = []
+    seen = set()
+    used = 0
+    for sentence in _SENTENCE_RE.split(text):
+        for pattern in _BOILERPLATE_RES:
+            sentence = pattern.sub('', sentence)
+        sentence = sentence.strip(' ,.')
+        key = ''.join(sentence.split())
+        if not key or key in seen:
+            continue
+        seen.add(key)
+
+        tokens = count_tokens(sentence) + (1 if sentences else 0)  # 구분자 '. '
+        if used + tokens > max_tokens:
+            if not sentences:
+                sentences.append(_truncate_tokens(sentence, max_tokens))
+            break
+        sentences.append(sentence)
+        used += tokens
+    return '. '.join(sentences)
+
+def _prompt_input(efcy_data):
+    """(압축한 효능 정보, 원문 대비 줄어든 추정 토큰 수)"""
+    compacted = compact_efcy(efcy_data)
+    return compacted, max(0, count_tokens(efcy_data or '') - count_tokens(compacted))
+
+def summary_key(efcy_data, efcy=None):
+    """
+    (요약 캐시 해시, 프롬프트 종류) - 모델/프롬프트 버전/키워드가 같고 압축한 입력(compact_efcy)이 같으면 같은 해시
+    (태그, 공백, 상투 문구, 중복 문장만 다른 원문은 같은 요약을 재사용)
+    """
+    variant = 'custom' if efcy else 'basic'
+    source = '\x1f'.join([SUMMARY_MODEL, str(PROMPT_VERSION), variant, efcy or '', compact_efcy(efcy_data)])
+    return hashlib.sha256(source.encode('utf-8')).hexdigest(), variant
+
+def _cache_key(content_hash):
+    return f"efcy_summary:{content_hash}"
+
+def _cached_summary(content_hash):
+    summary = cache.get(_cache_key(content_hash))
+    if summary is None:
+        from medicines.models import SummaryCache
+        summary = SummaryCache.objects.filter(content_hash=content_hash).values_list('summary', flat=True).first()
+        if summary is not None:
+            cache.set(_cache_key(content_hash), summary, 86400)
+    return summary
+
+def _store_summary(content_hash, variant, summary):
+    from medicines.models import SummaryCache
+    cache.set(_cache_key(content_hash), summary, 86400)
+    SummaryCache.objects.get_or_create(
+        content_hash=content_hash, defaults={'prompt_variant': variant, 'summary': summary}
+    )
+
+async def _acached_summary(content_hash):
+    summary = await cache.aget(_cache_key(content_hash))
+    if summary is None:
+        from medicines.models import SummaryCache
+        summary = await SummaryCache.objects.filter(content_hash=content_hash).values_list('summary', flat=True).afirst()
+        if summary is not None:
+            await cache.aset(_cache_key(content_hash), summary, 86400)
+    return summary
+
+async def _astore_summary(content_hash, variant, summary):
+    from medicines.models import SummaryCache
+    await cache.aset(_cache_key(content_hash), summary, 86400)
+    await SummaryCache.objects.aget_or_create(
+        content_hash=content_hash, defaults={'prompt_variant': variant, 'summary': summary}
+    )
+
+def _create_completion(site, tokens_saved=0, **kwargs):
+    """
+    할당량(토큰 버킷)을 얻은 뒤 서킷 브레이커를 거쳐 OpenAI 호출
+    지연 시간/토큰/오류와 입력 압축으로 줄인 토큰 수(tokens_saved)를 site(호출 위치)별로 기록
+    """
+    limiter.acquire(estimate_tokens(kwargs['messages'], kwargs.get('max_tokens')), _openai_setting('RATE_LIMIT_WAIT', 10))
+    started = time.monotonic()
+    try:
+        response = breaker.call(get_client().chat.completions.create, **kwargs)
+    except Exception as e:
+        if _is_rate_limited(e):
+            limiter.drain()
+        if not isinstance(e, CircuitOpenError):
+            record_llm_call(site, kwargs['model'], time.monotonic() - started, error=e)
+        raise
+    record_llm_call(site, kwargs['model'], time.monotonic() - started, usage=getattr(response, 'usage', None),
+                    tokens_saved=tokens_saved)
+    return response
+
+async def _acreate_completion(site, tokens_saved=0, **kwargs):
+    await limiter.aacquire(estimate_tokens(kwargs['messages'], kwargs.get('max_tokens')), _openai_setting('RATE_LIMIT_WAIT', 10))
+    started = time.monotonic()
+    try:
+        response = await breaker.acall(get_async_client().chat.completions.create, **kwargs)
+    except Exception as e:
+        if _is_rate_limited(e):
+            await limiter.adrain()
+        if not isinstance(e, CircuitOpenError):
+            await arecord_llm_call(site, kwargs['model'], time.monotonic() - started, error=e)
+        raise
+    await arecord_llm_call(site, kwargs['model'], time.monotonic() - started, usage=getattr(response, 'usage', None),
+                           tokens_saved=tokens_saved)
+    return response
+
+def _with_context(func):
+    """스레드 풀 작업에 호출한 쪽의 컨텍스트(LLM 호출 위치)를 전달"""
+    context = contextvars.copy_context()
+    return lambda *args: context.copy().run(func, *args)
+
+def _summarize(messages, site, tokens_saved=0):
+    respone = _create_completion(
+        site,
+        tokens_saved,
+        model=SUMMARY_MODEL,
+        messages=messages,
         temperature=0.5,
         max_tokens=100,
         n=1,
     )
     return (respone.choices[0].message.content).strip()
 
-def get_efcy_using_openai_custom(efcy_data,efcy):
-    respone = client.chat.completions.create(
-        model="gpt-3.5-turbo-1106",
-        messages=[
-            {
-                "role":"system",
-                "content":"당신은 약의 효능정보를 요약해주는 사람입니다. 입력받은 약 효능 정보를 두세 단어로 요약한 뒤 반환해주세요."
-            },
-            {
-                "role":"user",
-                "content":f"효능정보 {efcy_data}를 키워드 {efcy}를 반드시 넣어서 두세 단어로 요약한 뒤 반환해주세요"
-            }
-        ],
+async def _asummarize(messages, site, tokens_saved=0):
+    respone = await _acreate_completion(
+        site,
+        tokens_saved,
+        model=SUMMARY_MODEL,
+        messages=messages,
         temperature=0.5,
         max_tokens=100,
         n=1,
     )
     return (respone.choices[0].message.content).strip()
 
+def _summary_with_cache(efcy_data, efcy=None):
+    """같은 입력(압축 후)의 요약이 있으면 재사용하고, 없으면 OpenAI 호출 후 저장"""
+    content_hash, variant = summary_key(efcy_data, efcy)
+    summary = _cached_summary(content_hash)
+    if summary is not None:
+        return summary
+
+    compacted, tokens_saved = _prompt_input(efcy_data)
+    messages = _efcy_custom_messages(compacted, efcy) if efcy else _efcy_messages(compacted)
+    summary = _summarize(messages, current_call_site(SEARCH_CUSTOM if efcy else SEARCH_BASIC), tokens_saved)
+    _store_summary(content_hash, variant, summary)
+    return summary
+
+async def _asummary_with_cache(efcy_data, efcy=None):
+    content_hash, variant = summary_key(efcy_data, efcy)
+    summary = await _acached_summary(content_hash)
+    if summary is not None:
+        return summary
+
+    compacted, tokens_saved = _prompt_input(efcy_data)
+    messages = _efcy_custom_messages(compacted, efcy) if efcy else _efcy_messages(compacted)
+    summary = await _asummarize(messages, current_call_site(SEARCH_CUSTOM if efcy else SEARCH_BASIC), tokens_saved)
+    await _astore_summary(content_hash, variant, summary)
+    return summary
+
+def get_efcy_using_openai(efcy_data):
+    return _summary_with_cache(efcy_data)
+
+def get_efcy_using_openai_custom(efcy_data,efcy):
+    return _summary_with_cache(efcy_data, efcy)
+
+async def aget_efcy_using_openai(efcy_data):
+    return await _asummary_with_cache(efcy_data)
+
+async def aget_efcy_using_openai_custom(efcy_data,efcy):
+    return await _asummary_with_cache(efcy_data, efcy)
+
+def _max_concurrency():
+    return _openai_setting('MAX_CONCURRENCY', 5)
+
+def _summarize_in_thread(efcy_data, efcy=None):
+    """스레드 풀 작업용 요약 (실패 시 None)"""
+    try:
+        if efcy:
+            return get_efcy_using_openai_custom(efcy_data, efcy)
+        return get_efcy_using_openai(efcy_data)
+    except Exception as e:
+        logger.error(f"효능 요약 실패: {str(e)}")
+        return None
+    finally:
+        # 요약 캐시 조회로 열린 스레드별 DB 커넥션 정리
+        connections.close_all()
+
+def summarize_efcy_concurrently(efcy_list, efcy=None, max_workers=None):
+    """
+    여러 효능 정보를 스레드 풀에서 동시에 요약
+    입력 순서를 유지하며, 실패한 항목(서킷이 열린 경우 포함)은 None 으로 반환
+    """
+    if not efcy_list:
+        return []
+
+    # 정규화 후 같은 원문은 한 번만 요약 (빈 원문은 요청하지 않고 None)
+    unique = {}
+    for efcy_data in efcy_list:
+        key = normalize_efcy(efcy_data)
+        if key:
+            unique.setdefault(key, efcy_data)
+    if not unique:
+        return [None] * len(efcy_list)
+
+    if max_workers is None:
+        max_workers = _max_concurrency()
+    max_workers = max(1, min(max_workers, len(unique)))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        summaries = dict(zip(unique, executor.map(_with_context(_summarize_in_thread), unique.values(), [efcy] * len(unique))))
+    return [summaries.get(normalize_efcy(efcy_data)) for efcy_data in efcy_list]
+
+def iter_efcy_summaries(efcy_list, efcy=None, max_workers=None):
+    """
+    summarize_efcy_concurrently 와 같지만 요약이 끝나는 순서대로 (입력 인덱스, 요약) 를 반환 (스트리밍 응답용)
+    소비 도중 중단되면 아직 시작하지 않은 요약은 취소
+    """
+    positions = {}
+    for index, efcy_data in enumerate(efcy_list):
+        key = normalize_efcy(efcy_data)
+        if not key:
+            # 빈 원문은 요청하지 않고 바로 None
+            yield index, None
+            continue
+        positions.setdefault(key, []).append(index)
+    if not positions:
+        return
+
+    if max_workers is None:
+        max_workers = _max_concurrency()
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(positions))))
+    try:
+        futures = {
+            executor.submit(_with_context(_summarize_in_thread), efcy_list[indexes[0]], efcy): key
+            for key, indexes in positions.items()
+        }
+        for future in as_completed(futures):
+            summary = future.result()
+            for index in positions[futures[future]]:
+                yield index, summary
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+async def asummarize_efcy_concurrently(efcy_list, efcy=None, max_concurrency=None):
+    """
+    summarize_efcy_concurrently 의 asyncio 버전
+    세마포어로 동시 요청 수를 제한하며, 입력 순서를 유지
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or _max_concurrency())
+
+    async def summarize(efcy_data):
+        async with semaphore:
+            try:
+                if efcy:
+                    return await aget_efcy_using_openai_custom(efcy_data, efcy)
+                return await aget_efcy_using_openai(efcy_data)
+            except Exception as e:
+                logger.error(f"효능 요약 실패: {str(e)}")
+                return None
+
+    # 빈 원문은 요청하지 않고 None
+    unique = {}
+    for efcy_data in efcy_list:
+        key = normalize_efcy(efcy_data)
+        if key:
+            unique.setdefault(key, efcy_data)
+
+    summaries = dict(zip(unique, await asyncio.gather(*(summarize(efcy_data) for efcy_data in unique.values()))))
+    return [summaries.get(normalize_efcy(efcy_data)) for efcy_data in efcy_list]
+
+# ==================== 배치 요약 ====================
+
+def _batch_messages(entries, efcy=None):
+    """entries: [(id, 효능 원문)] 를 한 요청으로 묶은 프롬프트 (JSON 으로 항목별 응답)"""
+    keyword_rule = f" 각 요약에는 키워드 {efcy}를 반드시 넣어주세요." if efcy else ""
+    return [
+        {
+            "role":"system",
+            "content":"당신은 약의 효능정보를 요약해주는 사람입니다. 입력된 각 약 효능 정보를 두세 단어로 요약해주세요."
+                      f"{keyword_rule}"
+                      ' 반드시 {"summaries": [{"id": 입력 id, "summary": 요약}]} 형식의 JSON 으로만 응답해주세요.'
+        },
+        {
+            "role":"user",
+            "content":json.dumps([{"id": entry_id, "text": text} for entry_id, text in entries], ensure_ascii=False)
+        }
+    ]
+
+def parse_batch_summaries(content):
+    """배치 요약 응답(JSON)을 {id: 요약} 으로 변환 (형식이 틀린 항목은 제외)"""
+    try:
+        data = json.loads(content)
+    except (TypeError, ValueError):
+        logger.error(f"배치 요약 응답 파싱 실패: {str(content)[:200]}")
+        return {}
+
+    summaries = {}
+    for entry in (data.get('summaries') if isinstance(data, dict) else None) or []:
+        if not isinstance(entry, dict):
+            continue
+        summary = entry.get('summary')
+        if entry.get('id') is not None and isinstance(summary, str) and summary.strip():
+            summaries[str(entry['id'])] = summary.strip()
+    return summaries
+
+def _summarize_chunk(entries, efcy=None, tokens_saved=0):
+    """한 번의 OpenAI 요청으로 여러 효능 정보 요약 ({id: 요약}, 빠진 항목은 호출한 쪽에서 처리)"""
+    respone = _create_completion(
+        current_call_site(BATCH_TASK),
+        tokens_saved,
+        model=SUMMARY_MODEL,
+        messages=_batch_messages(entries, efcy),
+        temperature=0.5,
+        max_tokens=40 * len(entries) + 50,
+        response_format={"type": "json_object"},
+        n=1,
+    )
+    return parse_batch_summaries(respone.choices[0].message.content)
+
+def _cached_summaries(content_hashes):
+    """요약 캐시에서 여러 해시를 한 번에 조회 ({해시: 요약})"""
+    from medicines.models import SummaryCache
+    found = {
+        key.split(':', 1)[1]: summary
+        for key, summary in cache.get_many([_cache_key(content_hash) for content_hash in content_hashes]).items()
+    }
+    missing = [content_hash for content_hash in content_hashes if content_hash not in found]
+    if missing:
+        from_db = dict(SummaryCache.objects.filter(content_hash__in=missing).values_list('content_hash', 'summary'))
+        cache.set_many({_cache_key(content_hash): summary for content_hash, summary in from_db.items()}, 86400)
+        found.update(from_db)
+    return found
+
+def store_summaries(entries):
+    """entries: [(해시, 프롬프트 종류, 요약)] 를 요약 캐시에 일괄 저장"""
+    from medicines.models import SummaryCache
+    cache.set_many({_cache_key(content_hash): summary for content_hash, _, summary in entries}, 86400)
+    SummaryCache.objects.bulk_create(
+        [
+            SummaryCache(content_hash=content_hash, prompt_variant=variant, summary=summary)
+            for content_hash, variant, summary in entries
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+def _batch_size():
+    return _openai_setting('BATCH_SIZE', 20)
+
+def summarize_efcy_batch(efcy_list, efcy=None, batch_size=None, max_workers=None):
+    """
+    여러 효능 정보를 batch_size 개씩 한 요청에 묶어 요약 (카탈로그 사전 처리용)
+    - 요약 캐시에 있는 원문과 중복 원문은 요청하지 않음
+    - 묶음 요청 응답에서 빠진 항목은 개별 요청으로 다시 요약
+    입력 순서를 유지하며, 실패한 항목은 None 으로 반환
+    """
+    if not efcy_list:
+        return []
+
+    keys = [summary_key(efcy_data, efcy) if efcy_data else None for efcy_data in efcy_list]
+    sources = {}
+    for key, efcy_data in zip(keys, efcy_list):
+        if key is not None:
+            sources.setdefault(key[0], (key[1], efcy_data))
+
+    summaries = _cached_summaries(list(sources))
+    pending = [(content_hash, _prompt_input(efcy_data)) for content_hash, (_, efcy_data) in sources.items()
+               if content_hash not in summaries]
+    batch_size = max(1, batch_size or _batch_size())
+    chunks = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    def summarize(chunk):
+        try:
+            # 프롬프트 토큰을 줄이려고 해시 대신 묶음 내 순번을 id 로 사용
+            result = _summarize_chunk(
+                [(str(i), text) for i, (_, (text, _)) in enumerate(chunk)], efcy,
+                sum(tokens_saved for _, (_, tokens_saved) in chunk),
+            )
+            return {content_hash: result[str(i)] for i, (content_hash, _) in enumerate(chunk) if str(i) in result}
+        except Exception as e:
+            logger.error(f"배치 요약 실패 ({len(chunk)}개): {str(e)}")
+            return {}
+        finally:
+            connections.close_all()
+
+    if chunks:
+        workers = max(1, min(max_workers or _max_concurrency(), len(chunks)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = {}
+            for chunk_result in executor.map(_with_context(summarize), chunks):
+                results.update(chunk_result)
+
+        store_summaries([(content_hash, sources[content_hash][0], results[content_hash])
+                         for content_hash, _ in pending if content_hash in results])
+        summaries.update({content_hash: results[content_hash] for content_hash, _ in pending if content_hash in results})
+
+        # 응답에서 빠진 항목만 개별 요청 (개별 요청 결과는 요약 캐시에 저장됨)
+        leftover = [content_hash for content_hash, _ in pending if content_hash not in results]
+        if leftover:
+            logger.warning(f"배치 응답에서 빠진 {len(leftover)}개 항목 개별 요약")
+            with llm_call_site(current_call_site(BATCH_TASK)):
+                retried = summarize_efcy_concurrently([sources[content_hash][1] for content_hash in leftover], efcy)
+            summaries.update({content_hash: summary for content_hash, summary in zip(leftover, retried) if summary})
+
+    return [summaries.get(key[0]) if key is not None else None for key in keys]
+
+def export_summary_batch_jsonl(efcy_list, fp, efcy=None, seen=None):
+    """
+    OpenAI Batch API 입력 JSONL 작성 (요약 캐시에 없는 원문만, custom_id 는 요약 캐시 해시)
+    여러 번 나눠 호출할 때는 같은 seen(set) 을 넘겨야 이전 호출에서 작성한 원문이 중복되지 않음
+    작성한 요청 수 반환
+    """
+    if seen is None:
+        seen = set()
+    sources = {}
+    for efcy_data in efcy_list:
+        if efcy_data:
+            content_hash, _ = summary_key(efcy_data, efcy)
+            if content_hash not in seen:
+                sources.setdefault(content_hash, efcy_data)
+    seen.update(sources)
+    cached = _cached_summaries(list(sources))
+
+    count = 0
+    for content_hash, efcy_data in sources.items():
+        if content_hash in cached:
+            continue
+        request = {
+            "custom_id": content_hash,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": SUMMARY_MODEL,
+                "messages": _efcy_custom_messages(compact_efcy(efcy_data), efcy) if efcy else _efcy_messages(compact_efcy(efcy_data)),
+                "temperature": 0.5,
+                "max_tokens": 100,
+            },
+        }
+        fp.write(json.dumps(request, ensure_ascii=False) + '\n')
+        count += 1
+    return count
+
+def import_summary_batch_jsonl(fp, efcy=None):
+    """
+    OpenAI Batch API 결과 JSONL 을 요약 캐시에 저장 (이후 요약 요청은 캐시에서 응답)
+    (저장한 수, 실패한 수) 반환
+    """
+    variant = 'custom' if efcy else 'basic'
+    entries = []
+    failed = 0
+    for line in fp:
+        if not line.strip():
+            continue
+        try:
+            result = json.loads(line)
+            response = result.get('response') or {}
+            if response.get('status_code') != 200:
+                raise ValueError(result.get('error') or response.get('status_code'))
+            summary = response['body']['choices'][0]['message']['content'].strip()
+            entries.append((result['custom_id'], variant, summary))
+        except (ValueError, KeyError, IndexError, TypeError, AttributeError) as e:
+            failed += 1
+            logger.error(f"배치 결과 항목 처리 실패: {str(e)}")
+    if entries:
+        store_summaries(entries)
+    return len(entries), failed
+
 def opening_hours(start,end):
     if start is None or end is None:
         return 'Closed'
     data = start + '~' + end
-    return data
\ No newline at end of file
+    return data
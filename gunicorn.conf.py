@@ -1,6 +1,8 @@
 import os
 from datetime import datetime
 workers = 3
+# ASGI(config.asgi:application)로 async 검색 뷰를 서빙할 때는 uvicorn.workers.UvicornWorker 지정
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'sync')
 bind = 'unix:/run/gunicorn.sock'
 accesslog = f"./logs/gunicorn/access_{datetime.now().strftime('%Y_%m_%d')}.log"
 errorlog = f"./logs/gunicorn/error_{datetime.now().strftime('%Y_%m_%d')}.log"
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""약물명 자동완성 (/register)
+
+MedicineCache.item_name 을 자모열/초성열 기준으로 정렬한 배열에 담아
+접두사와 초성 검색을 이진 탐색으로 처리한다.
+"""
+from bisect import bisect_left, insort
+
+from config.hangul import chosung, decompose, is_chosung_query
+from .fuzzy import correct_medicine_names
+from .search_index import CatalogIndex, normalize_name, search_medicine_names
+
+
+class MedicineAutocomplete:
+    """자모/초성 정렬 배열 기반 약물명 접두사 검색"""
+
+    def __init__(self, names=()):
+        self._names = set(names)
+        self._jamo = sorted((decompose(normalize_name(name)), name) for name in self._names)
+        self._chosung = sorted((chosung(normalize_name(name)), name) for name in self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        if not name or name in self._names:
+            return
+        self._names.add(name)
+        insort(self._jamo, (decompose(normalize_name(name)), name))
+        insort(self._chosung, (chosung(normalize_name(name)), name))
+
+    def remove(self, name):
+        if name not in self._names:
+            return
+        self._names.discard(name)
+        for keys, key in ((self._jamo, decompose(normalize_name(name))), (self._chosung, chosung(normalize_name(name)))):
+            i = bisect_left(keys, (key, name))
+            if i < len(keys) and keys[i] == (key, name):
+                del keys[i]
+
+    def search(self, query, limit=10):
+        """접두사(자모 단위) 또는 초성으로 시작하는 약물명"""
+        query = normalize_name(query)
+        if not query:
+            return []
+        if is_chosung_query(query):
+            keys, prefix = self._chosung, query
+        else:
+            keys, prefix = self._jamo, decompose(query)
+
+        results = []
+        i = bisect_left(keys, (prefix,))
+        while i < len(keys) and len(results) < limit and keys[i][0].startswith(prefix):
+            results.append(keys[i][1])
+            i += 1
+        return results
+
+
+_index = CatalogIndex(MedicineAutocomplete)
+
+def get_autocomplete():
+    """프로세스 공용 자동완성 색인 (약물 목록 버전에 맞춰 동기화)"""
+    return _index.get()
+
+def add_medicine_name(name):
+    """현재 프로세스의 색인에 바로 반영 (signals 에서 호출)"""
+    _index.add(name)
+
+def remove_medicine_name(name):
+    _index.remove(name)
+
+def suggest_medicine_names(query, limit=10):
+    """자동완성 -> n-gram 부분 문자열 -> 오타 교정 순으로 로컬 약물 목록에서 약물명 검색"""
+    names = get_autocomplete().search(query, limit)
+    if not names:
+        names = [medicine.item_name for medicine in search_medicine_names(query, limit)]
+    if not names:
+        names = correct_medicine_names(query, limit)
+    return names
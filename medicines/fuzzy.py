@@ -0,0 +1,154 @@
+"""약물명 오타 교정
+
+SymSpell 방식의 삭제 사전으로 자모 단위 편집 거리 안의 약물명을 찾는다.
+약물명을 자모열로 분해한 뒤 앞부분(접두사)의 길이별 삭제 변형을 미리 색인해 두고,
+검색어의 삭제 변형으로 후보 접두사를 찾은 다음 편집 거리로 확인한다.
+검색어는 약물명 전체가 아니라 앞부분(예: '타이래놀' -> '타이레놀정500밀리그람')과 비교한다.
+"""
+from collections import defaultdict
+
+from django.conf import settings
+
+from config.hangul import decompose
+from .search_index import CatalogIndex, normalize_name
+
+
+def _setting(key, default):
+    return getattr(settings, 'FUZZY_SEARCH_SETTINGS', {}).get(key, default)
+
+def _deletes(text, max_distance):
+    """text 에서 최대 max_distance 글자를 지운 모든 문자열 (원문 포함)"""
+    variants = {text}
+    frontier = {text}
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+def prefix_distance(query, text, max_distance):
+    """
+    query 와 text 의 앞부분(길이 len(query) ± max_distance) 사이 최소 편집 거리
+    (인접 문자 교환 포함, 초과하면 max_distance + 1)
+    """
+    n = len(query)
+    text = text[:n + max_distance]
+    previous2 = None
+    previous = list(range(len(text) + 1))
+    for i in range(1, n + 1):
+        current = [i] + [0] * len(text)
+        for j in range(1, len(text) + 1):
+            cost = 0 if query[i - 1] == text[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and query[i - 1] == text[j - 2] and query[i - 2] == text[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+
+    window = previous[max(0, n - max_distance):n + max_distance + 1]
+    return min(min(window, default=max_distance + 1), max_distance + 1)
+
+
+class FuzzyNameMatcher:
+    """자모 접두사 삭제 사전 기반 약물명 오타 교정"""
+
+    def __init__(self, names=(), max_distance=None, prefix_length=None, min_length=None):
+        self.max_distance = max_distance if max_distance is not None else _setting('MAX_EDIT_DISTANCE', 1)
+        # 색인하는 자모 접두사 길이 범위 (짧은 검색어는 오타 교정하지 않음)
+        self.prefix_length = prefix_length or _setting('PREFIX_LENGTH', 10)
+        self.min_length = min_length or _setting('MIN_QUERY_LENGTH', 5)
+        self._names = {}                   # 약물명 -> 자모열
+        self._prefixes = defaultdict(set)  # 자모 접두사 -> 약물명
+        # 삭제 변형의 해시 -> 자모 접두사 (하나면 문자열, 여럿이면 set)
+        # 메모리를 줄이려고 변형 문자열 대신 해시를 키로 쓰고, 충돌로 늘어난 후보는 편집 거리 확인에서 걸러짐
+        self._deletes = {}
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._names)
+
+    def add(self, name):
+        if not name or name in self._names:
+            return
+        jamo = decompose(normalize_name(name))
+        if len(jamo) < self.min_length:
+            return
+        self._names[name] = jamo
+        prefix = jamo[:self.prefix_length]
+        if prefix not in self._prefixes:
+            variants = set()
+            for length in range(self.min_length, len(prefix) + 1):
+                variants |= _deletes(prefix[:length], self.max_distance)
+            for variant in variants:
+                self._add_delete(hash(variant), prefix)
+        self._prefixes[prefix].add(name)
+
+    def _add_delete(self, key, prefix):
+        current = self._deletes.get(key)
+        if current is None:
+            self._deletes[key] = prefix
+        elif isinstance(current, set):
+            current.add(prefix)
+        elif current != prefix:
+            self._deletes[key] = {current, prefix}
+
+    def remove(self, name):
+        jamo = self._names.pop(name, None)
+        if jamo is None:
+            return
+        # 삭제 변형은 그대로 두고 빈 접두사는 조회 시 걸러짐
+        self._prefixes[jamo[:self.prefix_length]].discard(name)
+
+    def search(self, query, limit=10):
+        """편집 거리가 가까운 순, 같은 거리면 짧은 이름 순의 약물명"""
+        query = decompose(normalize_name(query))
+        if len(query) < self.min_length:
+            return []
+        # 짧은 검색어에 큰 오차를 허용하면 엉뚱한 약이 걸리므로 길이에 비례해 제한
+        budget = min(self.max_distance, len(query) // self.min_length)
+        head = query[:self.prefix_length]
+
+        candidates = set()
+        for variant in _deletes(head, budget):
+            found = self._deletes.get(hash(variant))
+            if isinstance(found, set):
+                candidates |= found
+            elif found is not None:
+                candidates.add(found)
+
+        results = []
+        for prefix in candidates:
+            names = self._prefixes[prefix]
+            if not names:
+                continue
+            if len(query) + budget <= len(prefix):
+                # 비교 범위가 접두사 안에 있으면 같은 접두사의 약물명은 거리가 같음
+                distance = prefix_distance(query, prefix, budget)
+                if distance <= budget:
+                    results.extend((distance, len(name), name) for name in names)
+                continue
+            for name in names:
+                distance = prefix_distance(query, self._names[name], budget)
+                if distance <= budget:
+                    results.append((distance, len(name), name))
+
+        results.sort()
+        return [name for _, _, name in results[:limit]]
+
+
+_index = CatalogIndex(FuzzyNameMatcher)
+
+def get_fuzzy_matcher():
+    """프로세스 공용 오타 교정 색인 (약물 목록 버전에 맞춰 동기화)"""
+    return _index.get()
+
+def add_medicine_name(name):
+    _index.add(name)
+
+def remove_medicine_name(name):
+    _index.remove(name)
+
+def correct_medicine_names(query, limit=10):
+    """오타가 있는 약물명 검색어와 가까운 약물명"""
+    return get_fuzzy_matcher().search(query, limit)
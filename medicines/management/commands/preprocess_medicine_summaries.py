@@ -1,9 +1,9 @@
-import requests
 import time
 from django.core.management.base import BaseCommand
-from django.utils import timezone
-from medicines.models import MedicineCache
-from config.utils import get_efcy_using_openai
+from medicines.tasks import new_api_items, save_medicines_from_api
+from config.utils import summarize_efcy_batch, export_summary_batch_jsonl, import_summary_batch_jsonl
+from config.public_data import fetch_drug_list
+from config.llm_metrics import get_llm_metrics, llm_call_site, PREPROCESS
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,8 +21,8 @@ class Command(BaseCommand):
         parser.add_argument(
             '--delay',
             type=float,
-            default=1.0,
-            help='API 호출 간 딜레이 (초, 기본: 1.0)'
+            default=0,
+            help='페이지 간 딜레이 (초, 기본: 0)'
         )
         parser.add_argument(
             '--max-items',
@@ -30,105 +30,131 @@ class Command(BaseCommand):
             default=None,
             help='처리할 최대 아이템 수 (테스트용)'
         )
+        parser.add_argument(
+            '--llm-batch-size',
+            type=int,
+            default=None,
+            help='OpenAI 요청 1회에 묶어 요약할 효능 정보 수 (기본: OPENAI_API_SETTINGS BATCH_SIZE)'
+        )
+        parser.add_argument(
+            '--export-batch',
+            metavar='PATH',
+            default=None,
+            help='요약하지 않고 OpenAI Batch API 입력 JSONL 만 작성'
+        )
+        parser.add_argument(
+            '--import-batch',
+            metavar='PATH',
+            default=None,
+            help='OpenAI Batch API 결과 JSONL 을 요약 캐시에 저장 (이후 실행은 캐시된 요약 사용)'
+        )
 
     def handle(self, *args, **options):
+        if options['import_batch']:
+            self._import_batch(options['import_batch'])
+            return
+
         batch_size = options['batch_size']
         delay = options['delay']
         max_items = options['max_items']
-        
+        llm_batch_size = options['llm_batch_size']
+        export_path = options['export_batch']
+
         self.stdout.write("약물 정보 사전 처리를 시작합니다...")
-        
-        # 공공데이터 API에서 전체 약물 목록 가져오기
-        base_url = "http://apis.data.go.kr/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList"
-        service_key = "C0OCzqNhw6sohn5jE2c1L52H4YKftzf9U8nxGSsC5GqH1YzH4Uu9VJ18zMHmpBrOEPgm3jqSOUpHh3j1oLcwLw%3D%3D"
-        
+
         processed_count = 0
         success_count = 0
         error_count = 0
+        exported_count = 0
         page_no = 1
-        
-        while True:
-            try:
-                # 페이지별로 약물 정보 가져오기
-                params = {
-                    "serviceKey": service_key,
-                    "type": "json",
-                    "numOfRows": batch_size,
-                    "pageNo": page_no
-                }
-                
-                response = requests.get(base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
-                
-                if data['body']['totalCount'] == 0 or not data['body'].get('items'):
-                    break
-                
-                items = data['body']['items']
-                
-                for item in items:
-                    if max_items and processed_count >= max_items:
+        export_file = open(export_path, 'w', encoding='utf-8') if export_path else None
+        # 페이지를 넘어 같은 원문이 다시 나와도 요청은 한 번만 작성
+        exported_hashes = set()
+        started = time.monotonic()
+        llm_before = get_llm_metrics()[PREPROCESS]
+
+        try:
+            while True:
+                try:
+                    # 공공데이터 API에서 페이지별로 약물 정보 가져오기
+                    page = fetch_drug_list(page_no=page_no, num_of_rows=batch_size, timeout=30)
+
+                    if page.total_count == 0 or not page.items:
                         break
-                        
-                    try:
-                        # 이미 처리된 약물인지 확인
-                        if MedicineCache.objects.filter(item_name=item['itemName']).exists():
-                            self.stdout.write(f"이미 처리됨: {item['itemName']}")
-                            continue
-                        
-                        # OpenAI API로 효능 요약
-                        self.stdout.write(f"처리 중: {item['itemName']}")
-                        
-                        efcy_summary = None
-                        if item.get('efcyQesitm'):
-                            efcy_summary = get_efcy_using_openai(item['efcyQesitm'])
-                            time.sleep(delay)  # API 레이트 리미트 방지
-                        
-                        # DB에 저장
-                        MedicineCache.objects.create(
-                            item_name=item['itemName'],
-                            efcy_original=item.get('efcyQesitm', ''),
-                            efcy_summary=efcy_summary or '효능 정보 없음',
-                            item_image=item.get('itemImage', ''),
-                            atpn_qesitm=item.get('atpnQesitm', ''),
-                            intrc_qesitm=item.get('intrcQesitm', ''),
-                            use_method_qesitm=item.get('useMethodQesitm', ''),
-                            se_qesitm=item.get('seQesitm', ''),
-                            # 메타 정보
-                            created_from_api=True,
-                            last_updated=timezone.now()
-                        )
-                        
-                        success_count += 1
-                        processed_count += 1
-                        
-                        if processed_count % 10 == 0:
-                            self.stdout.write(f"진행률: {processed_count}개 처리 완료")
-                            
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"약물 처리 실패 {item['itemName']}: {str(e)}")
-                        self.stdout.write(
-                            self.style.ERROR(f"오류: {item['itemName']} - {str(e)}")
+
+                    # 이미 처리된 약물은 한 번의 쿼리로 걸러냄
+                    items = new_api_items(page.items)
+                    self.stdout.write(f"페이지 {page_no}: 새 약물 {len(items)}개 / {len(page.items)}개")
+                    if max_items:
+                        items = items[:max_items - processed_count]
+
+                    if export_file:
+                        exported_count += export_summary_batch_jsonl(
+                            [item.get('efcyQesitm') for item in items], export_file, seen=exported_hashes
                         )
-                        continue
-                
-                if max_items and processed_count >= max_items:
+                        processed_count += len(items)
+                    elif items:
+                        # 효능 정보를 묶음 요청으로 요약한 뒤 일괄 저장
+                        with llm_call_site(PREPROCESS):
+                            summaries = summarize_efcy_batch(
+                                [item.get('efcyQesitm') for item in items], batch_size=llm_batch_size
+                            )
+                        failed = sum(1 for item, summary in zip(items, summaries)
+                                     if item.get('efcyQesitm') and summary is None)
+                        success_count += save_medicines_from_api(items, summaries)
+                        error_count += failed
+                        processed_count += len(items)
+                        self.stdout.write(f"진행률: {processed_count}개 처리 완료 (요약 실패 {failed}개)")
+
+                    if max_items and processed_count >= max_items:
+                        break
+
+                    if page_no * batch_size >= page.total_count:
+                        break
+                    page_no += 1
+                    if delay:
+                        time.sleep(delay)
+
+                except Exception as e:
+                    logger.error(f"페이지 {page_no} 처리 실패: {str(e)}")
+                    self.stdout.write(self.style.ERROR(f"페이지 오류: {str(e)}"))
                     break
-                    
-                page_no += 1
-                
-            except Exception as e:
-                logger.error(f"페이지 {page_no} 처리 실패: {str(e)}")
-                self.stdout.write(self.style.ERROR(f"페이지 오류: {str(e)}"))
-                break
-        
-        # 결과 출력
+        finally:
+            if export_file:
+                export_file.close()
+
+        if export_path:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\nBatch 입력 작성 완료!\n"
+                    f"- 대상 약물: {processed_count}개\n"
+                    f"- 요청 수 (중복/캐시된 원문 제외): {exported_count}개\n"
+                    f"- 파일: {export_path}"
+                )
+            )
+            return
+
+        # 결과 출력 (OpenAI 사용량은 이번 실행분만)
+        llm_after = get_llm_metrics()[PREPROCESS]
+        llm_usage = {key: llm_after[key] - llm_before[key]
+                     for key in ('calls', 'prompt_tokens', 'completion_tokens', 'input_tokens_saved')}
         self.stdout.write(
             self.style.SUCCESS(
-                f"\n처리 완료!\n"
+                f"\n처리 완료! ({time.monotonic() - started:.1f}초)\n"
                 f"- 전체 처리: {processed_count}개\n"
                 f"- 성공: {success_count}개\n"
-                f"- 실패: {error_count}개"
+                f"- 실패: {error_count}개\n"
+                f"- OpenAI 요청: {llm_usage['calls']}회, 토큰 {llm_usage['prompt_tokens']}+{llm_usage['completion_tokens']}"
+                f" (입력 압축으로 약 {llm_usage['input_tokens_saved']} 토큰 절감)"
+            )
+        )
+
+    def _import_batch(self, path):
+        with open(path, encoding='utf-8') as fp:
+            saved, failed = import_summary_batch_jsonl(fp)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Batch 결과 저장 완료: {saved}개 (실패 {failed}개)\n"
+                f"이제 옵션 없이 다시 실행하면 저장된 요약으로 약물 정보를 채웁니다."
             )
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from medicines.models import MedicineCache
+from medicines.search_index import index_medicine_efcy, index_medicine_names
+
+
+class Command(BaseCommand):
+    help = 'MedicineCache 전체의 검색 색인을 다시 생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='한 번에 색인할 약물 수 (기본: 500)'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        total = MedicineCache.objects.count()
+        self.stdout.write(f"검색 색인 재생성 시작: {total}개")
+
+        chunk = []
+        indexed = 0
+        for medicine in MedicineCache.objects.order_by('id').iterator(chunk_size=chunk_size):
+            chunk.append(medicine)
+            if len(chunk) >= chunk_size:
+                index_medicine_names(chunk)
+                index_medicine_efcy(chunk)
+                indexed += len(chunk)
+                chunk = []
+                self.stdout.write(f"진행률: {indexed}/{total}")
+        index_medicine_names(chunk)
+        index_medicine_efcy(chunk)
+        indexed += len(chunk)
+
+        self.stdout.write(self.style.SUCCESS(f"색인 완료: {indexed}개"))
@@ -33,6 +33,60 @@ class MedicineCache(models.Model):
     def __str__(self):
         return f"{self.item_name} - {self.efcy_summary[:50]}"
 
+class MedicineNameGram(models.Model):
+    """약물명 부분 문자열 검색용 2글자 n-gram 색인"""
+    gram = models.CharField(max_length=2)
+    medicine = models.ForeignKey(MedicineCache, on_delete=models.CASCADE, related_name='name_grams')
+    position = models.PositiveIntegerField()  # 정규화된 약물명에서 처음 등장하는 위치
+
+    class Meta:
+        db_table = 'medicine_name_gram'
+        unique_together = ['gram', 'medicine']
+
+    def __str__(self):
+        return f"{self.gram} - {self.medicine_id}"
+
+class MedicineEfcyTerm(models.Model):
+    """효능 정보(efcy_original, efcy_summary) 전문 검색용 역색인"""
+    term = models.CharField(max_length=64)  # 단어 또는 단어 안의 2글자 n-gram
+    medicine = models.ForeignKey(MedicineCache, on_delete=models.CASCADE, related_name='efcy_terms')
+    tf = models.PositiveIntegerField()  # 가중 등장 횟수 (요약 등장분은 가중치 적용)
+    doc_length = models.PositiveIntegerField(default=0)  # 약물의 전체 가중 등장 횟수 (BM25 길이 정규화)
+
+    class Meta:
+        db_table = 'medicine_efcy_term'
+        unique_together = ['term', 'medicine']
+
+    def __str__(self):
+        return f"{self.term} - {self.medicine_id} ({self.tf})"
+
+class SummaryCache(models.Model):
+    """정규화한 효능 원문 + 프롬프트 종류의 해시별 OpenAI 요약 (같은 효능 문구를 가진 약끼리 공유)"""
+    content_hash = models.CharField(max_length=64, unique=True)
+    prompt_variant = models.CharField(max_length=20)  # 'basic' 또는 'custom'
+    summary = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'summary_cache'
+
+    def __str__(self):
+        return f"{self.prompt_variant}:{self.content_hash[:12]} - {self.summary[:50]}"
+
+class NegativeSearchCache(models.Model):
+    """공공데이터 API 결과가 0건이었던 검색어 (재조회 방지용, 만료 시각까지 유효)"""
+    search_field = models.CharField(max_length=20)  # 'itemName' 또는 'efcyQesitm'
+    query = models.CharField(max_length=255)        # 정규화된 검색어
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'negative_search_cache'
+        unique_together = ['search_field', 'query']
+
+    def __str__(self):
+        return f"{self.search_field}={self.query} (~{self.expires_at})"
+
 class CustomSummaryCache(models.Model):
     """사용자 맞춤 검색 키워드별 요약 캐시"""
     medicine_name = models.CharField(max_length=255, db_index=True)
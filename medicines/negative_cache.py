@@ -0,0 +1,128 @@
+"""결과가 없는 검색어의 네거티브 캐시
+
+오타나 존재하지 않는 약 이름은 공공데이터 API 를 매번 다시 호출하게 되므로
+0건 결과를 짧은 TTL 로 Django 캐시와 DB 양쪽에 기억한다.
+Django 캐시는 같은 워커/캐시 서버 안에서, DB 는 캐시가 비워진 뒤나 워커 간에 재사용된다.
+"""
+import hashlib
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from config.caching import normalize_query
+from medicines.models import NegativeSearchCache
+
+logger = logging.getLogger(__name__)
+
+ITEM_NAME = 'itemName'
+EFCY = 'efcyQesitm'
+
+
+def _setting(key, default):
+    return getattr(settings, 'SEARCH_CACHE_SETTINGS', {}).get(key, default)
+
+def _cache_key(search_field, query):
+    digest = hashlib.md5(query.encode('utf-8')).hexdigest()
+    return f"negative_search:{search_field}:{digest}"
+
+def _expires_at():
+    return timezone.now() + timedelta(seconds=_setting('NEGATIVE_DB_TTL', 21600))
+
+def is_known_empty(search_field, query):
+    """최근 0건으로 확인된 검색어인지 여부"""
+    query = normalize_query(query)
+    if not query:
+        return False
+    key = _cache_key(search_field, query)
+    if cache.get(key):
+        return True
+
+    expires_at = NegativeSearchCache.objects.filter(
+        search_field=search_field, query=query[:255], expires_at__gt=timezone.now()
+    ).values_list('expires_at', flat=True).first()
+    if expires_at is None:
+        return False
+    # DB 에만 남아 있으면 남은 유효 시간 안에서 캐시에 다시 올림
+    remaining = (expires_at - timezone.now()).total_seconds()
+    cache.set(key, True, max(1, int(min(remaining, _setting('NEGATIVE_TTL', 600)))))
+    return True
+
+def remember_empty(search_field, query):
+    """0건 결과를 네거티브 캐시에 기록"""
+    query = normalize_query(query)
+    if not query:
+        return
+    cache.set(_cache_key(search_field, query), True, _setting('NEGATIVE_TTL', 600))
+    try:
+        NegativeSearchCache.objects.update_or_create(
+            search_field=search_field, query=query[:255],
+            defaults={'expires_at': _expires_at()}
+        )
+        logger.info(f"네거티브 캐시 저장: {search_field}={query}")
+    except Exception as e:
+        logger.error(f"네거티브 캐시 저장 실패 {search_field}={query}: {str(e)}")
+
+async def ais_known_empty(search_field, query):
+    """is_known_empty 의 async 버전"""
+    query = normalize_query(query)
+    if not query:
+        return False
+    key = _cache_key(search_field, query)
+    if await cache.aget(key):
+        return True
+
+    expires_at = await NegativeSearchCache.objects.filter(
+        search_field=search_field, query=query[:255], expires_at__gt=timezone.now()
+    ).values_list('expires_at', flat=True).afirst()
+    if expires_at is None:
+        return False
+    remaining = (expires_at - timezone.now()).total_seconds()
+    await cache.aset(key, True, max(1, int(min(remaining, _setting('NEGATIVE_TTL', 600)))))
+    return True
+
+async def aremember_empty(search_field, query):
+    """remember_empty 의 async 버전"""
+    query = normalize_query(query)
+    if not query:
+        return
+    await cache.aset(_cache_key(search_field, query), True, _setting('NEGATIVE_TTL', 600))
+    try:
+        await NegativeSearchCache.objects.aupdate_or_create(
+            search_field=search_field, query=query[:255],
+            defaults={'expires_at': _expires_at()}
+        )
+        logger.info(f"네거티브 캐시 저장: {search_field}={query}")
+    except Exception as e:
+        logger.error(f"네거티브 캐시 저장 실패 {search_field}={query}: {str(e)}")
+
+def forget_matching(medicines):
+    """
+    저장된 약물로 이제 결과가 생기는 검색어를 네거티브 캐시에서 삭제 (삭제 건수 반환)
+    약물명 또는 효능 정보에 검색어가 들어 있으면 삭제 (TTL 안의 항목만 있으므로 전부 읽어서 비교)
+    """
+    texts = {ITEM_NAME: [], EFCY: []}
+    for medicine in medicines:
+        texts[ITEM_NAME].append(''.join(normalize_query(medicine.item_name).split()))
+        texts[EFCY].extend(normalize_query(text) for text in (medicine.efcy_original, medicine.efcy_summary) if text)
+    if not texts[ITEM_NAME]:
+        return 0
+
+    stale = []
+    for pk, search_field, query in NegativeSearchCache.objects.values_list('pk', 'search_field', 'query'):
+        needle = ''.join(query.split()) if search_field == ITEM_NAME else query
+        if any(needle in text for text in texts.get(search_field, ())):
+            stale.append((pk, search_field, query))
+    if not stale:
+        return 0
+
+    cache.delete_many([_cache_key(search_field, query) for _, search_field, query in stale])
+    NegativeSearchCache.objects.filter(pk__in=[pk for pk, _, _ in stale]).delete()
+    logger.info(f"네거티브 캐시 삭제 (새 약물과 일치): {len(stale)}개")
+    return len(stale)
+
+def cleanup_expired():
+    """만료된 DB 네거티브 캐시 삭제 (삭제 건수 반환)"""
+    return NegativeSearchCache.objects.filter(expires_at__lte=timezone.now()).delete()[0]
@@ -0,0 +1,344 @@
+"""MedicineCache 검색 색인
+
+약물명은 2글자 n-gram 으로 색인해 icontains 전체 스캔 없이 부분 문자열 검색을 한다.
+(1글자는 거의 모든 약물명에 들어가는 글자('정' 등)가 많아 색인하지 않고, 1글자 검색어는 따로 조회)
+효능 정보는 단어와 단어 안의 2글자 n-gram 을 역색인에 가중 빈도와 함께 저장해 BM25 점수 순으로 검색한다.
+두 색인 모두 n-gram 만으로는 연속된 부분 문자열인지 알 수 없으므로 후보를 원문에서 다시 확인한다.
+색인은 MedicineCache 저장 시 signals 에서 갱신된다.
+"""
+import math
+import re
+import threading
+from collections import Counter
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Case, Count, F, FloatField, IntegerField, Max, Q, Sum, Value, When
+from django.db.models.functions import Length
+from django.utils import timezone
+
+from .models import MedicineCache, MedicineEfcyTerm, MedicineNameGram
+
+# 요약문에 등장한 단어의 가중치 (원문 1회 = 1)
+SUMMARY_WEIGHT = 2
+# BM25 단어 빈도 포화 계수, 문서 길이 정규화 계수
+BM25_K1 = 1.2
+BM25_B = 0.75
+# 이보다 긴 단어는 n-gram 으로만 색인 (MedicineEfcyTerm.term 길이)
+MAX_TERM_LENGTH = 64
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_TOKEN_RE = re.compile(r'\w+')
+
+
+CATALOG_VERSION_KEY = 'medicine_catalog_version'
+CATALOG_RESET_KEY = 'medicine_catalog_reset_version'
+
+# 다른 워커에서 추가된 약물을 놓치지 않기 위한 last_updated 여유 시간
+SYNC_SKEW = timedelta(seconds=60)
+
+
+def _incr(key):
+    cache.add(key, 0, None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+        return 1
+
+def bump_catalog_version(reset=False):
+    """
+    약물 목록 변경 알림 (다른 워커의 메모리 색인이 다음 조회 때 동기화)
+    reset=True 는 이름 변경/삭제처럼 추가만으로 반영할 수 없는 변경
+    """
+    if reset:
+        _incr(CATALOG_RESET_KEY)
+    return _incr(CATALOG_VERSION_KEY)
+
+def catalog_versions():
+    """(변경 버전, 재생성 버전)"""
+    versions = cache.get_many([CATALOG_VERSION_KEY, CATALOG_RESET_KEY])
+    return versions.get(CATALOG_VERSION_KEY, 0), versions.get(CATALOG_RESET_KEY, 0)
+
+class CatalogIndex:
+    """
+    약물명 목록으로 만드는 프로세스 메모리 색인 (자동완성, 오타 교정 등)
+    약물 목록 버전이 바뀌면 새로 추가된 약물만 반영하고, 재생성 버전이 바뀌면 다시 만든다.
+    factory(names) 로 만든 색인은 add(name), remove(name) 를 지원해야 함
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self._synced_at = None
+
+    def get(self):
+        version, reset_version = catalog_versions()
+        if self._index is not None and self._version == (version, reset_version):
+            return self._index
+
+        with self._lock:
+            if self._index is None or self._version is None or self._version[1] != reset_version:
+                synced_at = timezone.now()
+                self._index = self._factory(MedicineCache.objects.values_list('item_name', flat=True))
+            elif self._version != (version, reset_version):
+                synced_at = timezone.now()
+                recent = MedicineCache.objects.filter(last_updated__gte=self._synced_at - SYNC_SKEW)
+                for name in recent.values_list('item_name', flat=True):
+                    self._index.add(name)
+            else:
+                return self._index
+            self._version = (version, reset_version)
+            self._synced_at = synced_at
+            return self._index
+
+    def add(self, name):
+        """현재 프로세스의 색인에 바로 반영 (signals 에서 호출)"""
+        if self._index is not None:
+            with self._lock:
+                self._index.add(name)
+
+    def remove(self, name):
+        if self._index is not None:
+            with self._lock:
+                self._index.remove(name)
+
+def normalize_name(name):
+    """대소문자와 공백을 무시하도록 약물명 정규화"""
+    return ''.join((name or '').lower().split())
+
+def name_grams(name):
+    """정규화된 약물명의 2글자 n-gram 과 처음 등장 위치"""
+    normalized = normalize_name(name)
+    grams = {}
+    for i in range(len(normalized) - 1):
+        grams.setdefault(normalized[i:i + 2], i)
+    return grams
+
+def _query_grams(query):
+    """검색어를 모두 포함해야 하는 n-gram 목록 (첫 n-gram 이 맨 앞)"""
+    if len(query) == 1:
+        return [query]
+    grams = []
+    for i in range(len(query) - 1):
+        gram = query[i:i + 2]
+        if gram not in grams:
+            grams.append(gram)
+    return grams
+
+def index_medicine_names(medicines):
+    """약물명 색인 재생성"""
+    medicines = list(medicines)
+    if not medicines:
+        return
+    MedicineNameGram.objects.filter(medicine__in=medicines).delete()
+    MedicineNameGram.objects.bulk_create(
+        [
+            MedicineNameGram(gram=gram, medicine=medicine, position=position)
+            for medicine in medicines
+            for gram, position in name_grams(medicine.item_name).items()
+        ],
+        batch_size=1000,
+    )
+
+def _search_single_char_name(query, limit):
+    """1글자 검색어는 n-gram 색인 대신 약물명을 직접 조회"""
+    rank = Case(
+        When(item_name__iexact=query, then=0),
+        When(item_name__istartswith=query, then=1),
+        default=2,
+        output_field=IntegerField()
+    )
+    return list(
+        MedicineCache.objects.filter(item_name__icontains=query)
+        .annotate(rank=rank, length=Length('item_name'))
+        .order_by('rank', 'length', 'id')[:limit]
+    )
+
+def search_medicine_names(query, limit=10):
+    """
+    약물명 부분 문자열 검색
+    정확히 일치 > 접두사 일치 > 부분 일치 순으로 정렬한 MedicineCache 목록
+    """
+    query = normalize_name(query)
+    if not query:
+        return []
+    if len(query) == 1:
+        return _search_single_char_name(query, limit)
+
+    grams = _query_grams(query)
+    # 모든 n-gram 을 가진 후보를 색인에서만 계산하고, 접두사 여부와 길이로 정렬
+    candidates = (
+        MedicineNameGram.objects.filter(gram__in=grams)
+        .values('medicine_id')
+        .annotate(
+            hits=Count('id'),
+            prefix=Max(Case(
+                When(gram=grams[0], position=0, then=1),
+                default=0,
+                output_field=IntegerField()
+            )),
+            length=Length('medicine__item_name'),
+        )
+        .filter(hits=len(grams))
+        .order_by('-prefix', 'length', 'medicine_id')
+    )
+
+    results = []
+    window = limit * 3
+    offset = 0
+    while True:
+        rows = list(candidates[offset:offset + window])
+        offset += window
+        medicines = MedicineCache.objects.in_bulk([row['medicine_id'] for row in rows])
+        for row in rows:
+            medicine = medicines.get(row['medicine_id'])
+            if medicine is None:
+                continue
+            name = normalize_name(medicine.item_name)
+            # n-gram 이 모두 있어도 연속된 부분 문자열이 아닐 수 있으므로 재확인
+            if query not in name:
+                continue
+            rank = 0 if name == query else 1 if name.startswith(query) else 2
+            results.append((rank, len(results), medicine))
+
+        if len(rows) < window:
+            break
+        # 정확/접두사 일치는 prefix=1 후보에만 있으므로, 그 후보를 다 본 뒤에는 limit 개만 채우면 됨
+        # (n-gram 만 겹치는 후보가 창을 채워도 실제 일치 결과를 놓치지 않도록 계속 조회)
+        if sum(1 for rank, _, _ in results if rank < 2) >= limit:
+            break
+        if rows[-1]['prefix'] == 0 and len(results) >= limit:
+            break
+
+    results.sort(key=lambda result: result[:2])
+    return [medicine for _, _, medicine in results[:limit]]
+
+
+def normalize_efcy_text(text):
+    """HTML 태그, 대소문자, 공백 차이를 무시하도록 효능 정보 텍스트 정규화 (부분 문자열 확인용)"""
+    return ' '.join(_TAG_RE.sub(' ', text or '').lower().split())
+
+def _bigrams(token):
+    return [token[i:i + 2] for i in range(len(token) - 1)]
+
+def efcy_terms(text):
+    """효능 정보 텍스트의 단어와 단어 안의 2글자 n-gram, 등장 횟수 (단어 경계를 넘지 않음)"""
+    terms = Counter()
+    for token in _TOKEN_RE.findall(normalize_efcy_text(text)):
+        # 2글자 단어는 n-gram 과 같으므로 한 번만 셈
+        if len(token) != 2 and len(token) <= MAX_TERM_LENGTH:
+            terms[token] += 1
+        terms.update(_bigrams(token))
+    return terms
+
+def index_medicine_efcy(medicines):
+    """효능 정보 역색인 재생성"""
+    medicines = list(medicines)
+    if not medicines:
+        return
+    MedicineEfcyTerm.objects.filter(medicine__in=medicines).delete()
+
+    rows = []
+    for medicine in medicines:
+        terms = efcy_terms(medicine.efcy_original)
+        for term, count in efcy_terms(medicine.efcy_summary).items():
+            terms[term] += count * SUMMARY_WEIGHT
+        doc_length = sum(terms.values())
+        rows.extend(
+            MedicineEfcyTerm(term=term, medicine=medicine, tf=tf, doc_length=doc_length)
+            for term, tf in terms.items()
+        )
+    MedicineEfcyTerm.objects.bulk_create(rows, batch_size=1000)
+
+def _query_terms(query):
+    """
+    (모두 있어야 하는 2글자 n-gram, 점수만 더하는 3글자 이상 단어)
+    1글자 단어는 색인하지 않으므로 원문 확인에서만 쓰임
+    """
+    required = []
+    boost = []
+    for token in _TOKEN_RE.findall(query):
+        for gram in _bigrams(token):
+            if gram not in required:
+                required.append(gram)
+        if len(token) > 2 and len(token) <= MAX_TERM_LENGTH and token not in boost:
+            boost.append(token)
+    return required, boost
+
+def _efcy_stats():
+    """(약물 수, 평균 문서 길이) - 10분 캐시"""
+    def compute():
+        # 문서 길이는 그 약물 단어들의 tf 합이므로 전체 tf 합 / 색인된 약물 수
+        stats = MedicineEfcyTerm.objects.aggregate(length=Sum('tf'), docs=Count('medicine', distinct=True))
+        average = stats['length'] / stats['docs'] if stats['docs'] else 1.0
+        return MedicineCache.objects.count(), average
+    return cache.get_or_set('medicine_efcy_stats', compute, 600)
+
+def _matches_efcy(medicine, query):
+    return query in normalize_efcy_text(medicine.efcy_original) or query in normalize_efcy_text(medicine.efcy_summary)
+
+def _search_efcy_scan(query, limit):
+    """색인할 n-gram 이 없는 검색어(1글자 단어만)는 효능 정보를 직접 조회"""
+    candidates = MedicineCache.objects.filter(Q(efcy_original__icontains=query) | Q(efcy_summary__icontains=query))
+    return list(candidates.order_by('id')[:limit])
+
+def search_medicine_efcy(query, limit=10):
+    """
+    효능 정보 전문 검색
+    검색어가 원문 또는 요약에 연속으로 들어 있는 MedicineCache 를 BM25 점수 순으로 반환
+    """
+    query = normalize_efcy_text(query)
+    required, boost = _query_terms(query)
+    if not required:
+        return _search_efcy_scan(query, limit) if query else []
+
+    # 단어별 문서 빈도로 idf 계산 (색인만 조회)
+    terms = required + boost
+    doc_freqs = dict(
+        MedicineEfcyTerm.objects.filter(term__in=terms)
+        .values_list('term')
+        .annotate(df=Count('id'))
+    )
+    if any(term not in doc_freqs for term in required):
+        return []
+    total, avgdl = _efcy_stats()
+    idf = {
+        term: math.log(1 + max(total - df + 0.5, 0.5) / (df + 0.5))
+        for term, df in doc_freqs.items()
+    }
+
+    weight = Case(
+        *[When(term=term, then=Value(value)) for term, value in idf.items()],
+        output_field=FloatField()
+    )
+    # tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+    norm = Value(BM25_K1 * (1 - BM25_B)) + F('doc_length') * Value(BM25_K1 * BM25_B / avgdl)
+    ranked = (
+        MedicineEfcyTerm.objects.filter(term__in=list(doc_freqs))
+        .values('medicine_id')
+        .annotate(
+            hits=Count('id', filter=Q(term__in=required)),
+            score=Sum(weight * F('tf') * (BM25_K1 + 1) / (F('tf') + norm), output_field=FloatField()),
+        )
+        .filter(hits=len(required))
+        .order_by('-score', 'medicine_id')
+    )
+
+    # n-gram 이 모두 있어도 검색어가 연속으로 들어 있지 않을 수 있으므로 원문에서 재확인 (점수 순 유지)
+    results = []
+    window = limit * 3
+    offset = 0
+    while len(results) < limit:
+        ranked_ids = [row['medicine_id'] for row in ranked[offset:offset + window]]
+        offset += window
+        medicines = MedicineCache.objects.in_bulk(ranked_ids)
+        results.extend(
+            medicines[medicine_id] for medicine_id in ranked_ids
+            if medicine_id in medicines and _matches_efcy(medicines[medicine_id], query)
+        )
+        if len(ranked_ids) < window:
+            break
+    return results[:limit]
@@ -0,0 +1,51 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from . import autocomplete, fuzzy
+from .models import MedicineCache
+from .negative_cache import forget_matching
+from .search_index import bump_catalog_version, index_medicine_efcy, index_medicine_names
+
+EFCY_FIELDS = {'efcy_original', 'efcy_summary'}
+
+
+def _add_name(name):
+    """현재 프로세스의 메모리 색인(자동완성, 오타 교정)에 바로 반영"""
+    autocomplete.add_medicine_name(name)
+    fuzzy.add_medicine_name(name)
+
+def _remove_name(name):
+    autocomplete.remove_medicine_name(name)
+    fuzzy.remove_medicine_name(name)
+
+
+@receiver(post_init, sender=MedicineCache)
+def remember_item_name(sender, instance, **kwargs):
+    """저장 시 약물명 변경 여부를 알 수 있도록 로드 시점의 이름 보관"""
+    instance._loaded_item_name = instance.item_name
+
+@receiver(post_save, sender=MedicineCache)
+def update_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """MedicineCache 저장 시 검색 색인 갱신 (bulk_create 는 색인 함수를 직접 호출)"""
+    if created or update_fields is None or 'item_name' in update_fields:
+        index_medicine_names([instance])
+    if created or update_fields is None or EFCY_FIELDS & set(update_fields):
+        index_medicine_efcy([instance])
+    if created or update_fields is None or ({'item_name'} | EFCY_FIELDS) & set(update_fields):
+        # 이전에 0건이었던 검색어가 이 약물로 결과를 갖게 될 수 있음
+        forget_matching([instance])
+
+    loaded_item_name = getattr(instance, '_loaded_item_name', None)
+    if created:
+        _add_name(instance.item_name)
+        bump_catalog_version()
+    elif loaded_item_name != instance.item_name:
+        _remove_name(loaded_item_name)
+        _add_name(instance.item_name)
+        bump_catalog_version(reset=True)
+    instance._loaded_item_name = instance.item_name
+
+@receiver(post_delete, sender=MedicineCache)
+def remove_from_catalog(sender, instance, **kwargs):
+    _remove_name(instance.item_name)
+    bump_catalog_version(reset=True)
@@ -1,89 +1,104 @@
 from celery import shared_task
 from django.utils import timezone
 from medicines.models import MedicineCache, CustomSummaryCache
-from config.utils import get_efcy_using_openai, get_efcy_using_openai_custom
-import requests
+from medicines.negative_cache import cleanup_expired, forget_matching
+from medicines.search_index import bump_catalog_version, index_medicine_efcy, index_medicine_names
+from config.utils import summarize_efcy_batch
+from config.public_data import fetch_drug_list
 import logging
-import time
 
 logger = logging.getLogger(__name__)
 
+def save_medicines_from_api(items, summaries):
+    """
+    공공데이터 API 항목과 요약을 MedicineCache 에 일괄 저장 (이미 있는 약물은 건너뜀)
+    효능 정보가 있는데 요약에 실패한 항목은 저장하지 않아 다음 배치에서 다시 요약
+    bulk_create 는 signals 가 없으므로 검색 색인, 네거티브 캐시, 약물 목록 버전을 직접 갱신
+    저장한 약물 수 반환
+    """
+    now = timezone.now()
+    medicines = {}
+    for item, efcy_summary in zip(items, summaries):
+        if item.get('efcyQesitm') and efcy_summary is None:
+            continue
+        medicines.setdefault(item['itemName'], MedicineCache(
+            item_name=item['itemName'],
+            efcy_original=item.get('efcyQesitm') or '',
+            efcy_summary=efcy_summary or '효능 정보 없음',
+            item_image=item.get('itemImage') or '',
+            atpn_qesitm=item.get('atpnQesitm') or '',
+            intrc_qesitm=item.get('intrcQesitm') or '',
+            use_method_qesitm=item.get('useMethodQesitm') or '',
+            se_qesitm=item.get('seQesitm') or '',
+            created_from_api=True,
+            last_updated=now
+        ))
+    if not medicines:
+        return 0
+
+    existing = set(MedicineCache.objects.filter(item_name__in=list(medicines)).values_list('item_name', flat=True))
+    new_names = [name for name in medicines if name not in existing]
+    MedicineCache.objects.bulk_create(
+        [medicines[name] for name in new_names],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    # ignore_conflicts 에서는 pk 가 채워지지 않으므로 다시 조회해서 색인
+    created = list(MedicineCache.objects.filter(item_name__in=new_names))
+    if created:
+        index_medicine_names(created)
+        index_medicine_efcy(created)
+        forget_matching(created)
+        bump_catalog_version()
+    return len(created)
+
+def new_api_items(items):
+    """MedicineCache 에 아직 없는 공공데이터 API 항목 (한 번의 IN 쿼리로 확인)"""
+    existing = set(MedicineCache.objects.filter(
+        item_name__in=[item['itemName'] for item in items]
+    ).values_list('item_name', flat=True))
+    return [item for item in items if item['itemName'] not in existing]
+
 @shared_task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 60})
 def update_medicine_cache_batch(self, batch_size=50, start_page=1):
     """
     약물 정보를 배치로 업데이트하는 비동기 태스크
     프로덕션 환경에서 주기적으로 실행
+    페이지마다 새 약물의 효능 정보를 묶음 요청으로 요약한 뒤 일괄 저장
     """
     try:
-        base_url = "http://apis.data.go.kr/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList"
-        service_key = "C0OCzqNhw6sohn5jE2c1L52H4YKftzf9U8nxGSsC5GqH1YzH4Uu9VJ18zMHmpBrOEPgm3jqSOUpHh3j1oLcwLw%3D%3D"
-        
         processed_count = 0
         success_count = 0
         error_count = 0
         
         for page_no in range(start_page, start_page + 10):  # 한 번에 10페이지씩 처리
             try:
-                params = {
-                    "serviceKey": service_key,
-                    "type": "json",
-                    "numOfRows": batch_size,
-                    "pageNo": page_no
-                }
-                
-                response = requests.get(base_url, params=params, timeout=30)
-                response.raise_for_status()
-                data = response.json()
+                page = fetch_drug_list(page_no=page_no, num_of_rows=batch_size, timeout=30)
                 
-                if data['body']['totalCount'] == 0 or not data['body'].get('items'):
+                if page.total_count == 0 or not page.items:
                     break
                 
-                items = data['body']['items']
-                
-                for item in items:
-                    try:
-                        # 이미 처리된 약물 건너뛰기
-                        if MedicineCache.objects.filter(item_name=item['itemName']).exists():
-                            continue
-                        
-                        # OpenAI API 호출 (레이트 리미트 고려)
-                        efcy_summary = None
-                        if item.get('efcyQesitm'):
-                            efcy_summary = get_efcy_using_openai(item['efcyQesitm'])
-                            time.sleep(0.5)  # API 부하 방지
-                        
-                        # DB 저장
-                        MedicineCache.objects.create(
-                            item_name=item['itemName'],
-                            efcy_original=item.get('efcyQesitm', ''),
-                            efcy_summary=efcy_summary or '효능 정보 없음',
-                            item_image=item.get('itemImage', ''),
-                            atpn_qesitm=item.get('atpnQesitm', ''),
-                            intrc_qesitm=item.get('intrcQesitm', ''),
-                            use_method_qesitm=item.get('useMethodQesitm', ''),
-                            se_qesitm=item.get('seQesitm', ''),
-                            created_from_api=True,
-                            last_updated=timezone.now()
-                        )
-                        
-                        success_count += 1
-                        processed_count += 1
-                        
-                        # 진행 상황 업데이트
-                        if processed_count % 10 == 0:
-                            self.update_state(
-                                state='PROGRESS',
-                                meta={
-                                    'current': processed_count,
-                                    'total': batch_size * 10,
-                                    'status': f'{processed_count}개 처리 완료'
-                                }
-                            )
-                        
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"약물 처리 실패 {item.get('itemName', 'Unknown')}: {str(e)}")
-                        continue
+                # 이미 처리된 약물 건너뛰기
+                items = new_api_items(page.items)
+                if not items:
+                    continue
+
+                summaries = summarize_efcy_batch([item.get('efcyQesitm') for item in items])
+                success_count += save_medicines_from_api(items, summaries)
+                processed_count += len(items)
+                error_count += sum(
+                    1 for item, summary in zip(items, summaries) if item.get('efcyQesitm') and summary is None
+                )
+
+                # 진행 상황 업데이트
+                self.update_state(
+                    state='PROGRESS',
+                    meta={
+                        'current': processed_count,
+                        'total': batch_size * 10,
+                        'status': f'{processed_count}개 처리 완료'
+                    }
+                )
                 
             except Exception as e:
                 logger.error(f"페이지 {page_no} 처리 실패: {str(e)}")
@@ -121,30 +136,42 @@ def cleanup_old_custom_summaries(days_old=30):
         logger.error(f"캐시 정리 실패: {str(e)}")
         raise
 
+@shared_task
+def cleanup_negative_search_cache():
+    """
+    만료된 네거티브 검색 캐시 정리
+    """
+    deleted_count = cleanup_expired()
+    logger.info(f"만료된 네거티브 캐시 {deleted_count}개 삭제 완료")
+    return {'deleted_count': deleted_count}
+
 @shared_task
 def refresh_medicine_summaries(medicine_names=None):
     """
     특정 약물들의 요약 정보 갱신
     """
     try:
-        query = MedicineCache.objects.all()
+        query = MedicineCache.objects.exclude(efcy_original='')
         if medicine_names:
             query = query.filter(item_name__in=medicine_names)
-        
+
         updated_count = 0
-        for medicine in query:
-            try:
-                if medicine.efcy_original:
-                    new_summary = get_efcy_using_openai(medicine.efcy_original)
-                    medicine.efcy_summary = new_summary
-                    medicine.last_updated = timezone.now()
-                    medicine.save()
-                    updated_count += 1
-                    time.sleep(0.5)  # API 레이트 리미트
-                    
-            except Exception as e:
-                logger.error(f"약물 요약 갱신 실패 {medicine.item_name}: {str(e)}")
-                continue
+        for medicines in _chunked(query.order_by('id'), 500):
+            summaries = summarize_efcy_batch([medicine.efcy_original for medicine in medicines])
+            now = timezone.now()
+            updated = []
+            for medicine, summary in zip(medicines, summaries):
+                if summary is None:
+                    logger.error(f"약물 요약 갱신 실패 {medicine.item_name}")
+                    continue
+                medicine.efcy_summary = summary
+                medicine.last_updated = now
+                updated.append(medicine)
+
+            # bulk_update 는 signals 가 없으므로 효능 색인을 직접 갱신
+            MedicineCache.objects.bulk_update(updated, ['efcy_summary', 'last_updated'], batch_size=500)
+            index_medicine_efcy(updated)
+            updated_count += len(updated)
         
         return {'updated_count': updated_count}
         
@@ -152,6 +179,48 @@ def refresh_medicine_summaries(medicine_names=None):
         logger.error(f"요약 갱신 실패: {str(e)}")
         raise
 
+def _chunked(queryset, size):
+    medicines = []
+    for medicine in queryset.iterator(chunk_size=size):
+        medicines.append(medicine)
+        if len(medicines) == size:
+            yield medicines
+            medicines = []
+    if medicines:
+        yield medicines
+
+@shared_task
+def generate_custom_summaries(search_keyword, medicine_names):
+    """
+    검색 키워드에 대한 맞춤 요약을 일괄 생성
+    증상 검색에서 CustomSummaryCache 미스가 난 약물들을 백그라운드로 채움
+    """
+    existing = set(CustomSummaryCache.objects.filter(
+        search_keyword=search_keyword,
+        medicine_name__in=medicine_names
+    ).values_list('medicine_name', flat=True))
+
+    medicines = list(MedicineCache.objects.filter(
+        item_name__in=[name for name in medicine_names if name not in existing]
+    ).exclude(efcy_original='').only('item_name', 'efcy_original'))
+    if not medicines:
+        return {'generated_count': 0}
+
+    summaries = summarize_efcy_batch(
+        [medicine.efcy_original for medicine in medicines], search_keyword
+    )
+    created = CustomSummaryCache.objects.bulk_create([
+        CustomSummaryCache(
+            medicine_name=medicine.item_name,
+            search_keyword=search_keyword,
+            custom_summary=summary
+        )
+        for medicine, summary in zip(medicines, summaries) if summary
+    ], ignore_conflicts=True)
+
+    logger.info(f"맞춤 요약 {len(created)}개 생성: {search_keyword}")
+    return {'generated_count': len(created)}
+
 @shared_task
 def generate_popular_medicine_summaries():
     """
@@ -165,39 +234,16 @@ def generate_popular_medicine_summaries():
         ]
         
         # 캐시된 약물 중 상위 100개
-        popular_medicines = MedicineCache.objects.order_by('-last_updated')[:100]
+        popular_medicines = MedicineCache.objects.order_by('-last_updated').values_list('item_name', flat=True)[:100]
+        medicine_names = list(popular_medicines)
         
         generated_count = 0
-        for medicine in popular_medicines:
-            for keyword in popular_keywords:
-                # 이미 존재하는 요약은 건너뛰기
-                if CustomSummaryCache.objects.filter(
-                    medicine_name=medicine.item_name,
-                    search_keyword=keyword
-                ).exists():
-                    continue
-                
-                try:
-                    if medicine.efcy_original:
-                        custom_summary = get_efcy_using_openai_custom(
-                            medicine.efcy_original, keyword
-                        )
-                        
-                        CustomSummaryCache.objects.create(
-                            medicine_name=medicine.item_name,
-                            search_keyword=keyword,
-                            custom_summary=custom_summary
-                        )
-                        
-                        generated_count += 1
-                        time.sleep(0.3)  # API 레이트 리미트
-                        
-                except Exception as e:
-                    logger.error(f"맞춤 요약 생성 실패 {medicine.item_name}-{keyword}: {str(e)}")
-                    continue
+        for keyword in popular_keywords:
+            # 키워드별로 없는 요약만 묶음 요청으로 생성
+            generated_count += generate_custom_summaries(keyword, medicine_names)['generated_count']
         
         return {'generated_count': generated_count}
         
     except Exception as e:
         logger.error(f"인기 약물 요약 생성 실패: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -1,3 +1,202 @@
-from django.test import TestCase
+import io
+import json
+import os
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from config.public_data import DrugListPage
+from medicines.fuzzy import FuzzyNameMatcher, prefix_distance
+from medicines.models import MedicineCache, NegativeSearchCache
+from medicines.negative_cache import EFCY, ITEM_NAME, cleanup_expired, is_known_empty, remember_empty
+from medicines.search_index import efcy_terms, name_grams, search_medicine_efcy, search_medicine_names
+from medicines.tasks import new_api_items, save_medicines_from_api
+
+
+def api_item(name, efcy):
+    return {'itemName': name, 'efcyQesitm': efcy, 'itemImage': ''}
+
+
+class SaveMedicinesFromApiTest(TestCase):
+    def test_failed_summary_is_retried_on_next_batch(self):
+        items = [api_item('성공정', '두통에 사용합니다.'), api_item('실패정', '발열에 사용합니다.')]
+
+        # 첫 배치: 두 번째 약물의 요약 실패
+        self.assertEqual(save_medicines_from_api(items, ['두통 완화', None]), 1)
+        self.assertFalse(MedicineCache.objects.filter(item_name='실패정').exists())
+
+        # 다음 배치: 저장되지 않은 약물만 다시 요약 대상
+        retry = new_api_items(items)
+        self.assertEqual([item['itemName'] for item in retry], ['실패정'])
+        self.assertEqual(save_medicines_from_api(retry, ['해열']), 1)
+        self.assertEqual(MedicineCache.objects.get(item_name='실패정').efcy_summary, '해열')
+
+    def test_item_without_efficacy_is_saved_with_placeholder(self):
+        self.assertEqual(save_medicines_from_api([api_item('무효능정', None)], [None]), 1)
+        self.assertEqual(MedicineCache.objects.get(item_name='무효능정').efcy_summary, '효능 정보 없음')
+
+
+class ExportSummaryBatchTest(TestCase):
+    def test_same_text_on_two_pages_is_exported_once(self):
+        pages = {
+            1: DrugListPage(total_count=2, items=[api_item('첫째정', '<p>두통에 사용합니다.</p>')]),
+            2: DrugListPage(total_count=2, items=[api_item('둘째정', '두통에  사용합니다.')]),
+        }
+        fd, path = tempfile.mkstemp(suffix='.jsonl')
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        with mock.patch(
+            'medicines.management.commands.preprocess_medicine_summaries.fetch_drug_list',
+            side_effect=lambda page_no, **kwargs: pages[page_no],
+        ) as fetch:
+            call_command('preprocess_medicine_summaries', batch_size=1, export_batch=path, stdout=io.StringIO())
+
+        self.assertEqual(fetch.call_count, 2)
+        with open(path, encoding='utf-8') as fp:
+            requests = [json.loads(line) for line in fp]
+        self.assertEqual(len(requests), 1)
+
+
+def names(medicines):
+    return [medicine.item_name for medicine in medicines]
+
+
+class SearchMedicineNamesTest(TestCase):
+    def test_exact_then_prefix_then_substring(self):
+        for name in ('어린이타이레놀', '타이레놀정500', '타이레놀', '게보린'):
+            MedicineCache.objects.create(item_name=name)
+
+        self.assertEqual(names(search_medicine_names('타이레놀')), ['타이레놀', '타이레놀정500', '어린이타이레놀'])
+
+    def test_bigram_only_candidates_do_not_hide_substring_matches(self):
+        # '가나'와 '나다'를 모두 가졌지만 '가나다'는 아닌 짧은 약물명이 후보 창을 먼저 채움
+        for i in range(10):
+            MedicineCache.objects.create(item_name=f'가나{i}나다')
+        MedicineCache.objects.create(item_name='어린이가나다시럽')
+
+        self.assertEqual(names(search_medicine_names('가나다', limit=2)), ['어린이가나다시럽'])
+
+    def test_single_character_query(self):
+        for name in ('나정', '정', '정로환'):
+            MedicineCache.objects.create(item_name=name)
+
+        self.assertEqual(names(search_medicine_names('정')), ['정', '정로환', '나정'])
+
+    def test_only_bigrams_are_indexed(self):
+        self.assertEqual(name_grams('타이 레놀'), {'타이': 0, '이레': 1, '레놀': 2})
+
+
+class SearchMedicineEfcyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_query_must_appear_contiguously(self):
+        MedicineCache.objects.create(item_name='흩어진정', efcy_original='두통에 쓰는 통약입니다.')
+        MedicineCache.objects.create(item_name='두통약정', efcy_original='<p>두통약으로 사용합니다.</p>')
+
+        self.assertEqual(names(search_medicine_efcy('두통약')), ['두통약정'])
+
+    def test_matches_summary_too(self):
+        MedicineCache.objects.create(item_name='요약정', efcy_original='머리가 아플 때', efcy_summary='두통 완화')
+
+        self.assertEqual(names(search_medicine_efcy('두통')), ['요약정'])
+
+    def test_shorter_text_ranks_first_for_same_term_frequency(self):
+        MedicineCache.objects.create(
+            item_name='긴설명정',
+            efcy_original='두통 ' + ' '.join(f'증상{i}' for i in range(50)),
+        )
+        MedicineCache.objects.create(item_name='짧은설명정', efcy_original='두통 치통')
+
+        self.assertEqual(names(search_medicine_efcy('두통')), ['짧은설명정', '긴설명정'])
+
+    def test_single_character_query_scans_texts(self):
+        MedicineCache.objects.create(item_name='해열정', efcy_original='발열에 사용합니다.')
+
+        self.assertEqual(names(search_medicine_efcy('열')), ['해열정'])
+
+    def test_indexes_words_and_bigrams_only(self):
+        self.assertEqual(efcy_terms('<b>두통에</b> 열'), {'두통에': 1, '두통': 1, '통에': 1, '열': 1})
+
+
+@override_settings(SEARCH_CACHE_SETTINGS={'NEGATIVE_TTL': 60, 'NEGATIVE_DB_TTL': 3600})
+class NegativeCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_expires_after_db_ttl(self):
+        remember_empty(ITEM_NAME, '없는약')
+        self.assertTrue(is_known_empty(ITEM_NAME, ' 없는약 '))
+
+        # 캐시가 비워져도 DB 에 남은 기간 동안은 유효
+        cache.clear()
+        self.assertTrue(is_known_empty(ITEM_NAME, '없는약'))
+
+        cache.clear()
+        NegativeSearchCache.objects.update(expires_at=timezone.now() - timezone.timedelta(seconds=1))
+        self.assertFalse(is_known_empty(ITEM_NAME, '없는약'))
+        self.assertEqual(cleanup_expired(), 1)
+
+    def test_saving_a_matching_medicine_forgets_the_query(self):
+        remember_empty(ITEM_NAME, '새약')
+        remember_empty(EFCY, '탈모')
+        remember_empty(ITEM_NAME, '다른약')
+
+        MedicineCache.objects.create(item_name='새약정', efcy_original='탈모 치료에 사용합니다.')
+
+        self.assertFalse(is_known_empty(ITEM_NAME, '새약'))
+        self.assertFalse(is_known_empty(EFCY, '탈모'))
+        self.assertTrue(is_known_empty(ITEM_NAME, '다른약'))
+
+    def test_bulk_saved_medicines_forget_matching_queries(self):
+        remember_empty(ITEM_NAME, '새약')
+
+        save_medicines_from_api([api_item('새약정', None)], [None])
+
+        self.assertFalse(is_known_empty(ITEM_NAME, '새약'))
+
+    def test_failed_db_write_is_not_logged_as_saved(self):
+        with mock.patch.object(NegativeSearchCache.objects, 'update_or_create', side_effect=RuntimeError('db down')), \
+                self.assertLogs('medicines.negative_cache', level='INFO') as logs:
+            remember_empty(ITEM_NAME, '없는약')
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].levelname, 'ERROR')
+
+
+class FuzzyNameMatcherTest(SimpleTestCase):
+    def setUp(self):
+        self.matcher = FuzzyNameMatcher(
+            ['타이레놀정500밀리그람', '타이레놀콜드에스정', '판콜에이내복액', '게보린정'],
+            max_distance=1, prefix_length=10, min_length=5,
+        )
+
+    def test_jamo_substitution(self):
+        # 'ㅔ' -> 'ㅐ' 한 자모만 다름, 같은 거리면 짧은 이름 먼저
+        self.assertEqual(self.matcher.search('타이래놀'), ['타이레놀콜드에스정', '타이레놀정500밀리그람'])
+
+    def test_jamo_deletion(self):
+        # '콜' 의 받침 'ㄹ' 누락
+        self.assertEqual(self.matcher.search('판코에이'), ['판콜에이내복액'])
+
+    def test_beyond_max_distance(self):
+        self.assertEqual(self.matcher.search('타이래널'), [])
+
+    def test_short_query_is_not_corrected(self):
+        self.assertEqual(self.matcher.search('게보'), [])
+
+    def test_removed_name_is_not_returned(self):
+        self.matcher.remove('판콜에이내복액')
+
+        self.assertEqual(self.matcher.search('판코에이'), [])
+
+    def test_prefix_distance(self):
+        self.assertEqual(prefix_distance('abc', 'abcdef', 1), 0)
+        self.assertEqual(prefix_distance('axc', 'abcdef', 1), 1)
+        self.assertEqual(prefix_distance('bac', 'abcdef', 1), 1)  # 인접 문자 교환
+        self.assertEqual(prefix_distance('xyc', 'abcdef', 1), 2)
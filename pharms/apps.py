@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PharmsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pharms'
+
+    def ready(self):
+        from . import signals
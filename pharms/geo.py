@@ -0,0 +1,89 @@
+"""약국 위치 검색용 격자 색인
+
+위도/경도를 GRID_CELL_DEGREES 간격의 격자 칸 번호(Pharm.grid_cell, DB 인덱스)로 저장해 두고,
+반경 검색 시 반경을 덮는 칸들의 약국만 읽은 뒤 haversine 으로 거리를 확인한다.
+"""
+from math import atan2, cos, floor, radians, sin, sqrt
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = 111.32
+
+# 격자 한 칸 크기 (도, 위도 방향 약 1.1km), 바꾸면 load_pharm --reindex 로 다시 계산해야 함
+GRID_CELL_DEGREES = 0.01
+_GRID_COLUMNS = int(round(360 / GRID_CELL_DEGREES))
+
+# 영업 중 약국 검색 시 처음 찾아보는 반경 (km)
+OPEN_SEARCH_START_KM = 0.5
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """두 좌표 사이 거리 (km)"""
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+def _row(lat):
+    return int(floor((lat + 90) / GRID_CELL_DEGREES))
+
+def _column(lon):
+    return int(floor((lon + 180) / GRID_CELL_DEGREES)) % _GRID_COLUMNS
+
+def grid_cell(lat, lon):
+    """좌표가 속한 격자 칸 번호"""
+    if lat is None or lon is None:
+        return None
+    return _row(float(lat)) * _GRID_COLUMNS + _column(float(lon))
+
+def cells_around(lat, lon, radius_km):
+    """좌표에서 radius_km 안의 모든 지점을 덮는 격자 칸 번호"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    # 고위도일수록 경도 1도의 거리가 짧아지므로 반경 끝 위도 기준으로 넉넉하게 계산
+    edge_lat = min(89.9, abs(lat) + lat_delta)
+    lon_delta = min(180, radius_km / (KM_PER_DEGREE * cos(radians(edge_lat))))
+
+    rows = range(_row(max(-90, lat - lat_delta)), _row(min(90, lat + lat_delta)) + 1)
+    first, last = _column(lon - lon_delta), _column(lon + lon_delta)
+    if first <= last:
+        columns = range(first, last + 1)
+    else:
+        # 경도 180도를 넘어가는 경우
+        columns = list(range(first, _GRID_COLUMNS)) + list(range(0, last + 1))
+    return [row * _GRID_COLUMNS + column for row in rows for column in columns]
+
+def pharms_within(lat, lon, radius_km, queryset=None):
+    """radius_km 안의 약국 [(거리 km, Pharm)] (id 순)"""
+    from .models import Pharm
+
+    queryset = Pharm.objects.all() if queryset is None else queryset
+    candidates = queryset.filter(grid_cell__in=cells_around(lat, lon, radius_km)).order_by('pk')
+    results = []
+    for pharm in candidates:
+        distance = haversine(lat, lon, pharm.lat, pharm.lon)
+        if distance <= radius_km:
+            results.append((distance, pharm))
+    return results
+
+def nearest_pharm(lat, lon, radius_km):
+    """radius_km 안에서 가장 가까운 약국 (없으면 None)"""
+    results = pharms_within(lat, lon, radius_km)
+    if not results:
+        return None
+    return min(results, key=lambda result: result[0])[1]
+
+def nearest_open_pharms(lat, lon, k, minute, radius_km):
+    """minute(주간 분)에 영업 중인 radius_km 안의 약국 중 가까운 순으로 최대 k개 [(거리 km, Pharm)]"""
+    from .hours import open_at
+    from .models import Pharm
+
+    # 작은 반경부터 넓혀 가며 찾음 (반경 r 안에서 k개를 찾으면 그 밖의 약국은 더 멀다)
+    queryset = Pharm.objects.filter(open_at(minute))
+    search_km = min(radius_km, OPEN_SEARCH_START_KM)
+    while True:
+        results = pharms_within(lat, lon, search_km, queryset=queryset)
+        if len(results) >= k or search_km >= radius_km:
+            break
+        search_km = min(radius_km, search_km * 2)
+    results.sort(key=lambda result: result[0])
+    return results[:k]
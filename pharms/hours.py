@@ -0,0 +1,115 @@
+"""약국 영업시간 구간
+
+Pharm 의 요일별 영업시간 문자열('0900~1800', 'Closed')을 월요일 0시 기준 분 단위 구간으로 바꿔
+PharmHours 에 저장해 두고, 영업 중 여부는 opens <= 시각 < closes 범위 비교(인덱스)로 찾는다.
+"""
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PharmHours
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+# datetime.weekday() 순서 (월요일 = 0)
+WEEKDAY_FIELDS = ['timeMon', 'timeTue', 'timeWed', 'timeThu', 'timeFri', 'timeSat', 'timeSun']
+
+
+def _setting(key, default):
+    return getattr(settings, 'PHARM_SEARCH_SETTINGS', {}).get(key, default)
+
+def parse_time(text):
+    """'0930' -> 570 (분), 형식이 다르면 None ('2400', '2630' 처럼 24시 이후도 허용)"""
+    text = (text or '').strip()
+    if len(text) != 4 or not text.isdigit():
+        return None
+    hours, minutes = int(text[:2]), int(text[2:])
+    if minutes >= 60:
+        return None
+    return hours * 60 + minutes
+
+def day_interval(text):
+    """'0900~1800' -> (540, 1080), 휴무/형식 오류는 None (종료가 시작보다 이르면 다음 날 종료)"""
+    start, _, end = (text or '').partition('~')
+    opens, closes = parse_time(start), parse_time(end)
+    if opens is None or closes is None:
+        return None
+    if closes <= opens:
+        closes += MINUTES_PER_DAY
+    return opens, closes
+
+def weekly_intervals(pharm):
+    """
+    약국의 주간 영업 구간 [(opens, closes)] (겹치거나 이어지는 구간은 합치고,
+    일요일 밤을 넘기는 구간은 월요일 쪽으로 나눔 -> 한 시각에 최대 한 구간만 해당)
+    """
+    intervals = []
+    for day, field in enumerate(WEEKDAY_FIELDS):
+        interval = day_interval(getattr(pharm, field))
+        if interval is None:
+            continue
+        opens = day * MINUTES_PER_DAY + interval[0]
+        closes = day * MINUTES_PER_DAY + interval[1]
+        if closes > MINUTES_PER_WEEK:
+            intervals.append((opens, MINUTES_PER_WEEK))
+            opens, closes = 0, closes - MINUTES_PER_WEEK
+        intervals.append((opens, min(closes, MINUTES_PER_WEEK)))
+
+    merged = []
+    for opens, closes in sorted(intervals):
+        if merged and opens <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], closes))
+        else:
+            merged.append((opens, closes))
+    return merged
+
+def minute_of_week(moment=None):
+    """시각(기본: 현재)을 PHARM_SEARCH_SETTINGS['TIME_ZONE'] 기준 주간 분으로 (naive 는 그 시간대로 간주)"""
+    zone = ZoneInfo(_setting('TIME_ZONE', 'Asia/Seoul'))
+    moment = moment or timezone.now()
+    if timezone.is_naive(moment):
+        moment = moment.replace(tzinfo=zone)
+    local = moment.astimezone(zone)
+    return local.weekday() * MINUTES_PER_DAY + local.hour * 60 + local.minute
+
+def open_at(minute):
+    """
+    minute(주간 분)에 영업 중인 약국 조건 (Pharm 쿼리셋 filter 용)
+    약국별 구간이 겹치지 않으므로 조인해도 약국이 중복되지 않음
+    """
+    return Q(hours__opens__lte=minute, hours__closes__gt=minute)
+
+def open_pharm_ids(minute, pharm_ids):
+    """pharm_ids 중 minute 에 영업 중인 약국 id"""
+    return set(
+        PharmHours.objects.filter(pharm_id__in=pharm_ids, opens__lte=minute, closes__gt=minute)
+        .values_list('pharm_id', flat=True)
+    )
+
+def index_hours(pharms, batch_size=2000):
+    """약국들의 영업 구간 재생성, 처리한 약국 수 반환"""
+    count = 0
+    chunk = []
+    for pharm in pharms:
+        chunk.append(pharm)
+        if len(chunk) >= batch_size:
+            count += _index_chunk(chunk)
+            chunk = []
+    if chunk:
+        count += _index_chunk(chunk)
+    return count
+
+def _index_chunk(pharms):
+    PharmHours.objects.filter(pharm_id__in=[pharm.pk for pharm in pharms]).delete()
+    PharmHours.objects.bulk_create(
+        [
+            PharmHours(pharm_id=pharm.pk, opens=opens, closes=closes)
+            for pharm in pharms
+            for opens, closes in weekly_intervals(pharm)
+        ],
+        batch_size=2000,
+    )
+    return len(pharms)
@@ -0,0 +1,137 @@
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from pharms import geo
+from pharms.models import Pharm
+from pharms.snapshot import PharmSnapshot, _with_pharms, load_numpy
+
+ENGINES = ('loop', 'grid', 'snapshot-numpy', 'snapshot-array')
+
+
+def loop_within(lat, lon, radius_km):
+    """기존 방식: 전체 약국을 읽어서 한 건씩 거리 계산"""
+    results = []
+    for pharm in Pharm.objects.all():
+        distance = geo.haversine(lat, lon, pharm.lat, pharm.lon)
+        if distance <= radius_km:
+            results.append((distance, pharm.pk))
+    return results
+
+
+class Command(BaseCommand):
+    help = '주변 약국 검색 방식별(전체 순회, 격자 색인, 좌표 스냅샷) 지연 시간 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=30,
+            help='방식별 검색 횟수 (기본: 30)'
+        )
+        parser.add_argument(
+            '--radius',
+            type=float,
+            default=1,
+            help='검색 반경 (km, 기본: 1)'
+        )
+        parser.add_argument(
+            '--k',
+            type=int,
+            default=5,
+            help='스냅샷 k개 최근접 측정 개수 (기본: 5)'
+        )
+        parser.add_argument(
+            '--engines',
+            default=','.join(ENGINES),
+            help=f'측정할 방식 (쉼표 구분, 기본: {",".join(ENGINES)})'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='검색 좌표 난수 seed (기본: 0)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='결과를 JSON 으로 출력'
+        )
+
+    def handle(self, *args, **options):
+        engines = [name.strip() for name in options['engines'].split(',') if name.strip()]
+        unknown = set(engines) - set(ENGINES)
+        if unknown:
+            raise CommandError(f"알 수 없는 방식: {', '.join(sorted(unknown))}")
+
+        coordinates = list(Pharm.objects.values_list('lat', 'lon'))
+        if not coordinates:
+            raise CommandError("약국 데이터가 없습니다. load_pharm 을 먼저 실행해 주세요.")
+
+        # 실제 약국 근처 좌표로 검색 (약 ±500m)
+        rng = random.Random(options['seed'])
+        points = [
+            (lat + rng.uniform(-0.005, 0.005), lon + rng.uniform(-0.005, 0.005))
+            for lat, lon in rng.choices(coordinates, k=options['queries'])
+        ]
+        radius = options['radius']
+        expected = [sorted(pk for _, pk in loop_within(lat, lon, radius)) for lat, lon in points]
+
+        report = {'pharmacies': len(coordinates), 'queries': len(points), 'radius_km': radius, 'engines': {}}
+        for engine in engines:
+            searches = self._searches(engine, radius, options['k'])
+            if searches is None:
+                self.stdout.write(self.style.WARNING(f"{engine}: numpy 가 설치되어 있지 않아 건너뜀"))
+                continue
+            report['engines'][engine] = stats = {}
+            for name, search in searches.items():
+                timings = []
+                mismatches = 0
+                for (lat, lon), ids in zip(points, expected):
+                    started = time.perf_counter()
+                    results = search(lat, lon)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    if name.startswith('within') and sorted(pk for _, pk in results) != ids:
+                        mismatches += 1
+                timings.sort()
+                stats[name] = {
+                    'median_ms': round(statistics.median(timings), 3),
+                    'p95_ms': round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+                }
+                if name.startswith('within'):
+                    stats[name]['mismatches'] = mismatches
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+            return
+
+        self.stdout.write(f"약국 {report['pharmacies']}개, 검색 {report['queries']}회, 반경 {radius}km")
+        self.stdout.write(f"{'방식':<16}{'측정':<18}{'중앙값 ms':>11}{'p95 ms':>11}  결과 불일치")
+        for engine, stats in report['engines'].items():
+            for name, values in stats.items():
+                self.stdout.write(
+                    f"{engine:<16}{name:<18}{values['median_ms']:>11}{values['p95_ms']:>11}  "
+                    f"{values.get('mismatches', '-')}"
+                )
+
+    def _searches(self, engine, radius, k):
+        """방식별 {측정 이름: search(lat, lon)}"""
+        if engine == 'loop':
+            return {'within': lambda lat, lon: loop_within(lat, lon, radius)}
+        if engine == 'grid':
+            return {'within': lambda lat, lon: [(d, p.pk) for d, p in geo.pharms_within(lat, lon, radius)]}
+
+        use_numpy = engine == 'snapshot-numpy'
+        if use_numpy and load_numpy() is None:
+            return None
+        data = PharmSnapshot().build(use_numpy=use_numpy)
+        return {
+            # 스냅샷 거리 계산만 (Pharm 조회 제외)
+            'within': lambda lat, lon: data.within(lat, lon, radius),
+            # 뷰와 같이 결과 약국까지 조회
+            'within + Pharm': lambda lat, lon: [(d, p.pk) for d, p in _with_pharms(data.within(lat, lon, radius))],
+            f'nearest k={k}': lambda lat, lon: data.nearest(lat, lon, k),
+        }
@@ -1,37 +1,80 @@
-import json
 from typing import Any
 
 from django.core.management import BaseCommand
-import requests
-from config.utils import opening_hours
+from config.public_data import iter_pharmacy_items
+from pharms.geo import grid_cell
+from pharms.hours import WEEKDAY_FIELDS, index_hours
 from pharms.models import Pharm
+from pharms.sync import sync_pharmacies
 
-import xmltodict
 
 class Command(BaseCommand):
+    help = '공공데이터 API 의 약국 전체 목록을 페이지 단위로 받아 hpid 기준으로 저장 (--sync: 바뀐 약국만 반영)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sync',
+            action='store_true',
+            help='증분 동기화: 바뀐 약국만 갱신, 새 약국 추가, 목록에서 빠진 약국 삭제'
+        )
+        parser.add_argument(
+            '--max-delete-ratio',
+            type=float,
+            default=0.2,
+            help='--sync 시 받은 목록이 기존 약국 수보다 이 비율 이상 적으면 삭제하지 않음 (기본: 0.2)'
+        )
+        parser.add_argument(
+            '--reindex',
+            action='store_true',
+            help='API 호출 없이 저장된 약국의 격자 칸 번호(grid_cell)와 영업 구간(PharmHours)만 다시 계산'
+        )
+        parser.add_argument(
+            '--page-size',
+            type=int,
+            default=None,
+            help='API 한 페이지 행 수 (기본: PUBLIC_DATA_API_SETTINGS 의 PHARMACY_PAGE_SIZE, 1000)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='한 번에 저장할 약국 수 (기본: 1000)'
+        )
 
     def handle(self, *args: Any, **options: Any):
-    
-        url = 'http://apis.data.go.kr/B552657/ErmctInsttInfoInqireService/getParmacyFullDown'
-        
-        params = {'serviceKey':'C0OCzqNhw6sohn5jE2c1L52H4YKftzf9U8nxGSsC5GqH1YzH4Uu9VJ18zMHmpBrOEPgm3jqSOUpHh3j1oLcwLw==','pageNo':1,'numOfRows':24498}
-        response = requests.get(url,params=params)
-            
-        jsonString = json.dumps(xmltodict.parse(response.content), indent=4)
-    
-        dict_data = json.loads(jsonString)
-                    
-        items = dict_data.get('response').get('body').get('items').get('item')
-        print(len(items))
-        
-        data_list = []
-
-        if items:
-            for item in items:
-                data = {"addr":item['dutyAddr'],"name":item['dutyName'],"timeMon":opening_hours(item.get('dutyTime1s'),item.get('dutyTime1c')),"timeTue":opening_hours(item.get('dutyTime2s'),item.get('dutyTime2c')),
-                        "timeWed":opening_hours(item.get('dutyTime3s'),item.get('dutyTime3c')),"timeThu":opening_hours(item.get('dutyTime4s'),item.get('dutyTime4c')),"timeFri":opening_hours(item.get('dutyTime5s'),item.get('dutyTime5c')),
-                        "timeSat":opening_hours(item.get('dutyTime6s'),item.get('dutyTime6c')),"timeSun":opening_hours(item.get('dutyTime7s'),item.get('dutyTime7c')),"lat":item.get('wgs84Lat'),"lon":item.get('wgs84Lon')}
-                pharm = Pharm(**data)
-                data_list.append(pharm)
-            Pharm.objects.bulk_create(data_list,batch_size=24498,ignore_conflicts=True)
-            
\ No newline at end of file
+        if options['reindex']:
+            self._reindex()
+            return
+
+        # 페이지를 받는 대로 XML 을 읽고 batch_size 개씩 upsert (전체 목록을 메모리에 올리지 않음)
+        result = sync_pharmacies(
+            iter_pharmacy_items(num_of_rows=options['page_size']),
+            incremental=options['sync'],
+            batch_size=options['batch_size'],
+            max_delete_ratio=options['max_delete_ratio'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"약국 {'동기화' if options['sync'] else '저장'} 완료: 추가 {result.created}개, 갱신 {result.updated}개, "
+            f"동일 {result.unchanged}개, 삭제 {result.deleted}개, 건너뜀 {result.skipped}개"
+        ))
+        if result.delete_blocked:
+            self.stdout.write(self.style.WARNING(
+                f"받은 목록이 기존보다 너무 적어 {result.delete_blocked}개를 삭제하지 않았습니다 (--max-delete-ratio 확인)"
+            ))
+
+    def _reindex(self, chunk_size=2000):
+        updated = []
+        count = 0
+        for pharm in Pharm.objects.only('id', 'lat', 'lon', 'grid_cell').iterator(chunk_size=chunk_size):
+            pharm.grid_cell = grid_cell(pharm.lat, pharm.lon)
+            updated.append(pharm)
+            if len(updated) >= chunk_size:
+                Pharm.objects.bulk_update(updated, ['grid_cell'])
+                count += len(updated)
+                updated = []
+        Pharm.objects.bulk_update(updated, ['grid_cell'])
+        count += len(updated)
+        self.stdout.write(self.style.SUCCESS(f"격자 색인 갱신 완료: {count}개"))
+
+        count = index_hours(Pharm.objects.only('id', *WEEKDAY_FIELDS).iterator(chunk_size=chunk_size), batch_size=chunk_size)
+        self.stdout.write(self.style.SUCCESS(f"영업 구간 갱신 완료: {count}개"))
@@ -1,6 +1,10 @@
 from django.db import models
 
+from .geo import grid_cell
+
 class Pharm(models.Model):
+    # 공공데이터 약국 기관 ID (동기화 키, 이전에 저장된 약국은 없음)
+    hpid = models.CharField(max_length=20, unique=True, null=True)
     addr = models.TextField()
     name = models.CharField(max_length=255)
     timeMon = models.TextField()
@@ -11,4 +15,33 @@ class Pharm(models.Model):
     timeSat = models.TextField(default='Closed')
     timeSun = models.TextField(default='Closed')
     lat = models.FloatField()
-    lon = models.FloatField()
\ No newline at end of file
+    lon = models.FloatField()
+    # 위치 검색용 격자 칸 번호 (pharms.geo.grid_cell, 저장 시 자동 계산)
+    grid_cell = models.IntegerField(null=True, db_index=True)
+    # 마지막으로 반영한 API 원본의 해시 (pharms.sync.record_hash, 바뀐 약국만 갱신)
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # 좌표만 저장(update_fields)해도 격자 칸 번호가 함께 저장되도록 여기서 계산
+        # (bulk_create/bulk_update 는 호출한 쪽에서 계산)
+        self.grid_cell = grid_cell(self.lat, self.lon)
+        if update_fields is not None and {'lat', 'lon'} & set(update_fields):
+            update_fields = {*update_fields, 'grid_cell'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+class PharmHours(models.Model):
+    """
+    요일별 영업시간(timeMon~timeSun)을 분 단위 주간 구간으로 미리 계산한 값 (pharms.hours)
+    월요일 0시 = 0, 일요일 24시 = 10080. 자정을 넘기는 영업은 다음 요일까지 이어지는 구간으로 저장
+    """
+    pharm = models.ForeignKey(Pharm, on_delete=models.CASCADE, related_name='hours')
+    opens = models.PositiveIntegerField()
+    closes = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['opens', 'closes']),
+        ]
+
+    def __str__(self):
+        return f"{self.pharm_id}: {self.opens}~{self.closes}"
@@ -4,4 +4,4 @@ from rest_framework import serializers
 class PharmSerializer(serializers.ModelSerializer):
     class Meta:
         model = Pharm
-        fields = '__all__'
\ No newline at end of file
+        exclude = ['grid_cell', 'hpid', 'content_hash']
\ No newline at end of file
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .hours import WEEKDAY_FIELDS, index_hours
+from .models import Pharm
+from .snapshot import bump_snapshot_version, snapshot
+
+SNAPSHOT_FIELDS = {'lat', 'lon'}
+HOURS_FIELDS = set(WEEKDAY_FIELDS)
+
+
+@receiver(post_save, sender=Pharm)
+def refresh_snapshot(sender, instance, created, update_fields=None, **kwargs):
+    """약국 추가/좌표 변경 시 좌표 스냅샷 갱신 (bulk 작업은 호출한 쪽에서 bump_snapshot_version)"""
+    if created or update_fields is None or SNAPSHOT_FIELDS & set(update_fields):
+        snapshot.invalidate()
+        bump_snapshot_version()
+
+@receiver(post_save, sender=Pharm)
+def refresh_hours(sender, instance, created, update_fields=None, **kwargs):
+    """영업시간이 바뀌면 영업 구간(PharmHours) 재계산 (bulk 작업은 호출한 쪽에서 index_hours)"""
+    if created or update_fields is None or HOURS_FIELDS & set(update_fields):
+        index_hours([instance])
+
+@receiver(post_delete, sender=Pharm)
+def remove_from_snapshot(sender, instance, **kwargs):
+    snapshot.invalidate()
+    bump_snapshot_version()
@@ -0,0 +1,223 @@
+"""약국 좌표 스냅샷 거리 계산
+
+약국 id, 위도, 경도를 프로세스 메모리의 배열로 들고 있다가 요청마다 전체 약국과의 거리를
+한 번에 계산한다 (모델 인스턴스 생성 없음). NumPy 가 있으면 벡터 연산과 argpartition 으로
+k개 최근접을 고르고, 없으면 array 모듈 배열을 순회한다.
+Pharm 이 바뀌면 버전을 올려 각 워커가 다음 조회 때 스냅샷을 다시 만든다.
+"""
+import heapq
+import threading
+from array import array
+from math import asin, cos, radians, sin, sqrt
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .geo import EARTH_RADIUS_KM
+
+SNAPSHOT_VERSION_KEY = 'pharm_snapshot_version'
+
+# 영업 중 약국 검색 시 한 번에 영업 여부를 확인하는 최소 약국 수
+OPEN_BATCH_MIN = 32
+
+
+def _setting(key, default):
+    return getattr(settings, 'PHARM_SEARCH_SETTINGS', {}).get(key, default)
+
+def load_numpy():
+    """NumPy (설치되어 있지 않으면 None, 첫 스냅샷 생성 때 import)"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def bump_snapshot_version():
+    """약국 목록 변경 알림 (각 워커의 스냅샷이 다음 조회 때 다시 만들어짐)"""
+    cache.add(SNAPSHOT_VERSION_KEY, 0, None)
+    try:
+        return cache.incr(SNAPSHOT_VERSION_KEY)
+    except ValueError:
+        cache.set(SNAPSHOT_VERSION_KEY, 1, None)
+        return 1
+
+def snapshot_version():
+    return cache.get(SNAPSHOT_VERSION_KEY, 0)
+
+
+class _ArraySnapshot:
+    """array 모듈 배열 (NumPy 가 없을 때)"""
+
+    def __init__(self, rows):
+        self.ids = array('q')
+        self.lats = array('d')
+        self.lons = array('d')
+        self.cos_lats = array('d')
+        for pk, lat, lon in rows:
+            self.ids.append(pk)
+            self.lats.append(radians(lat))
+            self.lons.append(radians(lon))
+            self.cos_lats.append(cos(radians(lat)))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _distances(self, lat, lon):
+        lat, lon = radians(lat), radians(lon)
+        cos_lat = cos(lat)
+        diameter = 2 * EARTH_RADIUS_KM
+        for pk, pharm_lat, pharm_lon, pharm_cos_lat in zip(self.ids, self.lats, self.lons, self.cos_lats):
+            a = sin((pharm_lat - lat) * 0.5) ** 2 + cos_lat * pharm_cos_lat * sin((pharm_lon - lon) * 0.5) ** 2
+            yield diameter * asin(sqrt(a)), pk
+
+    def within(self, lat, lon, radius_km):
+        return [(distance, pk) for distance, pk in self._distances(lat, lon) if distance <= radius_km]
+
+    def nearest(self, lat, lon, k, radius_km=None):
+        candidates = self._distances(lat, lon)
+        if radius_km is not None:
+            candidates = ((distance, pk) for distance, pk in candidates if distance <= radius_km)
+        return heapq.nsmallest(k, candidates)
+
+
+class _NumpySnapshot:
+    """NumPy float64 배열"""
+
+    def __init__(self, rows, np):
+        self.np = np
+        rows = list(rows)
+        self.ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        self.lats = np.radians(np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows)))
+        self.lons = np.radians(np.fromiter((row[2] for row in rows), dtype=np.float64, count=len(rows)))
+        self.cos_lats = np.cos(self.lats)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _distances(self, lat, lon):
+        # 임시 배열을 줄이려고 제자리 연산 (2R * asin(sqrt(a)) 는 geo.haversine 과 같은 값)
+        np = self.np
+        a = np.sin((self.lats - radians(lat)) * 0.5)
+        a *= a
+        b = np.sin((self.lons - radians(lon)) * 0.5)
+        b *= b
+        b *= self.cos_lats
+        b *= cos(radians(lat))
+        a += b
+        np.sqrt(a, out=a)
+        np.arcsin(a, out=a)
+        a *= 2 * EARTH_RADIUS_KM
+        return a
+
+    def within(self, lat, lon, radius_km):
+        distances = self._distances(lat, lon)
+        # ids 가 pk 순이므로 결과도 pk 순
+        hits = self.np.flatnonzero(distances <= radius_km)
+        return list(zip(distances[hits].tolist(), self.ids[hits].tolist()))
+
+    def nearest(self, lat, lon, k, radius_km=None):
+        np = self.np
+        if k <= 0 or not len(self.ids):
+            return []
+        distances = self._distances(lat, lon)
+        if radius_km is not None:
+            candidates = np.flatnonzero(distances <= radius_km)
+            if len(candidates) > k:
+                candidates = candidates[np.argpartition(distances[candidates], k - 1)[:k]]
+        elif len(distances) > k:
+            candidates = np.argpartition(distances, k - 1)[:k]
+        else:
+            candidates = np.arange(len(distances))
+        candidates = candidates[np.argsort(distances[candidates], kind='stable')]
+        return list(zip(distances[candidates].tolist(), self.ids[candidates].tolist()))
+
+
+class PharmSnapshot:
+    """
+    약국 좌표 스냅샷 (프로세스 전역)
+    within(), nearest() 는 [(거리 km, Pharm id)] 를 돌려준다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = None
+        self._version = None
+
+    def get(self):
+        version = snapshot_version()
+        data = self._data
+        if data is not None and self._version == version:
+            return data
+
+        with self._lock:
+            if self._data is None or self._version != version:
+                self._data = self.build()
+                self._version = version
+            return self._data
+
+    def build(self, use_numpy=None):
+        from .models import Pharm
+
+        if use_numpy is None:
+            use_numpy = _setting('USE_NUMPY', True)
+        np = load_numpy() if use_numpy else None
+        rows = Pharm.objects.order_by('pk').values_list('pk', 'lat', 'lon').iterator(chunk_size=5000)
+        if np is None:
+            return _ArraySnapshot(rows)
+        return _NumpySnapshot(rows, np)
+
+    def invalidate(self):
+        """현재 프로세스의 스냅샷 폐기 (signals 에서 호출)"""
+        with self._lock:
+            self._data = None
+
+    def within(self, lat, lon, radius_km):
+        """radius_km 안의 약국 (id 순)"""
+        return self.get().within(lat, lon, radius_km)
+
+    def nearest(self, lat, lon, k=1, radius_km=None):
+        """가까운 순으로 최대 k개 약국 (radius_km 를 주면 반경 안에서만)"""
+        return self.get().nearest(lat, lon, k, radius_km)
+
+
+snapshot = PharmSnapshot()
+
+
+def _with_pharms(hits):
+    """[(거리, id)] -> [(거리, Pharm)] (스냅샷 이후 삭제된 약국은 제외)"""
+    from .models import Pharm
+
+    pharms = Pharm.objects.in_bulk([pk for _, pk in hits])
+    return [(distance, pharms[pk]) for distance, pk in hits if pk in pharms]
+
+def pharms_within(lat, lon, radius_km):
+    """radius_km 안의 약국 [(거리 km, Pharm)] (id 순, geo.pharms_within 과 같은 결과)"""
+    return _with_pharms(snapshot.within(lat, lon, radius_km))
+
+def nearest_pharms(lat, lon, k=1, radius_km=None):
+    """가까운 순으로 최대 k개 약국 [(거리 km, Pharm)]"""
+    return _with_pharms(snapshot.nearest(lat, lon, k, radius_km))
+
+def nearest_pharm(lat, lon, radius_km):
+    """radius_km 안에서 가장 가까운 약국 (없으면 None)"""
+    results = nearest_pharms(lat, lon, 1, radius_km)
+    return results[0][1] if results else None
+
+def nearest_open_pharms(lat, lon, k, minute, radius_km):
+    """minute(주간 분)에 영업 중인 radius_km 안의 약국 중 가까운 순으로 최대 k개 [(거리 km, Pharm)]"""
+    from .hours import open_pharm_ids
+
+    # 가까운 약국부터 batch 개씩 영업 여부 확인 (밤처럼 영업 중인 곳이 드물면 batch 를 늘림)
+    batch = max(OPEN_BATCH_MIN, k * 8)
+    checked = 0
+    found = []
+    while True:
+        hits = snapshot.nearest(lat, lon, batch, radius_km)
+        candidates = hits[checked:]
+        open_ids = open_pharm_ids(minute, [pk for _, pk in candidates])
+        found.extend(hit for hit in candidates if hit[1] in open_ids)
+        if len(found) >= k or len(hits) < batch:
+            break
+        checked = len(hits)
+        batch *= 4
+    return _with_pharms(found[:k])
@@ -0,0 +1,146 @@
+"""공공데이터 약국 목록 동기화
+
+약국은 기관 ID(hpid)로 식별하고, API 원본에서 저장하는 값의 해시(content_hash)를 함께 저장한다.
+증분 동기화는 해시가 바뀐 약국만 갱신하고 새 약국은 추가, 목록에서 빠진 약국(폐업)은 삭제한다.
+추가/갱신은 hpid 기준 bulk upsert (INSERT ... ON CONFLICT DO UPDATE) 로 batch_size 개씩 처리한다.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+
+from config.utils import opening_hours
+
+from .geo import grid_cell
+from .hours import WEEKDAY_FIELDS, index_hours
+from .models import Pharm
+from .snapshot import bump_snapshot_version
+
+logger = logging.getLogger(__name__)
+
+# API 에서 받아 저장하는 필드 (해시 대상, upsert 시 갱신)
+SOURCE_FIELDS = ['name', 'addr', *WEEKDAY_FIELDS, 'lat', 'lon']
+UPSERT_FIELDS = [*SOURCE_FIELDS, 'grid_cell', 'content_hash']
+
+
+@dataclass
+class SyncResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    skipped: int = 0  # hpid/좌표가 없거나 목록에 중복된 항목
+    delete_blocked: int = 0  # 받은 목록이 너무 적어 지우지 않은 약국 수
+
+    @property
+    def changed(self):
+        return self.created + self.updated + self.deleted
+
+
+def pharm_from_item(item):
+    """약국 목록 <item> -> Pharm (저장 전, hpid/좌표가 없으면 None)"""
+    if not item.get('hpid') or item.get('wgs84Lat') is None or item.get('wgs84Lon') is None:
+        return None
+    data = {"hpid":item['hpid'],"addr":item.get('dutyAddr') or '',"name":item.get('dutyName') or '',"timeMon":opening_hours(item.get('dutyTime1s'),item.get('dutyTime1c')),"timeTue":opening_hours(item.get('dutyTime2s'),item.get('dutyTime2c')),
+            "timeWed":opening_hours(item.get('dutyTime3s'),item.get('dutyTime3c')),"timeThu":opening_hours(item.get('dutyTime4s'),item.get('dutyTime4c')),"timeFri":opening_hours(item.get('dutyTime5s'),item.get('dutyTime5c')),
+            "timeSat":opening_hours(item.get('dutyTime6s'),item.get('dutyTime6c')),"timeSun":opening_hours(item.get('dutyTime7s'),item.get('dutyTime7c')),"lat":float(item['wgs84Lat']),"lon":float(item['wgs84Lon'])}
+    pharm = Pharm(**data)
+    # bulk_create 는 Pharm.save() 를 거치지 않으므로 직접 계산
+    pharm.grid_cell = grid_cell(pharm.lat, pharm.lon)
+    pharm.content_hash = record_hash(pharm)
+    return pharm
+
+def record_hash(pharm):
+    """저장하는 필드 값의 해시 (영업시간, 위치, 이름, 주소 중 하나라도 바뀌면 달라짐)"""
+    source = '\x1f'.join(str(getattr(pharm, field)) for field in SOURCE_FIELDS)
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+def _upsert(pharms):
+    """hpid 기준 추가/갱신 후 영업 구간 재계산 (bulk 작업은 시그널을 거치지 않음)"""
+    Pharm.objects.bulk_create(
+        pharms,
+        update_conflicts=True,
+        unique_fields=['hpid'],
+        update_fields=UPSERT_FIELDS,
+    )
+    saved = Pharm.objects.filter(hpid__in=[pharm.hpid for pharm in pharms]).only('id', *WEEKDAY_FIELDS)
+    index_hours(saved)
+
+def _delete(pks, batch_size):
+    for start in range(0, len(pks), batch_size):
+        Pharm.objects.filter(pk__in=pks[start:start + batch_size]).delete()
+
+def _purge_legacy(seen_count, batch_size, max_delete_ratio):
+    """
+    hpid 없이 저장된 이전 데이터 삭제 (삭제한 수, 막힌 수)
+    이전 적재는 실행할 때마다 전체 목록을 다시 추가해 같은 약국이 여러 번 들어 있을 수 있으므로
+    행 수 대신 (이름, 주소) 기준 약국 수와 받은 목록을 비교
+    """
+    legacy = Pharm.objects.filter(hpid=None)
+    pks = list(legacy.values_list('pk', flat=True))
+    if not pks:
+        return 0, 0
+    distinct = legacy.values('name', 'addr').distinct().count()
+    if not seen_count or seen_count < distinct * (1 - max_delete_ratio):
+        logger.warning(f"약국 동기화: 받은 약국 {seen_count}개가 이전 데이터 {distinct}곳보다 너무 적어 {len(pks)}개를 삭제하지 않음")
+        return 0, len(pks)
+    _delete(pks, batch_size)
+    logger.info(f"약국 동기화: hpid 없는 이전 데이터 {len(pks)}개 삭제")
+    return len(pks), 0
+
+def sync_pharmacies(items, incremental=True, batch_size=1000, max_delete_ratio=0.2):
+    """
+    API 약국 목록(items) 을 DB 에 반영하고 SyncResult 반환
+    incremental=True: 해시가 같은 약국은 건너뛰고, 목록에 없는 약국(폐업)은 삭제
+    incremental=False: 모든 약국을 다시 저장 (폐업 약국은 삭제하지 않음)
+    hpid 없는 이전 데이터는 두 경우 모두 목록을 끝까지 받은 뒤 삭제
+    받은 목록이 기존 약국 수보다 max_delete_ratio 이상 적으면 API 이상으로 보고 삭제하지 않음
+    """
+    result = SyncResult()
+    existing = dict(Pharm.objects.exclude(hpid=None).values_list('hpid', 'content_hash').iterator(chunk_size=5000))
+    # 삭제 비율 기준은 hpid 로 저장된 약국만 (중복된 이전 데이터가 섞이면 항상 막힘)
+    total = len(existing)
+    seen = set()
+    chunk = []
+
+    for item in items:
+        pharm = pharm_from_item(item)
+        if pharm is None or pharm.hpid in seen:
+            # 같은 hpid 가 한 upsert 문에 두 번 들어가면 오류가 나므로 처음 것만 반영
+            result.skipped += 1
+            continue
+        seen.add(pharm.hpid)
+
+        previous_hash = existing.get(pharm.hpid)
+        if previous_hash is None:
+            result.created += 1
+        elif incremental and previous_hash == pharm.content_hash:
+            result.unchanged += 1
+            continue
+        else:
+            result.updated += 1
+
+        chunk.append(pharm)
+        if len(chunk) >= batch_size:
+            _upsert(chunk)
+            chunk = []
+    if chunk:
+        _upsert(chunk)
+
+    # 목록을 끝까지 받은 뒤에만 삭제 (중간에 실패하면 예외로 여기까지 오지 않음)
+    result.deleted, result.delete_blocked = _purge_legacy(len(seen), batch_size, max_delete_ratio)
+
+    if incremental:
+        stale = [
+            pk for pk, hpid in Pharm.objects.exclude(hpid=None).values_list('pk', 'hpid').iterator(chunk_size=5000)
+            if hpid not in seen
+        ]
+        if stale and (not seen or len(seen) < total * (1 - max_delete_ratio)):
+            logger.warning(f"약국 동기화: 받은 약국 {len(seen)}개가 기존 {total}개보다 너무 적어 {len(stale)}개를 삭제하지 않음")
+            result.delete_blocked += len(stale)
+        else:
+            _delete(stale, batch_size)
+            result.deleted += len(stale)
+
+    if result.changed:
+        bump_snapshot_version()
+    return result
@@ -0,0 +1,19 @@
+from dataclasses import asdict
+
+from celery import shared_task
+from config.public_data import iter_pharmacy_items
+from pharms.sync import sync_pharmacies
+import logging
+
+logger = logging.getLogger(__name__)
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_kwargs={'max_retries': 3, 'countdown': 300})
+def sync_pharmacy_list(self, max_delete_ratio=0.2):
+    """
+    공공데이터 약국 목록 증분 동기화 (바뀐 약국만 갱신, 새 약국 추가, 폐업 약국 삭제)
+    """
+    result = sync_pharmacies(iter_pharmacy_items(), incremental=True, max_delete_ratio=max_delete_ratio)
+    logger.info(f"약국 동기화 완료: {result}")
+    if result.delete_blocked:
+        logger.warning(f"약국 동기화: 받은 목록이 너무 적어 {result.delete_blocked}개를 삭제하지 않음")
+    return asdict(result)
@@ -1,3 +1,158 @@
-from django.test import TestCase
+from unittest import mock
+from zoneinfo import ZoneInfo
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import PillingUser
+from pharms import geo, snapshot
+from pharms.geo import grid_cell
+from pharms.hours import MINUTES_PER_DAY, MINUTES_PER_WEEK, WEEKDAY_FIELDS, minute_of_week, weekly_intervals
+from pharms.models import Pharm
+from pharms.sync import sync_pharmacies
+from pharms.views import _open_minute
+
+
+def make_pharm(**fields):
+    defaults = dict(addr='서울', name='약국', timeMon='0900~1800', timeTue='0900~1800', timeWed='0900~1800',
+                    timeThu='0900~1800', timeFri='0900~1800', lat=37.5665, lon=126.9780)
+    defaults.update(fields)
+    return Pharm.objects.create(**defaults)
+
+
+class GridCellTest(TestCase):
+    def test_saving_coordinates_with_update_fields_updates_grid_cell(self):
+        pharm = make_pharm()
+        pharm.lat, pharm.lon = 35.1796, 129.0756
+        pharm.save(update_fields=['lat', 'lon'])
+
+        pharm.refresh_from_db()
+        self.assertEqual(pharm.grid_cell, grid_cell(35.1796, 129.0756))
+
+
+def hours(**fields):
+    """fields 외의 요일은 휴무인 (저장하지 않은) 약국"""
+    return Pharm(**{**{field: 'Closed' for field in WEEKDAY_FIELDS}, **fields})
+
+
+class WeeklyIntervalsTest(SimpleTestCase):
+    def test_day_hours(self):
+        self.assertEqual(weekly_intervals(hours(timeMon='0900~1800')), [(540, 1080)])
+
+    def test_close_before_open_ends_next_day(self):
+        self.assertEqual(weekly_intervals(hours(timeMon='2200~0200')), [(1320, MINUTES_PER_DAY + 120)])
+
+    def test_close_after_2400(self):
+        tuesday = MINUTES_PER_DAY
+        self.assertEqual(weekly_intervals(hours(timeTue='0900~2600')), [(tuesday + 540, tuesday + MINUTES_PER_DAY + 120)])
+
+    def test_sunday_night_wraps_to_monday(self):
+        sunday = 6 * MINUTES_PER_DAY
+        self.assertEqual(weekly_intervals(hours(timeSun='2200~0300')), [(0, 180), (sunday + 1320, MINUTES_PER_WEEK)])
+        # 월요일 새벽 영업과 이어지면 하나로 합침
+        self.assertEqual(weekly_intervals(hours(timeSun='2200~0300', timeMon='0100~0900')),
+                         [(0, 540), (sunday + 1320, MINUTES_PER_WEEK)])
+
+    def test_overlapping_days_are_merged(self):
+        self.assertEqual(weekly_intervals(hours(timeMon='0900~0300', timeTue='0000~1200')), [(540, MINUTES_PER_DAY + 720)])
+
+    def test_closed_and_malformed_hours_are_skipped(self):
+        self.assertEqual(weekly_intervals(hours(timeMon='09:00~18:00', timeTue='0900~', timeWed='0960~1800')), [])
+
+
+class MinuteOfWeekTest(SimpleTestCase):
+    def test_naive_time_is_local(self):
+        self.assertEqual(minute_of_week(timezone.datetime(2024, 1, 1, 9, 30)), 570)  # 월요일
+        self.assertEqual(minute_of_week(timezone.datetime(2024, 1, 7, 23, 59)), MINUTES_PER_WEEK - 1)  # 일요일
+
+    def test_aware_time_is_converted(self):
+        # 일요일 15:00 UTC = 월요일 00:00 KST
+        self.assertEqual(minute_of_week(timezone.datetime(2024, 1, 7, 15, 0, tzinfo=ZoneInfo('UTC'))), 0)
+
+    def test_open_parameter(self):
+        self.assertEqual(_open_minute('2024-01-02T01:30:00'), MINUTES_PER_DAY + 90)
+        self.assertEqual(_open_minute('2024-01-01T16:30:00Z'), MINUTES_PER_DAY + 90)
+        self.assertIsNone(_open_minute('tomorrow'))
+        self.assertIsNone(_open_minute('2024-13-01T00:00:00'))
+        with mock.patch('pharms.views.minute_of_week', return_value=42) as now:
+            for value in ('now', 'true', '1'):
+                self.assertEqual(_open_minute(value), 42)
+        now.assert_called_with()
+
+
+def api_item(index):
+    return {'hpid': f'C{index:07d}', 'dutyName': f'약국{index}', 'dutyAddr': f'서울 {index}',
+            'dutyTime1s': '0900', 'dutyTime1c': '1800', 'wgs84Lat': 37.5 + index / 1000, 'wgs84Lon': 127.0}
+
+
+class SyncPharmaciesTest(TestCase):
+    def setUp(self):
+        self.items = [api_item(index) for index in range(10)]
+        # hpid 없이 전체 목록을 두 번 적재한 이전 데이터
+        for _ in range(2):
+            for index in range(10):
+                make_pharm(name=f'약국{index}', addr=f'서울 {index}')
+
+    def test_sync_replaces_duplicated_legacy_rows(self):
+        result = sync_pharmacies(self.items, incremental=True)
+
+        self.assertEqual(result.created, 10)
+        self.assertEqual(result.deleted, 20)
+        self.assertEqual(result.delete_blocked, 0)
+        self.assertFalse(Pharm.objects.filter(hpid=None).exists())
+        self.assertEqual(Pharm.objects.count(), 10)
+
+    def test_full_load_also_replaces_legacy_rows(self):
+        sync_pharmacies(self.items, incremental=False)
+
+        self.assertFalse(Pharm.objects.filter(hpid=None).exists())
+        self.assertEqual(Pharm.objects.count(), 10)
+
+    def test_short_list_keeps_legacy_rows(self):
+        result = sync_pharmacies(self.items[:5], incremental=True)
+
+        self.assertEqual(result.deleted, 0)
+        self.assertEqual(result.delete_blocked, 20)
+        self.assertEqual(Pharm.objects.filter(hpid=None).count(), 20)
+
+
+def ids(results):
+    return [pharm.pk for _, pharm in results]
+
+
+class EngineConsistencyTest(TestCase):
+    def setUp(self):
+        # 서울시청 주변에 흩어진 약국 (짝수 번째만 야간 영업)
+        for index in range(30):
+            hours = '0900~0200' if index % 2 == 0 else '0900~1800'
+            make_pharm(name=f'약국{index}', lat=37.5665 + (index % 6 - 3) * 0.002, lon=126.9780 + (index // 6 - 2) * 0.003,
+                       timeMon=hours, timeTue=hours)
+        snapshot.snapshot.invalidate()
+
+    def test_snapshot_and_grid_return_same_pharms(self):
+        lat, lon = 37.5670, 126.9785
+        night = minute_of_week(timezone.datetime(2024, 1, 1, 23, 0))  # 월요일 23시
+
+        for use_numpy in (True, False):
+            with self.subTest(use_numpy=use_numpy), override_settings(PHARM_SEARCH_SETTINGS={'USE_NUMPY': use_numpy}):
+                snapshot.snapshot.invalidate()
+                self.assertEqual(ids(snapshot.pharms_within(lat, lon, 0.5)), ids(geo.pharms_within(lat, lon, 0.5)))
+                self.assertEqual(snapshot.nearest_pharm(lat, lon, 0.1), geo.nearest_pharm(lat, lon, 0.1))
+                self.assertEqual(ids(snapshot.nearest_open_pharms(lat, lon, 5, night, 3)),
+                                 ids(geo.nearest_open_pharms(lat, lon, 5, night, 3)))
+
+    def test_view_orders_results_the_same_with_both_engines(self):
+        user = PillingUser.objects.create_user(kakao_sub=1, nickname='tester', picture='')
+        headers = {'Authorization': f'Bearer {RefreshToken.for_user(user).access_token}'}
+        params = {'lat': 37.5670, 'lon': 126.9785}
+        responses = {}
+        for engine in ('snapshot', 'grid'):
+            with override_settings(PHARM_SEARCH_SETTINGS={'ENGINE': engine}):
+                responses[engine] = (
+                    self.client.get('/pharm', params, headers=headers).json(),
+                    self.client.get('/pharm', {**params, 'open': '2024-01-01T23:00:00', 'k': 5}, headers=headers).json(),
+                )
+
+        self.assertEqual(len(responses['snapshot'][1]), 5)
+        self.assertEqual(responses['snapshot'], responses['grid'])
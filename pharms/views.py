@@ -1,22 +1,34 @@
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from math import radians, cos, sin, sqrt, atan2
-from .models import Pharm
+from django.conf import settings
+from django.utils.dateparse import parse_datetime
+from . import geo, snapshot
+from .hours import minute_of_week
 from  .serializers import PharmSerializer
 
+
+def _engine():
+    """거리 계산 방식 (PHARM_SEARCH_SETTINGS['ENGINE'], 기본 snapshot / 'grid' 면 격자 색인)"""
+    engine = getattr(settings, 'PHARM_SEARCH_SETTINGS', {}).get('ENGINE', 'snapshot')
+    return geo if engine == 'grid' else snapshot
+
+def _open_minute(value):
+    """open 파라미터('now' 또는 ISO 8601 시각)를 주간 분으로, 형식이 틀리면 None"""
+    if value in ('now', 'true', '1'):
+        return minute_of_week()
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        # 형식은 맞지만 없는 날짜/시각 (예: 13월)
+        return None
+    return None if moment is None else minute_of_week(moment)
+
 @api_view(['POST','GET'])
 def pharm_info(request):
+    # 좌표 스냅샷(snapshot) 또는 격자 색인(geo)으로 주변 약국 거리 계산
+    engine = _engine()
 
-    def haversine(lat1, lon1, lat2, lon2):
-            R = 6371  # 지구 반경 (km)
-            dlat = radians(lat2 - lat1)
-            dlon = radians(lon2 - lon1)
-            a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-            c = 2 * atan2(sqrt(a), sqrt(1 - a))
-            distance = R * c
-            return distance
-    
     if request.method == 'POST':
         lat = request.data.get('lat',None)
         lon = request.data.get('lon',None)
@@ -26,22 +38,14 @@ def pharm_info(request):
 
         radius = 0.1
 
-        pharms = Pharm.objects.all()
-
-        user_pharm = None
-
-        for pharm in pharms:
-            distance = haversine(lat,lon,pharm.lat,pharm.lon)
-            if distance <= radius:
-                user_pharm = pharm
-                radius = distance
+        user_pharm = engine.nearest_pharm(float(lat),float(lon),radius)
 
         if user_pharm is None:
             return Response("데이터베이스 상에 존재하지 않는 약국입니다.",status=status.HTTP_400_BAD_REQUEST)
-        
+
         serializer = PharmSerializer(user_pharm)
         return Response(serializer.data)
-    
+
     if request.method == 'GET':
 
         lat_data = request.GET.get('lat',None)
@@ -53,14 +57,26 @@ def pharm_info(request):
         user_lat = float(lat_data)
         user_lon = float(lon_data)
 
-        near_pharm = []
+        open_param = request.GET.get('open',None)
+        if open_param is not None:
+            # 지정 시각(기본 지금)에 영업 중인 약국 중 가까운 k개
+            minute = _open_minute(open_param)
+            if minute is None:
+                return Response("open 은 'now' 또는 ISO 8601 시각이어야 합니다.",status=status.HTTP_400_BAD_REQUEST)
+            pharm_settings = getattr(settings, 'PHARM_SEARCH_SETTINGS', {})
+            try:
+                k = int(request.GET.get('k',pharm_settings.get('OPEN_DEFAULT_K', 5)))
+                radius = float(request.GET.get('radius',pharm_settings.get('OPEN_RADIUS_KM', 3)))
+            except ValueError:
+                return Response("k, radius 는 숫자여야 합니다.",status=status.HTTP_400_BAD_REQUEST)
+            k = max(1, min(k, pharm_settings.get('OPEN_MAX_K', 50)))
+            radius = max(0, min(radius, pharm_settings.get('OPEN_MAX_RADIUS_KM', 10)))
+
+            open_pharm = [pharm for _, pharm in engine.nearest_open_pharms(user_lat,user_lon,k,minute,radius)]
+            serializer = PharmSerializer(open_pharm,many=True)
+            return Response(serializer.data)
+
+        near_pharm = [pharm for _, pharm in engine.pharms_within(user_lat,user_lon,1)]
 
-        for pharm in Pharm.objects.all():
-            
-            distance = haversine(user_lat,user_lon,pharm.lat,pharm.lon)
-        
-            if distance <= 1:
-                near_pharm.append(pharm)
-        
         serializer = PharmSerializer(near_pharm,many=True)
-        return Response(serializer.data)
\ No newline at end of file
+        return Response(serializer.data)
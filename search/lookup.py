@@ -0,0 +1,209 @@
+"""DB 캐시 조회와 검색 결과 포맷팅
+
+동기/비동기/스트리밍 검색 뷰가 함께 쓰는 조회 함수들.
+"""
+import hashlib
+import logging
+
+from django.core.cache import cache
+
+from config.caching import search_ttls, set_swr, run_in_background
+from medicines.models import MedicineCache, CustomSummaryCache
+from medicines.search_index import search_medicine_efcy, search_medicine_names
+from medicines.fuzzy import correct_medicine_names
+
+logger = logging.getLogger(__name__)
+
+def lookup_local(item_name, efcy, search_type):
+    """외부 API 장애(서킷 열림 포함) 시 DB 캐시만으로 응답할 결과 (없으면 None)"""
+    if item_name:
+        return lookup_by_name(item_name, search_type)
+    return lookup_by_symptom(efcy, search_type)[0]
+
+def lookup_by_name(item_name, search_type):
+    """DB 캐시에서 약물명으로 조회 (결과가 없으면 None)"""
+    # n-gram 색인으로 조회 (정확한 매치 > 접두사 매치 > 부분 매치)
+    db_medicines = search_medicine_names(item_name, limit=10)
+    if not db_medicines:
+        return None
+
+    logger.info(f"DB 캐시 히트: {item_name} ({len(db_medicines)}개)")
+    return _format_cached_medicines(db_medicines, search_type)
+
+def lookup_corrected_name(item_name, search_type):
+    """
+    편집 거리가 가까운 약물명으로 교정해 DB 캐시에서 조회 (결과가 없으면 None)
+    외부 API 에도 검색어와 일치하는 약이 없을 때만 사용 (정확한 결과를 교정 결과로 바꾸지 않도록)
+    """
+    names = correct_medicine_names(item_name, limit=10)
+    if not names:
+        return None
+    medicines = MedicineCache.objects.in_bulk(names, field_name='item_name')
+    db_medicines = [medicines[name] for name in names if name in medicines]
+    if not db_medicines:
+        return None
+
+    logger.info(f"오타 교정: {item_name} -> {db_medicines[0].item_name}")
+    return _format_cached_medicines(db_medicines, search_type)
+
+def refresh_by_name(item_name, search_type, cache_key):
+    """DB 캐시 조회 결과로 검색 캐시를 (다시) 채움"""
+    medicines = lookup_by_name(item_name, search_type)
+    if medicines:
+        set_swr(cache_key, medicines, *search_ttls('NAME'))
+    return medicines
+
+def lookup_by_symptom(efcy, search_type):
+    """
+    DB 캐시에서 증상으로 조회 ((결과, 맞춤 요약 생성 대기 여부) 반환, 결과가 없으면 (None, False))
+    맞춤 요약이 없는 약물은 일반 요약으로 응답하고 맞춤 요약은 백그라운드에서 생성
+    """
+    # 효능 역색인에서 증상 관련 약물 검색 (관련도 순)
+    db_medicines = search_medicine_efcy(efcy, limit=10)
+
+    if not db_medicines:
+        return None, False
+
+    logger.info(f"증상 DB 캐시 히트: {efcy} ({len(db_medicines)}개)")
+
+    # 상세 검색은 맞춤 요약을 쓰지 않음
+    if search_type == "detail":
+        return _format_cached_medicines(db_medicines, search_type), False
+
+    # 사용자 맞춤 요약 캐시를 한 번의 IN 쿼리로 조회
+    custom_summaries = dict(CustomSummaryCache.objects.filter(
+        search_keyword=efcy,
+        medicine_name__in=[medicine.item_name for medicine in db_medicines]
+    ).values_list('medicine_name', 'custom_summary'))
+
+    medicines = []
+    missing = []
+    for medicine in db_medicines:
+        efcy_data = custom_summaries.get(medicine.item_name)
+        if efcy_data is None:
+            missing.append(medicine.item_name)
+            efcy_data = medicine.efcy_summary
+        medicines.append({
+            "itemName": medicine.item_name,
+            "efcy": efcy_data,
+            "image": medicine.item_image
+        })
+
+    if missing:
+        _schedule_custom_summaries(efcy, missing)
+
+    return medicines, bool(missing)
+
+def refresh_by_symptom(efcy, search_type, cache_key):
+    """DB 캐시 조회 결과로 증상 검색 캐시를 (다시) 채움"""
+    medicines, pending = lookup_by_symptom(efcy, search_type)
+    if medicines:
+        soft_ttl, hard_ttl = search_ttls('SYMPTOM')
+        if pending:
+            # 맞춤 요약이 채워지면 곧 갱신되도록 짧은 soft TTL 사용
+            soft_ttl = search_ttls('SYMPTOM_PENDING')[0]
+        set_swr(cache_key, medicines, soft_ttl, hard_ttl)
+    return medicines
+
+def _schedule_custom_summaries(efcy, medicine_names):
+    """누락된 맞춤 요약 생성을 백그라운드에 맡김 (같은 키워드는 한 번만)"""
+    lock_key = f"custom_summary:pending:{hashlib.md5(efcy.encode('utf-8')).hexdigest()}"
+    if cache.add(lock_key, 1, search_ttls('SYMPTOM_PENDING')[0]):
+        logger.info(f"맞춤 요약 백그라운드 생성: {efcy} ({len(medicine_names)}개)")
+        # celery 를 불러오는 tasks 모듈은 처음 필요할 때 import
+        from medicines.tasks import generate_custom_summaries
+        run_in_background(generate_custom_summaries, efcy, medicine_names)
+
+def _format_cached_medicines(db_medicines, search_type):
+    """캐시된 약물 정보 포맷팅"""
+    medicines = []
+    
+    for medicine in db_medicines:
+        if search_type == "detail":
+            medicine_data = _format_detailed_medicine(medicine)
+        else:
+            medicine_data = {
+                "itemName": medicine.item_name,
+                "efcy": medicine.efcy_summary,
+                "image": medicine.item_image
+            }
+        medicines.append(medicine_data)
+    
+    return medicines
+
+def _format_detailed_medicine(medicine):
+    """상세 약물 정보 포맷팅"""
+    return {
+        "itemName": medicine.item_name,
+        "efcy": medicine.efcy_original or "이 정보가 제공되지 않는 약입니다. :(",
+        "image": medicine.item_image,
+        "atpn": medicine.atpn_qesitm or "이 정보가 제공되지 않는 약입니다. :(",
+        "intrc": medicine.intrc_qesitm or "이 정보가 제공되지 않는 약입니다. :(",
+        "usemethod": medicine.use_method_qesitm or "이 정보가 제공되지 않는 약입니다. :(",
+        "seQ": medicine.se_qesitm or "이 정보가 제공되지 않는 약입니다. :("
+    }
+
+def format_api_medicine(item, efcy_data, search_type):
+    """공공데이터 API 응답 항목 포맷팅 (기본 검색은 DB 캐시에도 저장, 실패 시 None)"""
+    try:
+        if search_type == "detail":
+            return {
+                "itemName": item['itemName'],
+                "efcy": item.get('efcyQesitm', '이 정보가 제공되지 않는 약입니다. :('),
+                "image": item.get('itemImage', ''),
+                "atpn": item.get('atpnQesitm', '이 정보가 제공되지 않는 약입니다. :('),
+                "intrc": item.get('intrcQesitm', '이 정보가 제공되지 않는 약입니다. :('),
+                "usemethod": item.get('useMethodQesitm', '이 정보가 제공되지 않는 약입니다. :('),
+                "seQ": item.get('seQesitm', '이 정보가 제공되지 않는 약입니다. :(')
+            }
+
+        if efcy_data is None:
+            # 요약 실패(OpenAI 서킷 열림 포함) 시 원문 효능 정보로 응답하고 DB 에는 저장하지 않음
+            logger.warning(f"약물 요약 실패, 원문으로 응답 {item.get('itemName', 'Unknown')}")
+            if not item.get('efcyQesitm'):
+                return None
+            return {
+                "itemName": item['itemName'],
+                "efcy": item['efcyQesitm'],
+                "image": item.get('itemImage', '')
+            }
+
+        # 백그라운드에서 DB에 저장 (이미 존재하지 않는 경우)
+        _save_to_cache_async(item, efcy_data)
+
+        return {
+            "itemName": item['itemName'],
+            "efcy": efcy_data,
+            "image": item.get('itemImage', '')
+        }
+
+    except Exception as e:
+        logger.error(f"약물 처리 실패 {item.get('itemName', 'Unknown')}: {str(e)}")
+        return None
+
+def _save_to_cache_async(item, efcy_summary):
+    """비동기적으로 캐시에 저장 (중복 체크)"""
+    try:
+        MedicineCache.objects.get_or_create(
+            item_name=item['itemName'],
+            defaults={
+                'efcy_original': item.get('efcyQesitm', ''),
+                'efcy_summary': efcy_summary,
+                'item_image': item.get('itemImage', ''),
+                'atpn_qesitm': item.get('atpnQesitm', ''),
+                'intrc_qesitm': item.get('intrcQesitm', ''),
+                'use_method_qesitm': item.get('useMethodQesitm', ''),
+                'se_qesitm': item.get('seQesitm', ''),
+                'created_from_api': True
+            }
+        )
+    except Exception as e:
+        logger.error(f"캐시 저장 실패 {item['itemName']}: {str(e)}")
+
+def detail_medicine(item):
+    data = {"itemName":item['itemName'],"efcy":item['efcyQesitm'],"image":item['itemImage'], "atpn":item['atpnQesitm'], "intrc":item['intrcQesitm'],
+            "usemethod":item['useMethodQesitm'],"seQ":item['seQesitm']}
+    for key in ("efcy", "atpn", "intrc", "usemethod", "seQ"):
+        if data.get(key, None) is None:
+            data[key] = "이 정보가 제공되지 않는 약입니다. :("
+    return data
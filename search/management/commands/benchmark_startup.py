@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 기동 시 불러오지 않아야 하는 무거운 패키지 (첫 사용 시 import)
+DEFAULT_LAZY_MODULES = 'openai,httpx,celery,numpy'
+
+# 새 인터프리터에서 django.setup() 과 URLconf 로딩(뷰 모듈 import 포함)까지의 시간 측정
+PROBE = """
+import json, os, sys, time
+started = time.perf_counter()
+import django
+django.setup()
+from django.conf import settings
+__import__(settings.ROOT_URLCONF)
+elapsed = time.perf_counter() - started
+modules = [name for name in sys.argv[1].split(',') if name and name in sys.modules]
+print(json.dumps({'seconds': elapsed, 'loaded': modules}))
+"""
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)$')
+
+
+class Command(BaseCommand):
+    help = '서버 기동(django.setup + URLconf 로딩) 시간과 기동 시 불러오는 무거운 모듈 측정'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs',
+            type=int,
+            default=5,
+            help='측정 횟수 (기본: 5, 중앙값 출력)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=15,
+            help='-X importtime 기준으로 출력할 느린 모듈 수 (기본: 15, 0이면 생략)'
+        )
+        parser.add_argument(
+            '--lazy-modules',
+            default=DEFAULT_LAZY_MODULES,
+            help=f'기동 시 import 되면 안 되는 모듈 (쉼표 구분, 기본: {DEFAULT_LAZY_MODULES})'
+        )
+        parser.add_argument(
+            '--max-seconds',
+            type=float,
+            default=None,
+            help='중앙값이 이 시간(초)을 넘거나 lazy 모듈이 로드되면 실패 (CI 용)'
+        )
+
+    def _run(self, lazy_modules, importtime=False):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', settings.SETTINGS_MODULE))
+        command = [sys.executable]
+        if importtime:
+            command += ['-X', 'importtime']
+        command += ['-c', PROBE, lazy_modules]
+        result = subprocess.run(command, capture_output=True, text=True, env=env, cwd=settings.BASE_DIR)
+        if result.returncode != 0:
+            raise CommandError(f"기동 측정 실패:\n{result.stderr[-2000:]}")
+        return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+    def _slowest_modules(self, stderr, top):
+        """-X importtime 출력에서 최상위 패키지별 누적 import 시간 (ms)"""
+        packages = {}
+        for line in stderr.splitlines():
+            match = IMPORTTIME_RE.match(line)
+            if not match:
+                continue
+            _, cumulative, indent, name = match.groups()
+            # 들여쓰기가 가장 얕은 줄이 다른 모듈에 포함되지 않은 import
+            if len(indent) == 1:
+                package = name.split('.')[0]
+                packages[package] = packages.get(package, 0) + int(cumulative) / 1000
+        return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    def handle(self, *args, **options):
+        runs = max(1, options['runs'])
+        lazy_modules = options['lazy_modules']
+        max_seconds = options['max_seconds']
+
+        timings = []
+        loaded = set()
+        for _ in range(runs):
+            probe, _ = self._run(lazy_modules)
+            timings.append(probe['seconds'])
+            loaded.update(probe['loaded'])
+
+        median = statistics.median(timings)
+        self.stdout.write(
+            f"기동 시간 ({runs}회): 중앙값 {median * 1000:.0f}ms, "
+            f"최소 {min(timings) * 1000:.0f}ms, 최대 {max(timings) * 1000:.0f}ms"
+        )
+
+        if options['top'] > 0:
+            _, stderr = self._run(lazy_modules, importtime=True)
+            self.stdout.write("import 시간이 긴 패키지:")
+            for package, milliseconds in self._slowest_modules(stderr, options['top']):
+                self.stdout.write(f"  {package:<30} {milliseconds:8.1f}ms")
+
+        if loaded:
+            self.stdout.write(self.style.WARNING(f"기동 시 로드된 lazy 모듈: {', '.join(sorted(loaded))}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("기동 시 로드된 lazy 모듈 없음"))
+
+        if max_seconds is not None:
+            if loaded:
+                raise CommandError(f"기동 시 로드되면 안 되는 모듈: {', '.join(sorted(loaded))}")
+            if median > max_seconds:
+                raise CommandError(f"기동 시간 {median:.3f}초가 기준 {max_seconds}초를 넘음")
@@ -0,0 +1,99 @@
+from django.core.management.base import BaseCommand
+
+from config.fake_upstream import (
+    CHAT_COMPLETIONS_PATH, DRUG_LIST_PATH, PHARMACY_PATH,
+    FakeUpstream, fixture_catalog, fixture_pharmacies, load_catalog, serve,
+)
+
+
+class Command(BaseCommand):
+    help = '부하 테스트용 가짜 외부 API 서버 실행 (data.go.kr 약물/약국 목록, OpenAI chat completions)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument(
+            '--catalog',
+            metavar='PATH',
+            default=None,
+            help='약물 목록 JSON 파일 (기본: 합성 목록)'
+        )
+        parser.add_argument(
+            '--catalog-size',
+            type=int,
+            default=500,
+            help='합성 약물 수 (기본: 500)'
+        )
+        parser.add_argument(
+            '--pharmacies',
+            type=int,
+            default=2000,
+            help='합성 약국 수 (기본: 2000)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='합성 데이터/지연 시간 난수 seed (load_test 와 같게 두면 검색어가 목록과 맞음)'
+        )
+        parser.add_argument(
+            '--latency-ms',
+            type=float,
+            default=50,
+            help='공공데이터 API 응답 지연 (ms, 기본: 50)'
+        )
+        parser.add_argument(
+            '--openai-latency-ms',
+            type=float,
+            default=400,
+            help='OpenAI 응답 지연 (ms, 기본: 400)'
+        )
+        parser.add_argument(
+            '--jitter',
+            type=float,
+            default=0.3,
+            help='지연 시간 변동 비율 (기본: 0.3 -> ±30%%)'
+        )
+        parser.add_argument(
+            '--error-rate',
+            type=float,
+            default=0.0,
+            help='503 응답 비율 (0~1, 기본: 0)'
+        )
+        parser.add_argument(
+            '--rate-limit-rate',
+            type=float,
+            default=0.0,
+            help='OpenAI 429 응답 비율 (0~1, 기본: 0)'
+        )
+
+    def handle(self, *args, **options):
+        catalog = load_catalog(options['catalog']) if options['catalog'] else fixture_catalog(options['catalog_size'], options['seed'])
+        upstream = FakeUpstream(
+            catalog=catalog,
+            pharmacies=fixture_pharmacies(options['pharmacies'], options['seed']),
+            latency_ms=options['latency_ms'],
+            openai_latency_ms=options['openai_latency_ms'],
+            jitter=options['jitter'],
+            error_rate=options['error_rate'],
+            rate_limit_rate=options['rate_limit_rate'],
+            seed=options['seed'],
+        )
+        server = serve(upstream, options['host'], options['port'])
+        base = f"http://{options['host']}:{server.server_address[1]}"
+
+        self.stdout.write(self.style.SUCCESS(
+            f"가짜 외부 API 서버 실행 중: {base} (약물 {len(catalog)}개, 약국 {len(upstream.pharmacies)}개)"
+        ))
+        self.stdout.write("Django 서버를 아래 환경 변수와 함께 실행하세요:")
+        self.stdout.write(f"  export PUBLIC_DATA_DRUG_LIST_URL={base}{DRUG_LIST_PATH}")
+        self.stdout.write(f"  export PUBLIC_DATA_PHARMACY_URL={base}{PHARMACY_PATH}")
+        self.stdout.write(f"  export OPENAI_BASE_URL={base}{CHAT_COMPLETIONS_PATH.rsplit('/chat', 1)[0]}")
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"요청 수: {upstream.requests}")
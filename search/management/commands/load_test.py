@@ -0,0 +1,251 @@
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config.fake_upstream import SYMPTOMS, fixture_catalog
+
+SCENARIOS = ('search', 'optimized', 'register', 'pharm')
+
+
+def percentile(sorted_values, fraction):
+    """nearest-rank 백분위 (정렬된 값)"""
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+class Command(BaseCommand):
+    help = '실행 중인 서버의 검색/등록/약국 API 부하 테스트 (처리량, p50/p95/p99 지연 시간)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base-url',
+            default='http://127.0.0.1:8000',
+            help='대상 서버 주소 (기본: http://127.0.0.1:8000)'
+        )
+        parser.add_argument(
+            '--scenarios',
+            default=','.join(SCENARIOS),
+            help=f'실행할 시나리오 (쉼표 구분, 기본: {",".join(SCENARIOS)})'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=10,
+            help='동시 요청 수 (기본: 10)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30,
+            help='실행 시간 (초, 기본: 30)'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=None,
+            help='총 요청 수 (지정하면 --duration 대신 사용)'
+        )
+        parser.add_argument(
+            '--token',
+            default=None,
+            help='JWT access token (기본: --user-id 사용자로 발급)'
+        )
+        parser.add_argument(
+            '--user-id',
+            type=int,
+            default=None,
+            help='토큰을 발급할 PillingUser id (기본: 첫 번째 사용자)'
+        )
+        parser.add_argument(
+            '--catalog-size',
+            type=int,
+            default=500,
+            help='검색어를 뽑을 합성 약물 목록 크기 (fake_upstream 과 같게, 기본: 500)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='합성 약물 목록/검색어 seed (fake_upstream 과 같게, 기본: 0)'
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='요청 타임아웃 (초, 기본: 30)'
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='결과를 JSON 으로 출력'
+        )
+        parser.add_argument(
+            '--max-p95-ms',
+            type=float,
+            default=None,
+            help='시나리오별 p95 가 이 값을 넘으면 실패 (CI 용)'
+        )
+        parser.add_argument(
+            '--max-error-rate',
+            type=float,
+            default=None,
+            help='오류(5xx, 연결 실패) 비율이 이 값을 넘으면 실패 (0~1, CI 용)'
+        )
+
+    def _token(self, options):
+        if options['token']:
+            return options['token']
+        from rest_framework_simplejwt.tokens import RefreshToken
+        from accounts.models import PillingUser
+
+        users = PillingUser.objects.order_by('pk')
+        user = users.filter(pk=options['user_id']).first() if options['user_id'] else users.first()
+        if user is None:
+            raise CommandError("토큰을 발급할 사용자가 없습니다. --token 을 지정하거나 사용자를 만들어 주세요.")
+        return str(RefreshToken.for_user(user).access_token)
+
+    def _request_factory(self, catalog, rng):
+        """시나리오별 (메서드, 경로, 쿼리) 생성"""
+        names = [item['itemName'] for item in catalog]
+
+        def name_query():
+            name = rng.choice(names)
+            return name[:rng.randint(2, min(6, len(name)))]
+
+        def symptom_params():
+            return {"efcyQesitm": rng.choice(SYMPTOMS)}
+
+        def search():
+            if rng.random() < 0.7:
+                return '/search', {"itemName": name_query()}
+            return '/search', symptom_params()
+
+        def optimized():
+            if rng.random() < 0.7:
+                return '/search/optimized/', {"itemName": name_query()}
+            return '/search/optimized/', symptom_params()
+
+        def register():
+            return '/register', {"itemName": name_query()}
+
+        def pharm():
+            return '/pharm', {"lat": f"{rng.uniform(37.45, 37.65):.6f}", "lon": f"{rng.uniform(126.85, 127.15):.6f}"}
+
+        return {'search': search, 'optimized': optimized, 'register': register, 'pharm': pharm}
+
+    def handle(self, *args, **options):
+        import requests
+
+        scenarios = [name.strip() for name in options['scenarios'].split(',') if name.strip()]
+        unknown = set(scenarios) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+
+        base_url = options['base_url'].rstrip('/')
+        headers = {'Authorization': f"Bearer {self._token(options)}"}
+        catalog = fixture_catalog(options['catalog_size'], options['seed'])
+        total_requests = options['requests']
+        deadline = time.monotonic() + options['duration']
+
+        lock = threading.Lock()
+        issued = [0]
+        results = defaultdict(list)  # 시나리오 -> [(지연 ms, 상태 코드 또는 예외 이름)]
+
+        def next_slot():
+            with lock:
+                if total_requests is not None:
+                    if issued[0] >= total_requests:
+                        return None
+                elif time.monotonic() >= deadline:
+                    return None
+                issued[0] += 1
+                return issued[0]
+
+        def worker(index):
+            rng = random.Random(options['seed'] * 1000 + index)
+            factories = self._request_factory(catalog, rng)
+            session = requests.Session()
+            while True:
+                slot = next_slot()
+                if slot is None:
+                    break
+                scenario = scenarios[slot % len(scenarios)]
+                path, params = factories[scenario]()
+                started = time.perf_counter()
+                try:
+                    response = session.get(base_url + path, params=params, headers=headers, timeout=options['timeout'])
+                    outcome = response.status_code
+                except requests.RequestException as e:
+                    outcome = type(e).__name__
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                with lock:
+                    results[scenario].append((elapsed_ms, outcome))
+
+        self.stdout.write(
+            f"부하 테스트 시작: {base_url}, 시나리오 {','.join(scenarios)}, 동시 {options['concurrency']}, "
+            + (f"{total_requests}건" if total_requests is not None else f"{options['duration']:.0f}초")
+        )
+        started = time.monotonic()
+        threads = [threading.Thread(target=worker, args=(index,), daemon=True) for index in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        report = self._report(results, elapsed)
+        if options['json']:
+            self.stdout.write(json.dumps(report, ensure_ascii=False, indent=2))
+        else:
+            self._print(report)
+        self._check(report, options)
+
+    def _report(self, results, elapsed):
+        report = {'elapsed_seconds': round(elapsed, 2), 'scenarios': {}}
+        total = 0
+        for scenario, samples in results.items():
+            latencies = sorted(latency for latency, _ in samples)
+            outcomes = Counter(str(outcome) for _, outcome in samples)
+            errors = sum(1 for _, outcome in samples if not isinstance(outcome, int) or outcome >= 500)
+            total += len(samples)
+            report['scenarios'][scenario] = {
+                'requests': len(samples),
+                'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else None,
+                'p50_ms': round(percentile(latencies, 0.50), 1),
+                'p95_ms': round(percentile(latencies, 0.95), 1),
+                'p99_ms': round(percentile(latencies, 0.99), 1),
+                'max_ms': round(latencies[-1], 1),
+                'error_rate': round(errors / len(samples), 4),
+                'status': dict(outcomes),
+            }
+        report['requests'] = total
+        report['throughput_rps'] = round(total / elapsed, 2) if elapsed else None
+        return report
+
+    def _print(self, report):
+        self.stdout.write(
+            f"\n총 {report['requests']}건 / {report['elapsed_seconds']}초 = {report['throughput_rps']} req/s"
+        )
+        self.stdout.write(f"{'시나리오':<12}{'요청':>7}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'오류율':>8}  상태")
+        for scenario, stats in report['scenarios'].items():
+            self.stdout.write(
+                f"{scenario:<12}{stats['requests']:>7}{stats['throughput_rps']:>9}"
+                f"{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}"
+                f"{stats['error_rate']:>8.1%}  {stats['status']}"
+            )
+
+    def _check(self, report, options):
+        failures = []
+        for scenario, stats in report['scenarios'].items():
+            if options['max_p95_ms'] is not None and stats['p95_ms'] > options['max_p95_ms']:
+                failures.append(f"{scenario} p95 {stats['p95_ms']}ms > {options['max_p95_ms']}ms")
+            if options['max_error_rate'] is not None and stats['error_rate'] > options['max_error_rate']:
+                failures.append(f"{scenario} 오류율 {stats['error_rate']:.1%} > {options['max_error_rate']:.1%}")
+        if failures:
+            raise CommandError("기준 초과: " + "; ".join(failures))
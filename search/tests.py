@@ -1,3 +1,68 @@
+from unittest import mock
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import PillingUser
+from config.public_data import DrugListPage, PublicDataAPIError
+from medicines.models import MedicineCache
+
+
+def api_item(name, efcy):
+    return {'itemName': name, 'efcyQesitm': efcy, 'itemImage': '', 'atpnQesitm': None, 'intrcQesitm': None,
+            'useMethodQesitm': None, 'seQesitm': None}
+
+
+class AsyncSearchViewTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = PillingUser.objects.create_user(kakao_sub=1, nickname='tester', picture='')
+        MedicineCache.objects.create(item_name='타이레놀정500밀리그람', efcy_original='두통, 발열', efcy_summary='해열 진통')
+
+    def setUp(self):
+        cache.clear()
+        self.auth = {'headers': {'Authorization': f'Bearer {RefreshToken.for_user(self.user).access_token}'}}
+
+    async def test_requires_jwt(self):
+        for url in ('/search/async', '/register/async', '/search/optimized/async/'):
+            response = await self.async_client.get(url, {'itemName': '타이레놀'})
+            self.assertEqual(response.status_code, 401, url)
+
+            response = await self.async_client.get(url, {'itemName': '타이레놀'}, headers={'Authorization': 'Bearer invalid'})
+            self.assertEqual(response.status_code, 401, url)
+
+    async def test_search_summarizes_upstream_items(self):
+        page = DrugListPage(total_count=2, items=[api_item('가정', '가 효능'), api_item('나정', '나 효능')])
+        with mock.patch('search.views_async.afetch_drug_list', mock.AsyncMock(return_value=page)), \
+                mock.patch('search.views_async.asummarize_efcy_concurrently', mock.AsyncMock(return_value=['가 요약', None])):
+            response = await self.async_client.get('/search/async', {'itemName': '정'}, **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        # 요약에 실패한 항목은 원문으로 응답
+        self.assertEqual([medicine['efcy'] for medicine in response.json()], ['가 요약', '나 효능'])
+
+    async def test_search_falls_back_to_local_cache_when_upstream_fails(self):
+        with mock.patch('search.views_async.afetch_drug_list', mock.AsyncMock(side_effect=PublicDataAPIError('down'))):
+            response = await self.async_client.get('/search/async', {'itemName': '타이레놀'}, **self.auth)
+            missing = await self.async_client.get('/search/async', {'itemName': '없는약'}, **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['itemName'], '타이레놀정500밀리그람')
+        self.assertEqual(missing.status_code, 502)
+
+    async def test_register_suggests_local_names_without_upstream(self):
+        with mock.patch('search.views_async.afetch_drug_list', mock.AsyncMock()) as fetch:
+            response = await self.async_client.get('/register/async', {'itemName': '타이'}, **self.auth)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'itemName': '타이레놀정500밀리그람'}])
+        fetch.assert_not_called()
+
+    async def test_optimized_search_serves_local_cache(self):
+        with mock.patch('search.views_async.afetch_drug_list', mock.AsyncMock()) as fetch:
+            response = await self.async_client.get('/search/optimized/async/', {'itemName': '타이레놀'}, **self.auth)
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'itemName': '타이레놀정500밀리그람', 'efcy': '해열 진통', 'image': ''}])
+        fetch.assert_not_called()
@@ -2,8 +2,11 @@ from rest_framework.decorators import api_view,permission_classes
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import MedicineSerializer, MedicineDetailSerializer,MedicineNameSerializer
-from config.utils import get_efcy_using_openai, get_efcy_using_openai_custom
-import requests
+from config.utils import summarize_efcy_concurrently
+from config.public_data import fetch_drug_list, PublicDataAPIError
+from medicines.autocomplete import suggest_medicine_names
+from medicines.negative_cache import is_known_empty, remember_empty, ITEM_NAME, EFCY
+from .lookup import lookup_local
 from rest_framework.permissions import IsAuthenticated
 
 
@@ -14,7 +17,6 @@ def search_medicine(request):
     efcy = request.GET.get("efcyQesitm",None)
     type = request.GET.get("type",'basic')
 
-    url = "http://apis.data.go.kr/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList?serviceKey=C0OCzqNhw6sohn5jE2c1L52H4YKftzf9U8nxGSsC5GqH1YzH4Uu9VJ18zMHmpBrOEPgm3jqSOUpHh3j1oLcwLw%3D%3D"
     if not itemName and not efcy:
         return Response("약 이름과 증상 정보 중 하나는 제공해야 합니다.",status=status.HTTP_400_BAD_REQUEST)
     
@@ -22,22 +24,27 @@ def search_medicine(request):
         if('%' in itemName):
             itemName = itemName.split('%',1)[0]
 
-        params = {"itemName":itemName,"type":"json","numOfRows":10}
-        response = requests.get(url, params=params)
-        data = response.json()
+        # 최근 결과가 없었던 약 이름은 외부 API 를 다시 호출하지 않음
+        if is_known_empty(ITEM_NAME, itemName):
+            return Response("해당하는 약 이름에 대한 약 정보가 없습니다.",status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            page = fetch_drug_list(item_name=itemName, num_of_rows=10, timeout=10)
+        except PublicDataAPIError:
+            # 외부 API 장애 시 DB 캐시에 있는 정보로라도 응답
+            return _degraded_response(itemName, None, type)
 
-        if data['body']['totalCount'] == 0:
+        if page.total_count == 0 or not page.items:
+            remember_empty(ITEM_NAME, itemName)
             return Response("해당하는 약 이름에 대한 약 정보가 없습니다.",status=status.HTTP_404_NOT_FOUND)
         
-        items = data['body']['items']
+        items = page.items
         
         medicines = []
 
 
         if type == "detail":
-            items = list()
-            items.append(dict(data['body']['items'][0]))
-            for item in items:
+            for item in items[:1]:
                 data = {
                     "itemName":item['itemName'],
                     "efcy":item['efcyQesitm'],
@@ -64,8 +71,12 @@ def search_medicine(request):
            
             
         
-        for item in items:
-            efcy_data = get_efcy_using_openai(item['efcyQesitm'])
+        summaries = summarize_efcy_concurrently([item['efcyQesitm'] for item in items])
+        for item, efcy_data in zip(items, summaries):
+            # 요약 실패(OpenAI 장애) 시 원문 효능 정보로 응답
+            efcy_data = efcy_data or item['efcyQesitm']
+            if efcy_data is None:
+                continue
             medicine = {"itemName":item['itemName'],"efcy":efcy_data,"image":item['itemImage']}
             medicines.append(medicine)
         
@@ -75,14 +86,19 @@ def search_medicine(request):
         
         
     elif efcy is not None:
-        params = {"efcyQesitm":efcy, "type":"json","numOfRows":10}
-        response = requests.get(url, params=params)
-        data = response.json()
+        if is_known_empty(EFCY, efcy):
+            return Response("해당하는 증상에 대한 약 정보가 없습니다.",status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            page = fetch_drug_list(efcy=efcy, num_of_rows=10, timeout=10)
+        except PublicDataAPIError:
+            return _degraded_response(None, efcy, type)
 
-        if data['body']['totalCount'] == 0:
+        if page.total_count == 0 or not page.items:
+            remember_empty(EFCY, efcy)
             return Response("해당하는 증상에 대한 약 정보가 없습니다.",status=status.HTTP_404_NOT_FOUND)
         
-        items = data['body']['items']
+        items = page.items
 
         medicines = []
 
@@ -97,8 +113,11 @@ def search_medicine(request):
             
            
         
-        for item in items:
-            efcy_data = get_efcy_using_openai_custom(item['efcyQesitm'],efcy)
+        summaries = summarize_efcy_concurrently([item['efcyQesitm'] for item in items],efcy)
+        for item, efcy_data in zip(items, summaries):
+            efcy_data = efcy_data or item['efcyQesitm']
+            if efcy_data is None:
+                continue
             medicine = {"itemName":item['itemName'],"efcy":efcy_data,"image":item['itemImage']}
             medicines.append(medicine)
                 
@@ -106,22 +125,40 @@ def search_medicine(request):
         return Response(serializer.data)
         
         
+def _degraded_response(itemName, efcy, type):
+    medicines = lookup_local(itemName, efcy, type)
+    if not medicines:
+        return Response("외부 서비스 연결에 실패했습니다. 잠시 후 다시 시도해주세요.",status=status.HTTP_502_BAD_GATEWAY)
+    serializer_class = MedicineDetailSerializer if type == "detail" else MedicineSerializer
+    serializer = serializer_class(medicines,many=True)
+    return Response(serializer.data)
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def search_for_register(request):
     query = request.GET.get('itemName',None)
     if query is None:
         return Response("약 이름이 필요합니다.",status=status.HTTP_400_BAD_REQUEST)
-    url = "http://apis.data.go.kr/1471000/DrbEasyDrugInfoService/getDrbEasyDrugList?serviceKey=C0OCzqNhw6sohn5jE2c1L52H4YKftzf9U8nxGSsC5GqH1YzH4Uu9VJ18zMHmpBrOEPgm3jqSOUpHh3j1oLcwLw%3D%3D"
-    params = {"itemName":query,"type":"json","numOfRows":10}
-    response = requests.get(url, params=params)
-        
-    data = response.json()
 
-    if data['body']['totalCount'] == 0:
+    # 로컬 약물 목록(초성/접두사 자동완성 -> 부분 일치)에서 먼저 찾고, 없을 때만 외부 API 호출
+    names = suggest_medicine_names(query, limit=10)
+    if names:
+        serializer = MedicineNameSerializer([{"itemName":name} for name in names],many=True)
+        return Response(serializer.data)
+
+    if is_known_empty(ITEM_NAME, query):
+        return Response("해당하는 약 이름에 대한 약 정보가 없습니다.",status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        page = fetch_drug_list(item_name=query, num_of_rows=10, timeout=10)
+    except PublicDataAPIError:
+        return Response("외부 서비스 연결에 실패했습니다. 잠시 후 다시 시도해주세요.",status=status.HTTP_502_BAD_GATEWAY)
+
+    if page.total_count == 0 or not page.items:
+        remember_empty(ITEM_NAME, query)
         return Response("해당하는 약 이름에 대한 약 정보가 없습니다.",status=status.HTTP_404_NOT_FOUND)
         
-    items = data['body']['items']
+    items = page.items
 
     medicines = []
 
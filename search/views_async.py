@@ -0,0 +1,200 @@
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from config.permissions import async_jwt_required
+from config.utils import asummarize_efcy_concurrently
+from config.public_data import afetch_drug_list, PublicDataAPIError
+from config.caching import asingle_flight, search_cache_key, aget_swr, aschedule_refresh
+from medicines.autocomplete import suggest_medicine_names
+from medicines.negative_cache import ais_known_empty, aremember_empty, ITEM_NAME, EFCY
+from .serializers import MedicineSerializer, MedicineDetailSerializer, MedicineNameSerializer
+from .lookup import refresh_by_name, refresh_by_symptom, lookup_corrected_name, format_api_medicine, lookup_local, detail_medicine
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+@require_GET
+@async_jwt_required
+async def search_medicine_async(request):
+    """search_medicine 의 async 버전 (ASGI 에서 외부 API 대기 중 워커를 점유하지 않음)"""
+    itemName = request.GET.get("itemName",None)
+    efcy = request.GET.get("efcyQesitm",None)
+    type = request.GET.get("type",'basic')
+
+    if not itemName and not efcy:
+        return _json("약 이름과 증상 정보 중 하나는 제공해야 합니다.",status=400)
+
+    if itemName is not None:
+        if('%' in itemName):
+            itemName = itemName.split('%',1)[0]
+        if await ais_known_empty(ITEM_NAME, itemName):
+            return _json("해당하는 약 이름에 대한 약 정보가 없습니다.",status=404)
+        try:
+            page = await afetch_drug_list(item_name=itemName, num_of_rows=10, timeout=10)
+        except PublicDataAPIError:
+            return await _degraded_response(itemName, None, type)
+        if page.total_count == 0 or not page.items:
+            await aremember_empty(ITEM_NAME, itemName)
+            return _json("해당하는 약 이름에 대한 약 정보가 없습니다.",status=404)
+        items = page.items
+        keyword = None
+        if type == "detail":
+            items = items[:1]
+    else:
+        if await ais_known_empty(EFCY, efcy):
+            return _json("해당하는 증상에 대한 약 정보가 없습니다.",status=404)
+        try:
+            page = await afetch_drug_list(efcy=efcy, num_of_rows=10, timeout=10)
+        except PublicDataAPIError:
+            return await _degraded_response(None, efcy, type)
+        if page.total_count == 0 or not page.items:
+            await aremember_empty(EFCY, efcy)
+            return _json("해당하는 증상에 대한 약 정보가 없습니다.",status=404)
+        items = page.items
+        keyword = efcy
+
+    if type == "detail":
+        serializer = MedicineDetailSerializer([detail_medicine(item) for item in items],many=True)
+        return _json(serializer.data)
+
+    summaries = await asummarize_efcy_concurrently([item['efcyQesitm'] for item in items], keyword)
+    # 요약 실패(OpenAI 장애) 시 원문 효능 정보로 응답
+    medicines = [
+        {"itemName":item['itemName'],"efcy":efcy_data or item['efcyQesitm'],"image":item['itemImage']}
+        for item, efcy_data in zip(items, summaries) if (efcy_data or item['efcyQesitm']) is not None
+    ]
+    serializer = MedicineSerializer(medicines,many=True)
+    return _json(serializer.data)
+
+async def _degraded_response(itemName, efcy, type):
+    """외부 API 장애 시 DB 캐시에 있는 정보로라도 응답"""
+    medicines = await sync_to_async(lookup_local)(itemName, efcy, type)
+    if not medicines:
+        return _json("외부 서비스 연결에 실패했습니다. 잠시 후 다시 시도해주세요.",status=502)
+    serializer_class = MedicineDetailSerializer if type == "detail" else MedicineSerializer
+    return _json(serializer_class(medicines,many=True).data)
+
+@require_GET
+@async_jwt_required
+async def search_for_register_async(request):
+    """search_for_register 의 async 버전"""
+    query = request.GET.get('itemName',None)
+    if query is None:
+        return _json("약 이름이 필요합니다.",status=400)
+
+    names = await sync_to_async(suggest_medicine_names)(query, limit=10)
+    if names:
+        serializer = MedicineNameSerializer([{"itemName":name} for name in names],many=True)
+        return _json(serializer.data)
+
+    if await ais_known_empty(ITEM_NAME, query):
+        return _json("해당하는 약 이름에 대한 약 정보가 없습니다.",status=404)
+
+    try:
+        page = await afetch_drug_list(item_name=query, num_of_rows=10, timeout=10)
+    except PublicDataAPIError:
+        return _json("외부 서비스 연결에 실패했습니다. 잠시 후 다시 시도해주세요.",status=502)
+    if page.total_count == 0 or not page.items:
+        await aremember_empty(ITEM_NAME, query)
+        return _json("해당하는 약 이름에 대한 약 정보가 없습니다.",status=404)
+
+    medicines = [{"itemName":item['itemName']} for item in page.items]
+    serializer = MedicineNameSerializer(medicines,many=True)
+    return _json(serializer.data)
+
+@require_GET
+@async_jwt_required
+async def search_medicine_optimized_async(request):
+    """search_medicine_optimized 의 async 버전 - 캐시/DB 조회 후 필요시 비동기 API 호출"""
+    item_name = request.GET.get("itemName", None)
+    efcy = request.GET.get("efcyQesitm", None)
+    search_type = request.GET.get("type", 'basic')
+
+    if not item_name and not efcy:
+        return _json({"error": "약 이름과 증상 정보 중 하나는 제공해야 합니다."}, status=400)
+
+    try:
+        if item_name:
+            if '%' in item_name:
+                item_name = item_name.split('%', 1)[0]
+            cache_key = search_cache_key("medicine_search", item_name, search_type)
+        else:
+            cache_key = search_cache_key("symptom_search", efcy, search_type)
+
+        cached_result, is_stale = await aget_swr(cache_key)
+        if cached_result:
+            if is_stale:
+                if item_name:
+                    await aschedule_refresh(cache_key, refresh_by_name, item_name, search_type, cache_key)
+                else:
+                    await aschedule_refresh(cache_key, refresh_by_symptom, efcy, search_type, cache_key)
+            return _json(cached_result)
+
+        data, status = await asingle_flight(
+            cache_key, lambda: _load_async(item_name, efcy, search_type, cache_key)
+        )
+        return _json(data, status=status)
+
+    except Exception as e:
+        logger.error(f"검색 중 오류 발생: {str(e)}", exc_info=True)
+        return _json({"error": "검색 중 오류가 발생했습니다."}, status=500)
+
+async def _load_async(item_name, efcy, search_type, cache_key):
+    """캐시 미스 시 DB 캐시 -> 실시간 API 순으로 조회 ((data, status) 반환)"""
+    cached_result, _ = await aget_swr(cache_key)
+    if cached_result:
+        return cached_result, 200
+
+    if item_name:
+        medicines = await sync_to_async(refresh_by_name)(item_name, search_type, cache_key)
+    else:
+        medicines = await sync_to_async(refresh_by_symptom)(efcy, search_type, cache_key)
+    if medicines:
+        return medicines, 200
+
+    return await _fallback_api_search_async(item_name, efcy, search_type)
+
+async def _fallback_api_search_async(item_name, efcy, search_type):
+    """_fallback_api_search 의 async 버전 ((data, status) 반환)"""
+    search_field, query = (ITEM_NAME, item_name) if item_name else (EFCY, efcy)
+    message = "해당하는 약 이름에 대한 약 정보가 없습니다." if item_name else "해당하는 증상에 대한 약 정보가 없습니다."
+
+    if await ais_known_empty(search_field, query):
+        logger.info(f"네거티브 캐시 히트: {search_field}={query}")
+        return await _corrected_or_not_found(item_name, search_type, message)
+
+    try:
+        page = await afetch_drug_list(item_name=item_name, efcy=efcy, num_of_rows=10, timeout=10)
+    except PublicDataAPIError as e:
+        logger.error(f"공공데이터 API 호출 실패: {str(e)}")
+        return {"error": "외부 서비스 연결에 실패했습니다. 잠시 후 다시 시도해주세요."}, 502
+
+    if page.total_count == 0 or not page.items:
+        await aremember_empty(search_field, query)
+        return await _corrected_or_not_found(item_name, search_type, message)
+
+    items = page.items
+    summaries = [None] * len(items)
+    if search_type != "detail":
+        summaries = await asummarize_efcy_concurrently(
+            [item.get('efcyQesitm') for item in items], efcy
+        )
+
+    format_medicine = sync_to_async(format_api_medicine)
+    medicines = []
+    for item, efcy_data in zip(items, summaries):
+        medicine_data = await format_medicine(item, efcy_data, search_type)
+        if medicine_data is not None:
+            medicines.append(medicine_data)
+
+    return medicines, 200
+
+async def _corrected_or_not_found(item_name, search_type, message):
+    """외부 API 에도 결과가 없는 약물명은 오타 교정 결과로 응답 ((data, status) 반환)"""
+    medicines = await sync_to_async(lookup_corrected_name)(item_name, search_type) if item_name else None
+    if medicines:
+        return medicines, 200
+    return {"error": message}, 404
@@ -0,0 +1,114 @@
+import json
+import logging
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from config.permissions import jwt_required
+from config.utils import iter_efcy_summaries
+from config.public_data import fetch_drug_list, PublicDataAPIError
+from medicines.negative_cache import is_known_empty, remember_empty, ITEM_NAME, EFCY
+from .lookup import lookup_local, detail_medicine
+
+logger = logging.getLogger(__name__)
+
+NDJSON = 'application/x-ndjson'
+EVENT_STREAM = 'text/event-stream'
+
+
+def _json(data, status=200):
+    return JsonResponse(data, status=status, safe=False, json_dumps_params={'ensure_ascii': False})
+
+def _wants_ndjson(request):
+    return request.GET.get('format') == 'ndjson' or NDJSON in request.headers.get('Accept', '')
+
+def _encode(event, data, ndjson):
+    """SSE 이벤트 또는 NDJSON 한 줄"""
+    if ndjson:
+        return json.dumps({"event": event, "data": data}, ensure_ascii=False) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+def _stream_response(events, ndjson):
+    response = StreamingHttpResponse(
+        (_encode(event, data, ndjson) for event, data in events),
+        content_type=f"{NDJSON if ndjson else EVENT_STREAM}; charset=utf-8",
+    )
+    # 프록시(nginx)가 버퍼링하지 않고 바로 전달하도록
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _summary_events(items, keyword):
+    """
+    원문 목록을 먼저 보내고, 효능 요약이 끝나는 순서대로 하나씩 보냄
+    - items: [{"index", "itemName", "efcy"(원문), "image"}]
+    - summary: {"index", "efcy", "summarized"} (요약 실패 시 원문, summarized=false)
+    - done: {"count"}
+    """
+    items = [item for item in items if item['efcyQesitm'] is not None]
+    yield "items", [
+        {"index": index, "itemName": item['itemName'], "efcy": item['efcyQesitm'], "image": item['itemImage']}
+        for index, item in enumerate(items)
+    ]
+    for index, summary in iter_efcy_summaries([item['efcyQesitm'] for item in items], keyword):
+        yield "summary", {"index": index, "efcy": summary or items[index]['efcyQesitm'], "summarized": summary is not None}
+    yield "done", {"count": len(items)}
+
+def _static_events(medicines):
+    """요약이 필요 없는 결과 (상세 검색, 외부 API 장애 시 DB 캐시 결과)"""
+    yield "items", [dict(medicine, index=index) for index, medicine in enumerate(medicines)]
+    yield "done", {"count": len(medicines)}
+
+@require_GET
+@jwt_required
+def search_medicine_stream(request):
+    """
+    search_medicine 의 스트리밍 버전 (SSE, ?format=ndjson 또는 Accept: application/x-ndjson 이면 NDJSON)
+    약 목록은 공공데이터 API 응답 직후 바로 보내고, OpenAI 요약은 끝나는 대로 이어서 보냄
+    """
+    itemName = request.GET.get("itemName",None)
+    efcy = request.GET.get("efcyQesitm",None)
+    type = request.GET.get("type",'basic')
+    ndjson = _wants_ndjson(request)
+
+    if not itemName and not efcy:
+        return _json("약 이름과 증상 정보 중 하나는 제공해야 합니다.",status=400)
+
+    if itemName is not None:
+        if('%' in itemName):
+            itemName = itemName.split('%',1)[0]
+        if is_known_empty(ITEM_NAME, itemName):
+            return _json("해당하는 약 이름에 대한 약 정보가 없습니다.",status=404)
+        try:
+            page = fetch_drug_list(item_name=itemName, num_of_rows=10, timeout=10)
+        except PublicDataAPIError:
+            return _degraded_stream(itemName, None, type, ndjson)
+        if page.total_count == 0 or not page.items:
+            remember_empty(ITEM_NAME, itemName)
+            return _json("해당하는 약 이름에 대한 약 정보가 없습니다.",status=404)
+        items = page.items
+        keyword = None
+        if type == "detail":
+            items = items[:1]
+    else:
+        if is_known_empty(EFCY, efcy):
+            return _json("해당하는 증상에 대한 약 정보가 없습니다.",status=404)
+        try:
+            page = fetch_drug_list(efcy=efcy, num_of_rows=10, timeout=10)
+        except PublicDataAPIError:
+            return _degraded_stream(None, efcy, type, ndjson)
+        if page.total_count == 0 or not page.items:
+            remember_empty(EFCY, efcy)
+            return _json("해당하는 증상에 대한 약 정보가 없습니다.",status=404)
+        items = page.items
+        keyword = efcy
+
+    if type == "detail":
+        return _stream_response(_static_events([detail_medicine(item) for item in items]), ndjson)
+    return _stream_response(_summary_events(items, keyword), ndjson)
+
+def _degraded_stream(itemName, efcy, type, ndjson):
+    """외부 API 장애 시 DB 캐시에 있는 정보로라도 응답"""
+    medicines = lookup_local(itemName, efcy, type)
+    if not medicines:
+        return _json("외부 서비스 연결에 실패했습니다. 잠시 후 다시 시도해주세요.",status=502)
+    return _stream_response(_static_events(medicines), ndjson)